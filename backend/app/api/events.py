@@ -0,0 +1,80 @@
+"""
+Events API
+실시간 변경 스트림 (Server-Sent Events)
+"""
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.core.auth import get_current_user_with_permission_or_query_token
+from app.core.change_stream import change_hub
+
+router = APIRouter(prefix="/api/v1/events", tags=["Events"])
+
+
+# ============================================================================
+# Helper Functions
+# ============================================================================
+
+def parse_csv(value: Optional[str]) -> set:
+    """쉼표로 구분된 목록 파싱"""
+    return {v.strip() for v in (value or "").split(",") if v.strip()}
+
+
+async def event_stream(request: Request, sub):
+    """구독 큐 → SSE 프레임 (heartbeat 주석으로 프록시 유휴 타임아웃 방지)"""
+    try:
+        yield "retry: 3000\n\n"
+    
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    sub.queue.get(),
+                    timeout=settings.CHANGE_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                continue
+    
+            data = json.dumps(message["events"], ensure_ascii=False, default=str)
+            yield f"event: {message['topic']}\ndata: {data}\n\n"
+    finally:
+        change_hub.unsubscribe(sub)
+
+
+# ============================================================================
+# API Endpoints
+# ============================================================================
+
+@router.get("/")
+async def stream_events(
+    request: Request,
+    topics: Optional[str] = Query(None, description="쉼표로 구분된 토픽 (outbound, inbound, stock / 생략 시 전체)"),
+    ids: Optional[str] = Query(None, description="쉼표로 구분된 문서/품목 ID (생략 시 전체)"),
+    current_user: dict = Depends(get_current_user_with_permission_or_query_token("stocks:read"))
+):
+    """
+    변경 이벤트 스트림 (text/event-stream)
+    
+    - event: 토픽 (outbound/inbound = 상태 전이, stock = 품목별 창고 합계 변경)
+    - data: 이벤트 배열 (DB 문장 단위로 묶여 전달)
+    - event: resync → 이벤트 유실 가능 (구독자 큐 초과 / DB 재연결), 목록을 다시 조회
+    
+    목록/재고 폴링 대신 최초 1회 조회 후 이 스트림으로 변경분만 반영
+    
+    - 인증: Authorization: Bearer 헤더 또는 ?token= (브라우저 EventSource는 헤더 설정 불가)
+    """
+    if not change_hub.running:
+        raise HTTPException(status_code=503, detail="Change stream not available")
+    
+    sub = change_hub.subscribe(parse_csv(topics), parse_csv(ids))
+    
+    return StreamingResponse(
+        event_stream(request, sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,141 @@
+"""
+Flows API - 상태 전이 이력 조회
+"""
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from uuid import UUID
+from app.core.supabase import supabase
+
+router = APIRouter(prefix="/api/flows", tags=["Flows"])
+
+
+# === 헬퍼 ===
+
+def parse_cursor(after: str) -> tuple:
+    """
+    next_cursor("created_at:id") → (created_at, id) (created_at에도 ':'가 있으므로 마지막 ':' 기준)
+    
+    or_() 필터 문자열에 들어가므로 ISO 시각 / UUID로 다시 직렬화한 값만 반환 (아니면 400)
+    """
+    created_at, _, flow_id = after.rpartition(":")
+    try:
+        return datetime.fromisoformat(created_at).isoformat(), str(UUID(flow_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# === API ===
+
+@router.get("")
+async def list_flows(
+    entity_type: Optional[str] = Query(None, description="문서 유형 (outbound, inbound 등)"),
+    entity_id: Optional[str] = Query(None, description="문서 ID (entity_type 필요)"),
+    after: Optional[str] = Query(None, description="이전 페이지의 next_cursor"),
+    limit: int = Query(100, ge=1, le=1000),
+    include_archived: bool = Query(False, description="보관 문서 이력 포함 (flows_all 뷰)"),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True, description="(deprecated) 오프셋 페이지, after/next_cursor 사용 권장")
+):
+    """
+    상태 전이 이력 (최신 순, 키셋 페이지네이션)
+    
+    - entity_type + entity_id: 문서 1건 이력 (idx_flows_entity_timeline)
+    - entity_type만: 유형별, 미지정: 전체 (idx_flows_timeline)
+    - next_cursor를 다음 요청의 after로 전달
+    - skip: 기존 `GET /api/flows?skip=` 호환용 오프셋 (after와 함께 사용 불가, 깊은 페이지는 느림)
+    """
+    if entity_id and not entity_type:
+        raise HTTPException(status_code=400, detail="entity_type is required with entity_id")
+    if after and skip:
+        raise HTTPException(status_code=400, detail="Use either after (next_cursor) or skip, not both")
+    
+    query = supabase.table("flows_all" if include_archived else "flows").select("*")
+    
+    if entity_type:
+        query = query.eq("entity_type", entity_type)
+    if entity_id:
+        query = query.eq("entity_id", entity_id)
+    if after:
+        created_at, flow_id = parse_cursor(after)
+        query = query.or_(
+            f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{flow_id})'
+        )
+    
+    try:
+        query = query.order("created_at", desc=True).order("id", desc=True)
+        if skip:
+            result = query.range(skip, skip + limit).execute()
+        else:
+            result = query.limit(limit + 1).execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    rows = result.data or []
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = f"{last['created_at']}:{last['id']}"
+    
+    return {
+        "data": rows,
+        "count": len(rows),
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/latest")
+async def list_latest_states(
+    entity_type: str = Query(..., description="문서 유형 (outbound, inbound 등)"),
+    entity_ids: Optional[str] = Query(None, description="쉼표로 구분된 문서 ID 목록"),
+    status: Optional[str] = Query(None, description="현재 상태 필터"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    문서별 최신 상태 (flow_latest, 이력 스캔 없음)
+    
+    - entity_ids 지정 시 해당 문서만 in_() 1회 조회 (없는 ID는 missing)
+    - 미지정 시 최근 전이 순 limit건
+    """
+    ids = list(dict.fromkeys(i.strip() for i in (entity_ids or "").split(",") if i.strip()))
+    
+    query = supabase.table("flow_latest").select("*").eq("entity_type", entity_type)
+    if status:
+        query = query.eq("to_status", status)
+    
+    try:
+        if ids:
+            result = query.in_("entity_id", ids).execute()
+        else:
+            result = query.order("created_at", desc=True).limit(limit).execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    rows = result.data or []
+    
+    if not ids:
+        return {"data": rows, "count": len(rows)}
+    
+    by_id = {row["entity_id"]: row for row in rows}
+    data = [by_id[i] for i in ids if i in by_id]
+    return {"data": data, "count": len(data), "missing": [i for i in ids if i not in by_id]}
+
+
+@router.get("/latest/{entity_type}/{entity_id}")
+async def get_latest_state(entity_type: str, entity_id: str):
+    """문서 1건의 최신 상태 (flow_latest PK 조회)"""
+    try:
+        result = supabase.table("flow_latest")\
+            .select("*")\
+            .eq("entity_type", entity_type)\
+            .eq("entity_id", entity_id)\
+            .execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not result.data:
+        raise HTTPException(status_code=404, detail="No flows for entity")
+    
+    return {"data": result.data[0]}
@@ -0,0 +1,383 @@
+"""
+Inbounds API - 입고 관리
+"""
+from fastapi import APIRouter, HTTPException, Header, Response
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date, datetime
+from postgrest.exceptions import APIError
+from app.core.supabase import supabase
+from app.core.config import settings
+from app.core.numbering import inbound_numbers
+from app.core.idempotency import run_idempotent
+from app.core.documents import DocumentStateMachine, to_utc_bound
+
+router = APIRouter(prefix="/api/v1/inbounds", tags=["Inbounds"])
+
+
+# === 요청/응답 모델 ===
+
+class InboundItemCreate(BaseModel):
+    """입고 라인 생성"""
+    item_id: str
+    qty: float = Field(gt=0)
+    unit_cost: float = Field(ge=0, default=0)
+
+
+class InboundItemUpdate(BaseModel):
+    """입고 라인 수정"""
+    qty: Optional[float] = Field(None, gt=0)
+    unit_cost: Optional[float] = Field(None, ge=0)
+
+
+class InboundCreate(BaseModel):
+    """입고 문서 생성"""
+    supplier_id: Optional[str] = None
+    warehouse_id: Optional[str] = None
+    reference_no: Optional[str] = None
+    memo: Optional[str] = None
+    items: List[InboundItemCreate] = []
+
+
+class InboundUpdate(BaseModel):
+    """입고 메타 업데이트"""
+    supplier_id: Optional[str] = None
+    warehouse_id: Optional[str] = None
+    reference_no: Optional[str] = None
+    memo: Optional[str] = None
+
+
+class InboundReceipt(BaseModel):
+    """일괄 입고 (컨테이너 단위, 생성 즉시 반영)"""
+    supplier_id: Optional[str] = None
+    warehouse_id: Optional[str] = None
+    reference_no: Optional[str] = Field(None, description="컨테이너/B/L 번호 등")
+    memo: Optional[str] = None
+    items: List[InboundItemCreate] = Field(..., min_length=1)
+
+
+# 목록/상세 조회 컬럼
+INBOUND_COLUMNS = (
+    "id, inbound_no, status, supplier_id, warehouse_id, reference_no, memo, "
+    "line_count, total_qty, total_amount, created_at, updated_at"
+)
+
+
+# === 상태 전이 테이블 ===
+# 출고와 같은 공통 규칙 (app.core.documents)
+
+inbound_documents = DocumentStateMachine("inbounds", "inbound")
+
+
+# === 유틸리티 함수 ===
+
+def generate_inbound_no() -> str:
+    """입고 문서번호 생성: YYYYMMDD-#### (일자별 카운터 블록 할당)"""
+    return inbound_numbers.next_number()
+
+
+# === API 엔드포인트 ===
+
+@router.get("/")
+def list_inbounds(
+    status: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    page: int = 1,
+    limit: int = 10,
+    include_items: bool = False
+):
+    """
+    입고 목록 조회
+    
+    - 기존 계약 유지: page/limit 파라미터, 응답 data/count (count = 이번 페이지 건수)
+    - 추가 필드: total (필터 전체 건수), page, limit
+    - 각 문서에 line_count / total_qty / total_amount 집계 포함
+    - **date_from / date_to**: 생성일 기간 (date_to 포함)
+    - **include_items**: true면 라인까지 함께 조회
+    """
+    try:
+        skip = (page - 1) * limit
+        columns = f"{INBOUND_COLUMNS}, items:inbound_items(*)" if include_items else INBOUND_COLUMNS
+        query = supabase.table("inbounds").select(columns, count="exact")
+        
+        # 상태/기간 필터 (status, created_at 복합 인덱스)
+        if status:
+            query = query.eq("status", status.upper())
+        if date_from:
+            query = query.gte("created_at", to_utc_bound(date_from))
+        if date_to:
+            query = query.lt("created_at", to_utc_bound(date_to, next_day=True))
+        
+        result = query.order("created_at", desc=True)\
+            .range(skip, skip + limit - 1)\
+            .execute()
+        
+        return {
+            "data": result.data,
+            "count": len(result.data),
+            "total": result.count,
+            "page": page,
+            "limit": limit
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/", status_code=201)
+def create_inbound(
+    data: InboundCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    입고 문서 생성 (DRAFT 상태)
+    
+    문서/라인/flow를 DB 함수 `create_inbound_with_items` 한 번으로 생성
+    
+    - **Idempotency-Key**: 재시도 시 같은 키를 보내면 문서를 중복 생성하지 않고 첫 응답 반환
+    """
+    def create() -> dict:
+        result = supabase.rpc("create_inbound_with_items", {
+            "p_inbound_no": generate_inbound_no(),
+            "p_header": data.dict(exclude={"items"}),
+            "p_items": [item.dict() for item in data.items],
+            "p_actor": "user:system"
+        }).execute()
+        
+        inbound = result.data
+        
+        return {
+            "id": inbound["id"],
+            "inbound_no": inbound["inbound_no"],
+            "status": inbound["status"],
+            "items": inbound["items"],
+            "data": inbound
+        }
+    
+    try:
+        body, replayed = run_idempotent(idempotency_key, "inbounds:create", data.dict(), create)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return body
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/receipts", status_code=201)
+def receive_inbound(
+    data: InboundReceipt,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    일괄 입고 (컨테이너 단위)
+    
+    DB 함수 `receive_inbound`가 문서/라인 생성, 전체 라인 재고 증가(품목별 합산),
+    원장 기록, POSTED 전환, flow 기록을 한 트랜잭션으로 처리
+    
+    - **Idempotency-Key**: 재시도 시 같은 키를 보내면 재고를 중복 증가시키지 않고 첫 응답 반환
+    """
+    if len(data.items) > settings.INBOUND_RECEIPT_MAX_LINES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many lines: {len(data.items)} (max {settings.INBOUND_RECEIPT_MAX_LINES})"
+        )
+    
+    def receive() -> dict:
+        result = supabase.rpc("receive_inbound", {
+            "p_inbound_no": generate_inbound_no(),
+            "p_header": data.dict(exclude={"items"}),
+            "p_items": [item.dict() for item in data.items],
+            "p_actor": "user:system"
+        }).execute()
+        
+        inbound_documents.raise_for_rpc(result.data, "receive")
+        
+        inbound = result.data["inbound"]
+        
+        return {
+            "id": inbound["id"],
+            "inbound_no": inbound["inbound_no"],
+            "status": inbound["status"],
+            "movements": result.data["movements"],
+            "data": inbound
+        }
+    
+    try:
+        body, replayed = run_idempotent(idempotency_key, "inbounds:receive", data.dict(), receive)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return body
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{inbound_id}")
+def get_inbound(inbound_id: str):
+    """입고 문서 상세 조회 (라인 포함, embedded select 1회)"""
+    try:
+        result = supabase.table("inbounds")\
+            .select(f"{INBOUND_COLUMNS}, items:inbound_items(*)")\
+            .eq("id", inbound_id)\
+            .single()\
+            .execute()
+        
+        return {"data": result.data}
+    except Exception as e:
+        raise HTTPException(status_code=404, detail="Inbound not found")
+
+
+@router.patch("/{inbound_id}")
+def update_inbound(inbound_id: str, data: InboundUpdate):
+    """입고 메타 업데이트 (DRAFT만 가능, 상태 조건부 UPDATE 1회)"""
+    try:
+        inbound_documents.transition(inbound_id, "update", data.dict(exclude_none=True))
+        
+        return {"ok": True}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{inbound_id}/items")
+def add_inbound_item(inbound_id: str, item: InboundItemCreate):
+    """라인 아이템 추가 (DRAFT만 가능, 상태는 가드 트리거에서 검증)"""
+    try:
+        supabase.table("inbound_items").insert({
+            "inbound_id": inbound_id,
+            "item_id": item.item_id,
+            "qty": item.qty,
+            "unit_cost": item.unit_cost
+        }).execute()
+        
+        return {"ok": True}
+    except APIError as e:
+        inbound_documents.raise_for_line_guard(e, "add_item")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.patch("/{inbound_id}/items/{item_id}")
+def update_inbound_item(inbound_id: str, item_id: str, data: InboundItemUpdate):
+    """라인 아이템 수정 (DRAFT만 가능, 상태는 가드 트리거에서 검증)"""
+    try:
+        update_data = data.dict(exclude_none=True)
+        update_data["updated_at"] = datetime.utcnow().isoformat()
+        
+        result = supabase.table("inbound_items")\
+            .update(update_data)\
+            .eq("id", item_id)\
+            .eq("inbound_id", inbound_id)\
+            .execute()
+        
+        if not result.data:
+            raise HTTPException(status_code=404, detail="Inbound item not found")
+        
+        return {"ok": True}
+    except APIError as e:
+        inbound_documents.raise_for_line_guard(e, "update_item")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/{inbound_id}/items/{item_id}")
+def delete_inbound_item(inbound_id: str, item_id: str):
+    """라인 아이템 삭제 (DRAFT만 가능, 상태는 가드 트리거에서 검증)"""
+    try:
+        result = supabase.table("inbound_items")\
+            .delete()\
+            .eq("id", item_id)\
+            .eq("inbound_id", inbound_id)\
+            .execute()
+        
+        if not result.data:
+            raise HTTPException(status_code=404, detail="Inbound item not found")
+        
+        return {"ok": True}
+    except APIError as e:
+        inbound_documents.raise_for_line_guard(e, "delete_item")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{inbound_id}/confirm")
+def confirm_inbound(inbound_id: str):
+    """입고 확정 (DRAFT → CONFIRMED, DB 함수 `confirm_inbound`)"""
+    try:
+        result = supabase.rpc("confirm_inbound", {
+            "p_inbound_id": inbound_id,
+            "p_actor": "user:system"
+        }).execute()
+        
+        inbound_documents.raise_for_rpc(result.data, "confirm")
+        
+        return {"status": "CONFIRMED"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{inbound_id}/post")
+def post_inbound(
+    inbound_id: str,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    입고 반영 (CONFIRMED → POSTED) - 재고 증가
+    
+    DB 함수 `post_inbound`가 상태 확인, 전체 라인 재고 증가(품목별 합산 upsert 1문장),
+    원장 기록, 상태 변경, flow 기록을 한 트랜잭션으로 처리
+    
+    - **Idempotency-Key**: 재시도 시 같은 키를 보내면 첫 응답을 그대로 반환
+    """
+    def post() -> dict:
+        result = supabase.rpc("post_inbound", {
+            "p_inbound_id": inbound_id,
+            "p_actor": "user:system"
+        }).execute()
+        
+        inbound_documents.raise_for_rpc(result.data, "post")
+        
+        return {"status": "POSTED", "movements": result.data["movements"]}
+    
+    try:
+        body, replayed = run_idempotent(idempotency_key, f"inbounds:{inbound_id}:post", {}, post)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return body
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{inbound_id}/cancel")
+def cancel_inbound(inbound_id: str):
+    """입고 취소 (DRAFT/CONFIRMED → CANCELED, DB 함수 `cancel_inbound`)"""
+    try:
+        result = supabase.rpc("cancel_inbound", {
+            "p_inbound_id": inbound_id,
+            "p_actor": "user:system"
+        }).execute()
+        
+        inbound_documents.raise_for_rpc(result.data, "cancel")
+        
+        return {"status": "CANCELED"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
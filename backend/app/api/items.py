@@ -5,11 +5,13 @@ Items API
 Phase 1: item_type 기반 검증 (BOM/라우팅 필수)
 """
 
-from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional, List, Union
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Response
 from pydantic import BaseModel, Field
 from app.core.supabase import supabase
+from app.core.config import settings
 from app.core.auth import get_current_user_with_permission
+from app.core.item_fields import parse_item_fields
 from app.config.classification_schemes import (
     get_scheme,
     get_behavior_flags,
@@ -54,13 +56,76 @@ class ItemUpdate(BaseModel):
 
 
 class Item(ItemBase):
+    # 필드 추가 시 app.core.item_fields.ITEM_FIELDS도 함께 갱신
     id: str
     created_at: str
     updated_at: str
 
 
+class ItemPartial(BaseModel):
+    """fields= 지정 시 응답 모델 (요청한 컬럼만 직렬화)"""
+    id: str
+    sku: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    category_id: Optional[str] = None
+    item_type: Optional[str] = None
+    uom: Optional[str] = None
+    unit_cost: Optional[float] = None
+    status: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
 class ItemsResponse(BaseModel):
-    data: List[Item]
+    data: List[Union[Item, ItemPartial]]
+    count: int
+    missing: Optional[List[str]] = Field(None, description="ids 조회 시 존재하지 않는 ID 목록")
+
+
+class ItemBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1)
+
+
+class ItemBulkFilter(BaseModel):
+    status: Optional[str] = None
+    item_type: Optional[str] = None
+    category_id: Optional[str] = None
+
+
+class ItemBulkSelection(BaseModel):
+    """일괄 작업 대상 (ids 또는 filter 중 하나)"""
+    ids: Optional[List[str]] = None
+    filter: Optional[ItemBulkFilter] = None
+
+
+class ItemBulkUpdate(ItemBulkSelection):
+    changes: ItemUpdate
+
+
+class ItemBulkFailure(BaseModel):
+    id: str
+    code: str
+    message: str
+
+
+class ItemBulkResult(BaseModel):
+    requested: int = Field(..., description="대상 상품 수 (filter 선택 시 적용된 행 수)")
+    succeeded: int
+    succeeded_ids: List[str]
+    failed: List[ItemBulkFailure] = []
+
+
+class ItemSearchHit(Item):
+    rank: float = Field(..., description="검색 랭킹 점수 (높을수록 우선)")
+
+
+class ItemSearchHitPartial(ItemPartial):
+    rank: float
+
+
+class ItemSearchResponse(BaseModel):
+    data: List[Union[ItemSearchHit, ItemSearchHitPartial]]
     count: int
 
 
@@ -68,6 +133,32 @@ class ItemsResponse(BaseModel):
 # Validation Logic
 # ============================================================================
 
+def get_classification_flags(item_type: str, scheme_id: str = "simple") -> dict:
+    """
+    분류 코드 검증 (DB 조회 없음)
+    
+    Returns:
+        행동 플래그 (requires_bom, requires_routing ...)
+        
+    Raises:
+        HTTPException: 유효하지 않은 분류 코드
+    """
+    # 기존 item_type을 새 스킴 코드로 매핑
+    scheme_code = map_legacy_type(item_type)
+    flags = get_behavior_flags(scheme_id, scheme_code)
+    
+    if not flags:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "invalid_classification",
+                "message": f"유효하지 않은 분류 코드: {item_type}"
+            }
+        )
+    
+    return flags
+
+
 def validate_item_before_save(
     item_type: str,
     item_id: Optional[str] = None,
@@ -84,21 +175,10 @@ def validate_item_before_save(
     Raises:
         HTTPException: 검증 실패 시
     """
-    # 1. 기존 item_type을 새 스킴 코드로 매핑
+    # 1~2. 분류 코드 매핑 및 행동 플래그 조회
+    flags = get_classification_flags(item_type, scheme_id)
     scheme_code = map_legacy_type(item_type)
     
-    # 2. 행동 플래그 조회
-    flags = get_behavior_flags(scheme_id, scheme_code)
-    
-    if not flags:
-        raise HTTPException(
-            status_code=400,
-            detail={
-                "code": "invalid_classification",
-                "message": f"유효하지 않은 분류 코드: {item_type}"
-            }
-        )
-    
     # 3. BOM 필수 검증
     if flags["requires_bom"]:
         # BOM 연결 확인
@@ -137,6 +217,140 @@ def validate_item_before_save(
     return None
 
 
+# ============================================================================
+# Optimistic Concurrency (ETag = updated_at)
+# ============================================================================
+
+def make_item_etag(row: dict) -> str:
+    """상품 버전 태그 (updated_at 기반)"""
+    return f'"{row["updated_at"]}"'
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[str]:
+    """If-Match 헤더에서 updated_at 값 추출 (`*`는 조건 없음)"""
+    if not if_match:
+        return None
+    value = if_match.strip()
+    if value == "*":
+        return None
+    if value.startswith("W/"):
+        value = value[2:]
+    return value.strip('"')
+
+
+# ============================================================================
+# Field Projection
+# ============================================================================
+
+def build_item_select(columns: Optional[List[str]]) -> str:
+    """PostgREST select 절 생성 (미지정 시 전체 컬럼)"""
+    return ",".join(columns) if columns else "*"
+
+
+def to_item_model(row: dict, columns: Optional[List[str]] = None) -> Union[Item, ItemPartial]:
+    """조회 결과를 응답 모델로 변환 (projection 시 요청 컬럼만 설정)"""
+    if columns is None:
+        return Item(**row)
+    return ItemPartial(**{k: row.get(k) for k in columns})
+
+
+def fetch_items_by_ids(ids: List[str], columns: Optional[List[str]] = None) -> ItemsResponse:
+    """
+    ID 목록으로 상품 일괄 조회 (단일 in_() 쿼리)
+    
+    - 요청 순서 유지 (중복 ID는 첫 번째만)
+    - 존재하지 않는 ID는 missing으로 반환
+    """
+    unique_ids = list(dict.fromkeys(i.strip() for i in ids if i and i.strip()))
+    
+    if len(unique_ids) > settings.ITEMS_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "too_many_ids",
+                "message": f"한 번에 최대 {settings.ITEMS_BATCH_MAX_IDS}개까지 조회할 수 있습니다.",
+                "requested": len(unique_ids)
+            }
+        )
+    
+    if not unique_ids:
+        return ItemsResponse(data=[], count=0, missing=[])
+    
+    response = supabase.table("items").select(build_item_select(columns)).in_("id", unique_ids).execute()
+    by_id = {row["id"]: row for row in response.data or []}
+    
+    return ItemsResponse(
+        data=[to_item_model(by_id[i], columns) for i in unique_ids if i in by_id],
+        count=len(by_id),
+        missing=[i for i in unique_ids if i not in by_id]
+    )
+
+
+# ============================================================================
+# Bulk Helpers
+# ============================================================================
+
+def chunked(values: List[str], size: int) -> List[List[str]]:
+    """리스트를 size 단위로 분할"""
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def apply_bulk_filter(query, bulk_filter: ItemBulkFilter):
+    """일괄 작업 filter를 쿼리에 적용"""
+    for column, value in bulk_filter.model_dump(exclude_none=True).items():
+        query = query.eq(column, value)
+    return query
+
+
+def resolve_filter_ids(bulk_filter: ItemBulkFilter) -> List[str]:
+    """filter 선택 대상 ID 확정 (ITEMS_BULK_MAX_IDS 초과 시 거부)"""
+    query = apply_bulk_filter(supabase.table("items").select("id"), bulk_filter)
+    ids = [row["id"] for row in query.limit(settings.ITEMS_BULK_MAX_IDS + 1).execute().data or []]
+    if len(ids) > settings.ITEMS_BULK_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "too_many_ids",
+                "message": f"한 번에 최대 {settings.ITEMS_BULK_MAX_IDS}개까지 처리할 수 있습니다."
+            }
+        )
+    return ids
+
+
+def resolve_bulk_ids(selection: ItemBulkSelection) -> Optional[List[str]]:
+    """
+    일괄 작업 대상 검증
+    
+    Returns:
+        ids 선택 시 중복 제거된 ID 목록, filter 선택 시 None
+    """
+    has_filter = selection.filter is not None and bool(selection.filter.model_dump(exclude_none=True))
+    
+    if (selection.ids is None) == (not has_filter):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "invalid_selection",
+                "message": "ids 또는 filter 중 하나만 지정해야 합니다. (빈 filter 불가)"
+            }
+        )
+    
+    if selection.ids is None:
+        return None
+    
+    ids = list(dict.fromkeys(i for i in selection.ids if i))
+    if len(ids) > settings.ITEMS_BULK_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "too_many_ids",
+                "message": f"한 번에 최대 {settings.ITEMS_BULK_MAX_IDS}개까지 처리할 수 있습니다.",
+                "requested": len(ids)
+            }
+        )
+    return ids
+
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
@@ -144,6 +358,7 @@ def validate_item_before_save(
 @router.post("", response_model=Item, status_code=201)
 async def create_item(
     item_in: ItemCreate,
+    http_response: Response,
     current_user: dict = Depends(get_current_user_with_permission("items:create"))
 ):
     """
@@ -152,23 +367,14 @@ async def create_item(
     **검증 규칙:**
     - BOM 필수: ASSEMBLY, PRODUCTION
     - 라우팅 필수: PRODUCTION
+    
+    SKU 중복은 `ON CONFLICT (sku) DO NOTHING`으로 한 번에 판정 (409)
     """
     # 1. 분류 검증
     validate_item_before_save(item_in.item_type, scheme_id="simple")
     
-    # 2. SKU 중복 체크
-    existing = supabase.table("items").select("id").eq("sku", item_in.sku).execute()
-    if existing.data:
-        raise HTTPException(
-            status_code=409,
-            detail={
-                "code": "sku_duplicate",
-                "message": f"이미 존재하는 SKU입니다: {item_in.sku}"
-            }
-        )
-    
-    # 3. 상품 생성
-    response = supabase.table("items").insert({
+    # 2. 상품 생성 (SKU 충돌 시 무시 → 빈 결과 = 중복)
+    response = supabase.table("items").upsert({
         "sku": item_in.sku,
         "name": item_in.name,
         "description": item_in.description,
@@ -177,39 +383,110 @@ async def create_item(
         "uom": item_in.uom,
         "unit_cost": item_in.unit_cost,
         "status": item_in.status
-    }).execute()
+    }, on_conflict="sku", ignore_duplicates=True).execute()
     
     if not response.data:
-        raise HTTPException(status_code=500, detail="Failed to create item")
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "code": "sku_duplicate",
+                "message": f"이미 존재하는 SKU입니다: {item_in.sku}"
+            }
+        )
     
+    http_response.headers["ETag"] = make_item_etag(response.data[0])
     return Item(**response.data[0])
 
 
-@router.get("/{item_id}", response_model=Item)
+@router.get("/search", response_model=ItemSearchResponse, response_model_exclude_unset=True)
+async def search_items(
+    q: str = Query(..., min_length=1, max_length=100, description="검색어 (SKU/상품명)"),
+    limit: int = Query(20, ge=1, le=100),
+    status: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="반환할 필드 (예: id,sku,name)"),
+    current_user: dict = Depends(get_current_user_with_permission("items:read"))
+):
+    """
+    상품 자동완성 검색
+    
+    - SKU/상품명 접두사·부분일치 + 트라이그램 유사도(오타 허용)
+    - 랭킹: SKU 완전일치 > SKU 접두사 > 상품명 접두사 > 부분일치
+    - DB 함수 `search_items` (005_item_search.sql) 사용
+    """
+    columns = parse_item_fields(fields)
+    
+    response = supabase.rpc("search_items", {
+        "p_query": q,
+        "p_limit": limit,
+        "p_status": status
+    }).execute()
+    
+    hits = []
+    for row in response.data or []:
+        if columns is None:
+            hits.append(ItemSearchHit(**row["item"], rank=row["rank"]))
+        else:
+            hits.append(ItemSearchHitPartial(**{k: row["item"].get(k) for k in columns}, rank=row["rank"]))
+    
+    return ItemSearchResponse(data=hits, count=len(hits))
+
+
+@router.post("/batch", response_model=ItemsResponse, response_model_exclude_unset=True)
+async def get_items_batch(
+    batch_in: ItemBatchRequest,
+    fields: Optional[str] = Query(None, description="반환할 필드 (예: id,sku,name)"),
+    current_user: dict = Depends(get_current_user_with_permission("items:read"))
+):
+    """
+    상품 일괄 조회 (POST body)
+    
+    `GET /api/v1/items?ids=...`와 동일하며, URL 길이 제한을 피할 때 사용
+    """
+    return fetch_items_by_ids(batch_in.ids, parse_item_fields(fields))
+
+
+@router.get("/{item_id}", response_model=Union[Item, ItemPartial], response_model_exclude_unset=True)
 async def get_item(
     item_id: str,
+    http_response: Response,
+    fields: Optional[str] = Query(None, description="반환할 필드 (예: id,sku,name)"),
     current_user: dict = Depends(get_current_user_with_permission("items:read"))
 ):
     """상품 상세 조회"""
-    response = supabase.table("items").select("*").eq("id", item_id).execute()
+    columns = parse_item_fields(fields)
+    response = supabase.table("items").select(build_item_select(columns)).eq("id", item_id).execute()
     
     if not response.data:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    return Item(**response.data[0])
+    if response.data[0].get("updated_at"):
+        http_response.headers["ETag"] = make_item_etag(response.data[0])
+    return to_item_model(response.data[0], columns)
 
 
-@router.get("", response_model=ItemsResponse)
+@router.get("", response_model=ItemsResponse, response_model_exclude_unset=True)
 async def get_items(
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
     item_type: Optional[str] = None,
     category_id: Optional[str] = None,
+    ids: Optional[str] = Query(None, description="쉼표로 구분된 상품 ID 목록 (지정 시 일괄 조회)"),
+    fields: Optional[str] = Query(None, description="반환할 필드 (예: id,sku,name)"),
     current_user: dict = Depends(get_current_user_with_permission("items:read"))
 ):
-    """상품 목록 조회"""
-    query = supabase.table("items").select("*", count="exact")
+    """
+    상품 목록 조회
+    
+    - **ids**: 지정 시 해당 ID만 요청 순서대로 반환 (필터/페이지네이션 무시)
+    - **fields**: 지정 시 해당 컬럼만 조회/반환 (드롭다운/자동완성용)
+    """
+    columns = parse_item_fields(fields)
+    
+    if ids is not None:
+        return fetch_items_by_ids(ids.split(","), columns)
+    
+    query = supabase.table("items").select(build_item_select(columns), count="exact")
     
     # 필터 적용
     if status:
@@ -225,44 +502,185 @@ async def get_items(
     response = query.execute()
     
     return ItemsResponse(
-        data=[Item(**item) for item in response.data],
+        data=[to_item_model(item, columns) for item in response.data],
         count=response.count or 0
     )
 
 
+@router.patch("/bulk", response_model=ItemBulkResult)
+async def bulk_update_items(
+    bulk_in: ItemBulkUpdate,
+    current_user: dict = Depends(get_current_user_with_permission("items:update"))
+):
+    """
+    상품 일괄 수정 (가격/상태 변경 등)
+    
+    - **ids**: 대상 상품 ID 목록 (청크 단위 `in_()` UPDATE)
+    - **filter**: status/item_type/category_id 조건 (대상 ID 확정 후 동일하게 처리, 최대 ITEMS_BULK_MAX_IDS)
+    - **changes**: 변경 내용 (sku는 일괄 변경 불가)
+    """
+    ids = resolve_bulk_ids(bulk_in)
+    
+    # 1. 변경 내용 검증 (메모리 내)
+    changes = {k: v for k, v in bulk_in.changes.dict(exclude_unset=True).items() if v is not None}
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    if "sku" in changes:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "sku_not_bulk_updatable",
+                "message": "SKU는 일괄 수정할 수 없습니다."
+            }
+        )
+    if "item_type" in changes:
+        get_classification_flags(changes["item_type"], scheme_id="simple")
+    
+    # 2. filter 선택 시 대상 ID 확정 (상한 검사)
+    if ids is None:
+        ids = resolve_filter_ids(bulk_in.filter)
+    
+    # 3. 청크 단위 UPDATE (청크별 트랜잭션, 실패 청크는 기록하고 계속 진행)
+    updated = set()
+    chunk_failed = set()
+    for chunk in chunked(ids, settings.ITEMS_BULK_CHUNK_SIZE):
+        try:
+            response = supabase.table("items").update(changes).in_("id", chunk).execute()
+            updated.update(row["id"] for row in response.data or [])
+        except Exception as e:
+            # FK(category_id)/CHECK 위반, 일시 오류 등 → 해당 청크 실패 처리 (이전 청크는 이미 반영됨)
+            print(f"[WARN] Bulk update chunk failed: {e}")
+            chunk_failed.update(chunk)
+    
+    failed = []
+    for i in ids:
+        if i in updated:
+            continue
+        if i in chunk_failed:
+            failed.append(ItemBulkFailure(id=i, code="update_failed", message="수정 중 오류가 발생했습니다."))
+        else:
+            failed.append(ItemBulkFailure(id=i, code="not_found", message="Item not found"))
+    
+    return ItemBulkResult(
+        requested=len(ids),
+        succeeded=len(updated),
+        succeeded_ids=[i for i in ids if i in updated],
+        failed=failed
+    )
+
+
+@router.post("/bulk/delete", response_model=ItemBulkResult)
+async def bulk_delete_items(
+    bulk_in: ItemBulkSelection,
+    current_user: dict = Depends(get_current_user_with_permission("items:delete"))
+):
+    """
+    상품 일괄 삭제
+    
+    - BOM 연결 여부를 대상 전체에 대해 한 번의 RPC(find_bom_usage)로 확인
+    - BOM 부모/구성품으로 연결된 상품은 제외하고 나머지를 청크 단위로 삭제
+    """
+    ids = resolve_bulk_ids(bulk_in)
+    
+    # 1. filter 선택 시 대상 ID 확정
+    if ids is None:
+        ids = resolve_filter_ids(bulk_in.filter)
+    
+    if not ids:
+        return ItemBulkResult(requested=0, succeeded=0, succeeded_ids=[])
+    
+    # 2. BOM 연결 확인 (부모 또는 구성품, ID 배열은 RPC 본문으로 1회 전달)
+    bom_response = supabase.rpc("find_bom_usage", {"p_item_ids": ids}).execute()
+    blocked = {row["item_id"]: row["usage"] for row in bom_response.data or []}
+    
+    # 3. 청크 단위 삭제
+    deletable = [i for i in ids if i not in blocked]
+    deleted = set()
+    for chunk in chunked(deletable, settings.ITEMS_BULK_CHUNK_SIZE):
+        try:
+            response = supabase.table("items").delete().in_("id", chunk).execute()
+            deleted.update(row["id"] for row in response.data or [])
+        except Exception as e:
+            # 확인 이후 BOM이 추가된 경우 등 (FK 위반) → 해당 청크 실패 처리
+            print(f"[WARN] Bulk delete chunk failed: {e}")
+            blocked.update({i: "delete_failed" for i in chunk})
+    
+    messages = {
+        "bom_exists": "BOM이 연결된 상품은 삭제할 수 없습니다.",
+        "item_in_use": "다른 상품의 BOM 구성품으로 사용 중인 상품은 삭제할 수 없습니다.",
+        "delete_failed": "삭제 중 오류가 발생했습니다.",
+        "not_found": "Item not found"
+    }
+    failed = []
+    for i in ids:
+        if i in deleted:
+            continue
+        code = blocked.get(i, "not_found")
+        failed.append(ItemBulkFailure(id=i, code=code, message=messages[code]))
+    
+    return ItemBulkResult(
+        requested=len(ids),
+        succeeded=len(deleted),
+        succeeded_ids=[i for i in ids if i in deleted],
+        failed=failed
+    )
+
+
 @router.patch("/{item_id}", response_model=Item)
 async def update_item(
     item_id: str,
     item_in: ItemUpdate,
+    http_response: Response,
+    if_match: Optional[str] = Header(None, alias="If-Match"),
     current_user: dict = Depends(get_current_user_with_permission("items:update"))
 ):
     """
     상품 수정
     
     **검증 규칙:**
-    - item_type 변경 시 BOM/라우팅 필수 검증
+    - item_type 지정 시 BOM/라우팅 필수 검증
+    
+    **동시성 제어:**
+    - `If-Match: "<updated_at>"` 지정 시 버전이 일치할 때만 수정 (불일치 412)
+    - 버전 조건은 UPDATE 필터에 포함되어 한 번의 요청으로 처리
     """
-    # 1. 기존 상품 조회
-    existing = supabase.table("items").select("*").eq("id", item_id).execute()
-    if not existing.data:
-        raise HTTPException(status_code=404, detail="Item not found")
+    expected_version = parse_if_match(if_match)
     
-    # 2. 분류가 변경되면 검증
-    if item_in.item_type and item_in.item_type != existing.data[0]["item_type"]:
+    # 1. 분류 검증
+    if item_in.item_type:
         validate_item_before_save(item_in.item_type, item_id=item_id, scheme_id="simple")
     
-    # 3. 업데이트 데이터 준비
+    # 2. 업데이트 데이터 준비
     update_data = {k: v for k, v in item_in.dict(exclude_unset=True).items() if v is not None}
     
     if not update_data:
+        existing = supabase.table("items").select("*").eq("id", item_id).execute()
+        if not existing.data:
+            raise HTTPException(status_code=404, detail="Item not found")
+        http_response.headers["ETag"] = make_item_etag(existing.data[0])
         return Item(**existing.data[0])
     
-    # 4. 상품 수정
-    response = supabase.table("items").update(update_data).eq("id", item_id).execute()
+    # 3. 조건부 수정 (id + 버전)
+    query = supabase.table("items").update(update_data).eq("id", item_id)
+    if expected_version:
+        query = query.eq("updated_at", expected_version)
+    response = query.execute()
     
     if not response.data:
-        raise HTTPException(status_code=500, detail="Failed to update item")
+        # 실패 원인 판별 (실패 경로에서만 조회)
+        current = supabase.table("items").select("updated_at").eq("id", item_id).execute()
+        if not current.data:
+            raise HTTPException(status_code=404, detail="Item not found")
+        raise HTTPException(
+            status_code=412,
+            detail={
+                "code": "version_conflict",
+                "message": "다른 사용자가 먼저 수정했습니다. 새로고침 후 다시 시도하세요.",
+                "current_version": current.data[0]["updated_at"]
+            }
+        )
     
+    http_response.headers["ETag"] = make_item_etag(response.data[0])
     return Item(**response.data[0])
 
 
@@ -271,10 +689,18 @@ async def delete_item(
     item_id: str,
     current_user: dict = Depends(get_current_user_with_permission("items:delete"))
 ):
-    """상품 삭제"""
-    # 1. BOM 연결 확인
-    bom_response = supabase.table("items_bom").select("id").eq("parent_item_id", item_id).execute()
-    if bom_response.data:
+    """
+    상품 삭제
+    
+    BOM 확인과 삭제를 DB 함수 `delete_item_if_unused` 한 번으로 처리
+    """
+    response = supabase.rpc("delete_item_if_unused", {"p_item_id": item_id}).execute()
+    result = response.data
+    
+    if result == "not_found":
+        raise HTTPException(status_code=404, detail="Item not found")
+    
+    if result == "bom_exists":
         raise HTTPException(
             status_code=409,
             detail={
@@ -283,11 +709,14 @@ async def delete_item(
             }
         )
     
-    # 2. 상품 삭제
-    response = supabase.table("items").delete().eq("id", item_id).execute()
-    
-    if not response.data:
-        raise HTTPException(status_code=404, detail="Item not found")
+    if result == "in_use":
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "code": "item_in_use",
+                "message": "다른 상품의 BOM 구성품으로 사용 중인 상품은 삭제할 수 없습니다."
+            }
+        )
     
     return None
 
@@ -1,12 +1,18 @@
 """
 Outbounds API - 출고 관리
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime, timezone
+from dateutil.relativedelta import relativedelta
+from postgrest.exceptions import APIError
 from app.core.supabase import supabase
 from app.core.config import settings
+from app.core.numbering import outbound_numbers
+from app.core.idempotency import run_idempotent
+from app.core.documents import DocumentStateMachine, to_utc_bound
+from app.core.auth import require_role
 
 router = APIRouter(prefix="/api/v1/outbounds", tags=["Outbounds"])
 
@@ -26,10 +32,24 @@ class OutboundItemUpdate(BaseModel):
     unit_price: Optional[float] = Field(None, ge=0)
 
 
+class OutboundItemLine(BaseModel):
+    """출고 라인 교체용 (id 없으면 신규 라인)"""
+    id: Optional[str] = None
+    item_id: str
+    qty: float = Field(gt=0)
+    unit_price: float = Field(ge=0, default=0)
+
+
+class OutboundItemsReplace(BaseModel):
+    """출고 라인 전체 교체"""
+    items: List[OutboundItemLine]
+
+
 class OutboundCreate(BaseModel):
     """출고 문서 생성"""
     store_id: Optional[str] = None
     customer_id: Optional[str] = None
+    warehouse_id: Optional[str] = None
     memo: Optional[str] = None
     items: List[OutboundItemCreate] = []
 
@@ -38,38 +58,90 @@ class OutboundUpdate(BaseModel):
     """출고 메타 업데이트"""
     store_id: Optional[str] = None
     customer_id: Optional[str] = None
+    warehouse_id: Optional[str] = None
     memo: Optional[str] = None
 
 
+class OutboundArchiveRequest(BaseModel):
+    """종결 출고 문서 보관"""
+    older_than_months: Optional[int] = Field(None, ge=1, description="기본: OUTBOUND_ARCHIVE_AFTER_MONTHS")
+
+
+class OutboundBatchTransition(BaseModel):
+    """출고 일괄 상태 전이"""
+    ids: List[str] = Field(..., min_length=1)
+    target_status: str = Field(..., description="CONFIRMED | POSTED | CANCELED")
+
+
+# 목록/상세 조회 컬럼 (검색용 search_text/search_vector 제외)
+OUTBOUND_COLUMNS = (
+    "id, outbound_no, status, store_id, customer_id, warehouse_id, memo, "
+    "line_count, total_qty, total_amount, created_at, updated_at"
+)
+
+
+# === 상태 전이 테이블 ===
+# 공통 규칙(app.core.documents) + 라인 전체 교체
+
+outbound_documents = DocumentStateMachine("outbounds", "outbound", extra_actions={
+    "replace_items": {
+        "from": ("DRAFT",), "to": None,
+        "error": "Only DRAFT outbounds can replace items"
+    },
+})
+
+
 # === 유틸리티 함수 ===
 
 def generate_outbound_no() -> str:
-    """출고 문서번호 생성: YYYYMMDD-####"""
-    today = datetime.now().strftime("%Y%m%d")
+    """출고 문서번호 생성: YYYYMMDD-#### (일자별 카운터 블록 할당)"""
+    return outbound_numbers.next_number()
+
+
+def raise_for_outbound_rpc(result: dict, action: str) -> None:
+    """출고 DB 함수 결과({"ok": false, "error": ...})를 HTTPException으로 변환 (출고 전용 오류 + 공통 오류)"""
+    error = (result or {}).get("error")
     
-    # 오늘 생성된 출고 문서 카운트
-    result = supabase.table("outbounds")\
-        .select("outbound_no")\
-        .like("outbound_no", f"{today}-%")\
-        .execute()
+    if error in ("line_not_found", "duplicate_line"):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": error,
+                "message": "Unknown outbound item ids" if error == "line_not_found" else "Duplicate outbound item ids",
+                "ids": result.get("ids", [])
+            }
+        )
     
-    count = len(result.data) + 1
-    return f"{today}-{count:04d}"
+    if error == "insufficient_stock":
+        shortages = result.get("shortages", [])
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "insufficient_stock",
+                "message": f"Insufficient stock for {len(shortages)} item(s)",
+                "shortages": shortages
+            }
+        )
+    
+    outbound_documents.raise_for_rpc(result, action)
 
 
-def log_flow(entity_id: str, from_status: Optional[str], to_status: str, actor: str = "system"):
-    """flows 테이블에 상태 전이 기록"""
-    try:
-        supabase.table("flows").insert({
-            "entity_type": "outbound",
-            "entity_id": entity_id,
-            "from_status": from_status,
-            "to_status": to_status,
-            "actor": actor,
-            "payload": {"timestamp": datetime.utcnow().isoformat()}
-        }).execute()
-    except Exception as e:
-        print(f"[WARN] Flow logging failed: {e}")
+def attach_outbound_items(rows: List[dict], include_archived: bool = False) -> None:
+    """문서 목록에 라인 추가 (문서 ID in_() 1회 조회)"""
+    if not rows:
+        return
+    
+    table = "outbound_items_all" if include_archived else "outbound_items"
+    items_result = supabase.table(table)\
+        .select("*")\
+        .in_("outbound_id", [row["id"] for row in rows])\
+        .execute()
+    
+    lines = {}
+    for line in items_result.data or []:
+        lines.setdefault(line["outbound_id"], []).append(line)
+    for row in rows:
+        row["items"] = lines.get(row["id"], [])
 
 
 # === API 엔드포인트 ===
@@ -78,26 +150,76 @@ def log_flow(entity_id: str, from_status: Optional[str], to_status: str, actor:
 def list_outbounds(
     status: Optional[str] = None,
     q: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
     page: int = 1,
-    size: int = 20
+    size: int = 20,
+    include_items: bool = False,
+    include_archived: bool = False
 ):
-    """출고 목록 조회"""
+    """
+    출고 목록 조회
+    
+    - 각 문서에 line_count / total_qty / total_amount 집계 포함
+    - **q**: 문서번호/메모/고객명/라인 SKU 검색 (DB 함수 `search_outbounds`, 랭킹순)
+    - **date_from / date_to**: 생성일 기간 (date_to 포함)
+    - **include_items**: true면 라인까지 함께 조회
+    - **include_archived**: true면 보관 문서 포함 (outbounds_all 뷰, 각 문서에 archived 표시)
+    """
     try:
         skip = (page - 1) * size
-        query = supabase.table("outbounds").select("*", count="exact")
-        
-        # 상태 필터
-        if status:
-            query = query.eq("status", status.upper())
-        
-        # 검색어 필터 (문서번호, 메모)
-        if q:
-            query = query.or_(f"outbound_no.ilike.%{q}%,memo.ilike.%{q}%")
+        status_filter = status.upper() if status else None
+        created_from = to_utc_bound(date_from)
+        created_to = to_utc_bound(date_to, next_day=True)
+        
+        # 검색어: 인덱스 기반 검색 함수 (파라미터 바인딩)
+        if q and q.strip():
+            result = supabase.rpc("search_outbounds", {
+                "p_query": q,
+                "p_status": status_filter,
+                "p_date_from": created_from,
+                "p_date_to": created_to,
+                "p_limit": size,
+                "p_offset": skip,
+                "p_include_archived": include_archived
+            }).execute()
+            
+            rows = result.data or []
+            data = [{**row["outbound"], "rank": row["rank"]} for row in rows]
+            
+            if include_items:
+                attach_outbound_items(data, include_archived)
+            
+            return {
+                "data": data,
+                "total": rows[0]["total"] if rows else 0,
+                "page": page,
+                "size": size
+            }
+        
+        if include_archived:
+            # 뷰는 관계 임베딩 불가 → 라인은 페이지 문서 ID로 따로 조회
+            query = supabase.table("outbounds_all").select(f"{OUTBOUND_COLUMNS}, archived", count="exact")
+        elif include_items:
+            query = supabase.table("outbounds").select(f"{OUTBOUND_COLUMNS}, items:outbound_items(*)", count="exact")
+        else:
+            query = supabase.table("outbounds").select(OUTBOUND_COLUMNS, count="exact")
+        
+        # 상태/기간 필터 (status, created_at 복합 인덱스)
+        if status_filter:
+            query = query.eq("status", status_filter)
+        if created_from:
+            query = query.gte("created_at", created_from)
+        if created_to:
+            query = query.lt("created_at", created_to)
         
         result = query.order("created_at", desc=True)\
             .range(skip, skip + size - 1)\
             .execute()
         
+        if include_archived and include_items:
+            attach_outbound_items(result.data, include_archived)
+        
         return {
             "data": result.data,
             "total": result.count,
@@ -109,98 +231,217 @@ def list_outbounds(
 
 
 @router.post("/", status_code=201)
-def create_outbound(data: OutboundCreate):
-    """출고 문서 생성 (DRAFT 상태)"""
-    try:
-        # 문서 생성
-        outbound_no = generate_outbound_no()
-        result = supabase.table("outbounds").insert({
-            "outbound_no": outbound_no,
-            "status": "DRAFT",
-            "store_id": data.store_id,
-            "customer_id": data.customer_id,
-            "memo": data.memo
+def create_outbound(
+    data: OutboundCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    출고 문서 생성 (DRAFT 상태)
+    
+    문서/라인/flow를 DB 함수 `create_outbound_with_items` 한 번으로 생성
+    (라인 실패 시 문서도 생성되지 않음)
+    
+    - **Idempotency-Key**: 재시도 시 같은 키를 보내면 문서를 중복 생성하지 않고 첫 응답 반환
+    """
+    def create() -> dict:
+        result = supabase.rpc("create_outbound_with_items", {
+            "p_outbound_no": generate_outbound_no(),
+            "p_header": {
+                "store_id": data.store_id,
+                "customer_id": data.customer_id,
+                "warehouse_id": data.warehouse_id,
+                "memo": data.memo
+            },
+            "p_items": [item.dict() for item in data.items],
+            "p_actor": "user:system"
         }).execute()
         
-        outbound = result.data[0]
-        outbound_id = outbound["id"]
-        
-        # 라인 아이템 추가
-        items_data = []
-        for item in data.items:
-            items_data.append({
-                "outbound_id": outbound_id,
-                "item_id": item.item_id,
-                "qty": item.qty,
-                "unit_price": item.unit_price
-            })
+        outbound = result.data
+        for column in ("search_text", "search_vector"):
+            outbound.pop(column, None)
         
-        if items_data:
-            supabase.table("outbound_items").insert(items_data).execute()
+        return {
+            "id": outbound["id"],
+            "outbound_no": outbound["outbound_no"],
+            "status": outbound["status"],
+            "items": outbound["items"],
+            "data": outbound
+        }
+    
+    try:
+        body, replayed = run_idempotent(idempotency_key, "outbounds:create", data.dict(), create)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return body
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch/transition")
+def batch_transition_outbounds(data: OutboundBatchTransition):
+    """
+    출고 문서 일괄 확정/반영/취소
+    
+    DB 함수 `transition_outbounds_batch`가 전체 문서를 한 트랜잭션에서 처리
+    - 재고 예약/차감은 대상 문서 전체를 품목별로 합산해 일괄 처리
+    - 합산 기준 재고 부족 시 요청 순서대로 가능한 문서만 처리
+    - 문서별 결과 반환 (실패 문서는 상태 그대로)
+    """
+    target = data.target_status.upper()
+    action = outbound_documents.action_by_target.get(target)
+    if not action:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid target_status: {data.target_status} (allowed: {', '.join(outbound_documents.action_by_target)})"
+        )
+    
+    ids = list(dict.fromkeys(data.ids))
+    if len(ids) > settings.OUTBOUND_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many outbounds: {len(ids)} (max {settings.OUTBOUND_BATCH_MAX_IDS})"
+        )
+    
+    try:
+        result = supabase.rpc("transition_outbounds_batch", {
+            "p_ids": ids,
+            "p_target": target,
+            "p_actor": "user:system"
+        }).execute()
         
-        # Flow 기록
-        log_flow(outbound_id, None, "DRAFT", "user:system")
+        results = []
+        for row in result.data or []:
+            if not row.get("ok"):
+                if row.get("error") == "not_found":
+                    row["message"] = "Outbound not found"
+                elif row.get("error") == "invalid_status":
+                    row["message"] = outbound_documents.status_error(action, row.get("status")).detail
+                elif row.get("error") == "no_items":
+                    row["message"] = f"Cannot {action} without items"
+                elif row.get("error") == "insufficient_stock":
+                    row["message"] = f"Insufficient stock for {len(row.get('shortages', []))} item(s)"
+            results.append(row)
+        
+        succeeded = sum(1 for row in results if row.get("ok"))
         
         return {
-            "id": outbound_id,
-            "outbound_no": outbound_no,
-            "status": "DRAFT",
-            "items": items_data
+            "target_status": target,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/archive")
+def archive_outbounds(
+    data: OutboundArchiveRequest,
+    current_user: dict = Depends(require_role(["admin", "manager"]))
+):
+    """
+    종결(POSTED/CANCELED) 출고 문서 보관 이동 (admin/manager)
+    
+    - 기준 개월 수 이전에 종결된 문서 + 라인 + 상태 이력을 보관 테이블로 이동
+    - DB 함수 `archive_closed_outbounds`를 배치 단위(트랜잭션별)로 반복 호출
+    - 요청당 최대 OUTBOUND_ARCHIVE_MAX_BATCHES 배치, 남은 문서가 있으면 has_more=true (다시 호출)
+    - 일일 작업은 pg_cron `run_outbound_archive` (수동 실행/백필용)
+    """
+    months = data.older_than_months or settings.OUTBOUND_ARCHIVE_AFTER_MONTHS
+    before = datetime.now(timezone.utc) - relativedelta(months=months)
+    totals = {"outbounds": 0, "items": 0, "flows": 0}
+    has_more = False
+    
+    try:
+        for _ in range(settings.OUTBOUND_ARCHIVE_MAX_BATCHES):
+            result = supabase.rpc("archive_closed_outbounds", {
+                "p_before": before.isoformat(),
+                "p_limit": settings.OUTBOUND_ARCHIVE_BATCH_SIZE
+            }).execute().data
+            
+            for key in totals:
+                totals[key] += result[key]
+            has_more = result["has_more"]
+            if not has_more:
+                break
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to archive outbounds: {e}")
+    
+    return {"ok": True, "before": before.isoformat(), "has_more": has_more, **totals}
+
+
 @router.get("/{outbound_id}")
-def get_outbound(outbound_id: str):
-    """출고 문서 상세 조회"""
+def get_outbound(outbound_id: str, include_archived: bool = False):
+    """
+    출고 문서 상세 조회 (라인 포함, embedded select 1회)
+    
+    - **include_archived**: true면 활성 문서에 없을 때 보관 문서 조회
+    """
     try:
-        # 문서 조회
         result = supabase.table("outbounds")\
-            .select("*")\
+            .select(f"{OUTBOUND_COLUMNS}, items:outbound_items(*)")\
             .eq("id", outbound_id)\
-            .single()\
-            .execute()
-        
-        outbound = result.data
-        
-        # 라인 아이템 조회
-        items_result = supabase.table("outbound_items")\
-            .select("*")\
-            .eq("outbound_id", outbound_id)\
             .execute()
         
-        outbound["items"] = items_result.data
+        if result.data:
+            return {"data": {**result.data[0], "archived": False}}
         
-        return {"data": outbound}
+        if include_archived:
+            result = supabase.table("outbounds_archive")\
+                .select(f"{OUTBOUND_COLUMNS}, archived_at, items:outbound_items_archive(*)")\
+                .eq("id", outbound_id)\
+                .execute()
+            
+            if result.data:
+                return {"data": {**result.data[0], "archived": True}}
     except Exception as e:
         raise HTTPException(status_code=404, detail="Outbound not found")
+    
+    raise HTTPException(status_code=404, detail="Outbound not found")
 
 
 @router.patch("/{outbound_id}")
 def update_outbound(outbound_id: str, data: OutboundUpdate):
-    """출고 메타 업데이트 (DRAFT만 가능)"""
+    """출고 메타 업데이트 (DRAFT만 가능, 상태 조건부 UPDATE 1회)"""
     try:
-        # 상태 확인
-        result = supabase.table("outbounds")\
-            .select("status")\
-            .eq("id", outbound_id)\
-            .single()\
-            .execute()
+        outbound_documents.transition(outbound_id, "update", data.dict(exclude_none=True))
         
-        if result.data["status"] != "DRAFT":
-            raise HTTPException(status_code=400, detail="Only DRAFT outbounds can be updated")
-        
-        # 업데이트
-        update_data = data.dict(exclude_none=True)
-        update_data["updated_at"] = datetime.utcnow().isoformat()
+        return {"ok": True}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/{outbound_id}/items")
+def replace_outbound_items(outbound_id: str, data: OutboundItemsReplace):
+    """
+    라인 아이템 전체 교체 (DRAFT만 가능)
+    
+    요청 본문은 최종 라인 집합이며, DB 함수 `replace_outbound_items`가
+    기존 라인과의 차이(추가/수정/삭제)를 계산해 한 트랜잭션에서 일괄 적용
+    - id 있는 라인: 수정 (값이 바뀐 경우만)
+    - id 없는 라인: 추가
+    - 본문에 없는 기존 라인: 삭제
+    """
+    try:
+        result = supabase.rpc("replace_outbound_items", {
+            "p_outbound_id": outbound_id,
+            "p_items": [line.dict(exclude_none=True) for line in data.items]
+        }).execute()
         
-        supabase.table("outbounds")\
-            .update(update_data)\
-            .eq("id", outbound_id)\
-            .execute()
+        raise_for_outbound_rpc(result.data, "replace_items")
         
-        return {"ok": True}
+        return {
+            "ok": True,
+            "inserted": result.data["inserted"],
+            "updated": result.data["updated"],
+            "deleted": result.data["deleted"],
+            "items": result.data["items"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -209,19 +450,8 @@ def update_outbound(outbound_id: str, data: OutboundUpdate):
 
 @router.post("/{outbound_id}/items")
 def add_outbound_item(outbound_id: str, item: OutboundItemCreate):
-    """라인 아이템 추가 (DRAFT만 가능)"""
+    """라인 아이템 추가 (DRAFT만 가능, 상태는 가드 트리거에서 검증)"""
     try:
-        # 상태 확인
-        result = supabase.table("outbounds")\
-            .select("status")\
-            .eq("id", outbound_id)\
-            .single()\
-            .execute()
-        
-        if result.data["status"] != "DRAFT":
-            raise HTTPException(status_code=400, detail="Only DRAFT outbounds can add items")
-        
-        # 라인 추가
         supabase.table("outbound_items").insert({
             "outbound_id": outbound_id,
             "item_id": item.item_id,
@@ -230,6 +460,8 @@ def add_outbound_item(outbound_id: str, item: OutboundItemCreate):
         }).execute()
         
         return {"ok": True}
+    except APIError as e:
+        outbound_documents.raise_for_line_guard(e, "add_item")
     except HTTPException:
         raise
     except Exception as e:
@@ -238,29 +470,23 @@ def add_outbound_item(outbound_id: str, item: OutboundItemCreate):
 
 @router.patch("/{outbound_id}/items/{item_id}")
 def update_outbound_item(outbound_id: str, item_id: str, data: OutboundItemUpdate):
-    """라인 아이템 수정 (DRAFT만 가능)"""
+    """라인 아이템 수정 (DRAFT만 가능, 상태는 가드 트리거에서 검증)"""
     try:
-        # 상태 확인
-        result = supabase.table("outbounds")\
-            .select("status")\
-            .eq("id", outbound_id)\
-            .single()\
-            .execute()
-        
-        if result.data["status"] != "DRAFT":
-            raise HTTPException(status_code=400, detail="Only DRAFT outbounds can update items")
-        
-        # 라인 수정
         update_data = data.dict(exclude_none=True)
         update_data["updated_at"] = datetime.utcnow().isoformat()
         
-        supabase.table("outbound_items")\
+        result = supabase.table("outbound_items")\
             .update(update_data)\
             .eq("id", item_id)\
             .eq("outbound_id", outbound_id)\
             .execute()
         
+        if not result.data:
+            raise HTTPException(status_code=404, detail="Outbound item not found")
+        
         return {"ok": True}
+    except APIError as e:
+        outbound_documents.raise_for_line_guard(e, "update_item")
     except HTTPException:
         raise
     except Exception as e:
@@ -269,26 +495,20 @@ def update_outbound_item(outbound_id: str, item_id: str, data: OutboundItemUpdat
 
 @router.delete("/{outbound_id}/items/{item_id}")
 def delete_outbound_item(outbound_id: str, item_id: str):
-    """라인 아이템 삭제 (DRAFT만 가능)"""
+    """라인 아이템 삭제 (DRAFT만 가능, 상태는 가드 트리거에서 검증)"""
     try:
-        # 상태 확인
-        result = supabase.table("outbounds")\
-            .select("status")\
-            .eq("id", outbound_id)\
-            .single()\
-            .execute()
-        
-        if result.data["status"] != "DRAFT":
-            raise HTTPException(status_code=400, detail="Only DRAFT outbounds can delete items")
-        
-        # 라인 삭제
-        supabase.table("outbound_items")\
+        result = supabase.table("outbound_items")\
             .delete()\
             .eq("id", item_id)\
             .eq("outbound_id", outbound_id)\
             .execute()
         
+        if not result.data:
+            raise HTTPException(status_code=404, detail="Outbound item not found")
+        
         return {"ok": True}
+    except APIError as e:
+        outbound_documents.raise_for_line_guard(e, "delete_item")
     except HTTPException:
         raise
     except Exception as e:
@@ -296,42 +516,34 @@ def delete_outbound_item(outbound_id: str, item_id: str):
 
 
 @router.post("/{outbound_id}/confirm")
-def confirm_outbound(outbound_id: str):
-    """출고 확정 (DRAFT → CONFIRMED)"""
-    try:
-        # 상태 확인
-        result = supabase.table("outbounds")\
-            .select("status")\
-            .eq("id", outbound_id)\
-            .single()\
-            .execute()
-        
-        current_status = result.data["status"]
-        if current_status != "DRAFT":
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cannot confirm from status: {current_status}"
-            )
-        
-        # 라인 아이템 검증
-        items_result = supabase.table("outbound_items")\
-            .select("*")\
-            .eq("outbound_id", outbound_id)\
-            .execute()
-        
-        if not items_result.data:
-            raise HTTPException(status_code=400, detail="Cannot confirm without items")
-        
-        # 상태 업데이트
-        supabase.table("outbounds")\
-            .update({"status": "CONFIRMED", "updated_at": datetime.utcnow().isoformat()})\
-            .eq("id", outbound_id)\
-            .execute()
+def confirm_outbound(
+    outbound_id: str,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    출고 확정 (DRAFT → CONFIRMED) - 재고 예약
+    
+    DB 함수 `confirm_outbound`가 상태/라인 확인, 전체 라인 재고 예약(부족 시 전체 거부),
+    상태 변경, flow 기록을 한 트랜잭션으로 처리
+    
+    - **Idempotency-Key**: 재시도 시 같은 키를 보내면 첫 응답을 그대로 반환
+    """
+    def confirm() -> dict:
+        result = supabase.rpc("confirm_outbound", {
+            "p_outbound_id": outbound_id,
+            "p_actor": "user:system"
+        }).execute()
         
-        # Flow 기록
-        log_flow(outbound_id, "DRAFT", "CONFIRMED", "user:system")
+        raise_for_outbound_rpc(result.data, "confirm")
         
         return {"status": "CONFIRMED"}
+    
+    try:
+        body, replayed = run_idempotent(idempotency_key, f"outbounds:{outbound_id}:confirm", {}, confirm)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return body
     except HTTPException:
         raise
     except Exception as e:
@@ -339,71 +551,34 @@ def confirm_outbound(outbound_id: str):
 
 
 @router.post("/{outbound_id}/post")
-def post_outbound(outbound_id: str):
-    """출고 반영 (CONFIRMED → POSTED) - 재고 차감"""
-    try:
-        # 상태 확인
-        result = supabase.table("outbounds")\
-            .select("status")\
-            .eq("id", outbound_id)\
-            .single()\
-            .execute()
-        
-        current_status = result.data["status"]
-        if current_status != "CONFIRMED":
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cannot post from status: {current_status}"
-            )
-        
-        # 라인 아이템 조회
-        items_result = supabase.table("outbound_items")\
-            .select("item_id, qty")\
-            .eq("outbound_id", outbound_id)\
-            .execute()
-        
-        # 재고 차감 (각 아이템별)
-        for item in items_result.data:
-            item_id = item["item_id"]
-            qty = item["qty"]
-            
-            # 현재 재고 확인
-            stock_result = supabase.table("stocks")\
-                .select("onhand")\
-                .eq("item_id", item_id)\
-                .single()\
-                .execute()
-            
-            if not stock_result.data:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Stock not found for item: {item_id}"
-                )
-            
-            current_onhand = stock_result.data["onhand"]
-            if current_onhand < qty:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Insufficient stock for item: {item_id} (available: {current_onhand}, required: {qty})"
-                )
-            
-            # 재고 차감
-            new_onhand = current_onhand - qty
-            supabase.table("stocks")\
-                .update({"onhand": new_onhand, "updated_at": datetime.utcnow().isoformat()})\
-                .eq("item_id", item_id)\
-                .execute()
-        
-        # 상태 업데이트
-        supabase.table("outbounds")\
-            .update({"status": "POSTED", "updated_at": datetime.utcnow().isoformat()})\
-            .eq("id", outbound_id)\
-            .execute()
+def post_outbound(
+    outbound_id: str,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    출고 반영 (CONFIRMED → POSTED) - 재고 차감
+    
+    DB 함수 `post_outbound`가 상태 확인, 전체 라인 재고 차감(부족 시 전체 거부),
+    상태 변경, flow 기록을 한 트랜잭션으로 처리
+    
+    - **Idempotency-Key**: 재시도 시 같은 키를 보내면 첫 응답을 그대로 반환
+    """
+    def post() -> dict:
+        result = supabase.rpc("post_outbound", {
+            "p_outbound_id": outbound_id,
+            "p_actor": "user:system"
+        }).execute()
         
-        # Flow 기록
-        log_flow(outbound_id, "CONFIRMED", "POSTED", "user:system")
+        raise_for_outbound_rpc(result.data, "post")
         
         return {"status": "POSTED"}
+    
+    try:
+        body, replayed = run_idempotent(idempotency_key, f"outbounds:{outbound_id}:post", {}, post)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return body
     except HTTPException:
         raise
     except Exception as e:
@@ -412,33 +587,18 @@ def post_outbound(outbound_id: str):
 
 @router.post("/{outbound_id}/cancel")
 def cancel_outbound(outbound_id: str):
-    """출고 취소 (DRAFT/CONFIRMED → CANCELED)"""
+    """
+    출고 취소 (DRAFT/CONFIRMED → CANCELED)
+    
+    CONFIRMED 문서는 예약된 재고를 함께 해제 (DB 함수 `cancel_outbound`)
+    """
     try:
-        # 상태 확인
-        result = supabase.table("outbounds")\
-            .select("status")\
-            .eq("id", outbound_id)\
-            .single()\
-            .execute()
-        
-        current_status = result.data["status"]
-        if current_status == "POSTED":
-            raise HTTPException(
-                status_code=400,
-                detail="Cannot cancel POSTED outbound (use return flow)"
-            )
-        
-        if current_status == "CANCELED":
-            raise HTTPException(status_code=400, detail="Already canceled")
-        
-        # 상태 업데이트
-        supabase.table("outbounds")\
-            .update({"status": "CANCELED", "updated_at": datetime.utcnow().isoformat()})\
-            .eq("id", outbound_id)\
-            .execute()
+        result = supabase.rpc("cancel_outbound", {
+            "p_outbound_id": outbound_id,
+            "p_actor": "user:system"
+        }).execute()
         
-        # Flow 기록
-        log_flow(outbound_id, current_status, "CANCELED", "user:system")
+        raise_for_outbound_rpc(result.data, "cancel")
         
         return {"status": "CANCELED"}
     except HTTPException:
@@ -0,0 +1,232 @@
+"""
+Replenishment API
+발주 제안 (출고 이력 기반 수요 + 안전재고 + BOM 전개)
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+import numpy as np
+from fastapi import APIRouter, HTTPException, Depends, Query
+from app.core.supabase import supabase
+from app.core.config import settings
+from app.core.auth import get_current_user_with_permission
+from app.services.replenishment import daily_rate, index_bom, suggest
+
+router = APIRouter(prefix="/api/v1/replenishment", tags=["Replenishment"])
+
+# 계산 결과 캐시 {(window, lead_time, review): (계산 시각, 결과)}
+_cache: dict = {}
+_cache_lock = threading.Lock()
+# 키별 계산 잠금 (같은 키 동시 캐시 미스는 한 요청만 계산)
+_compute_locks: dict = {}
+
+
+# ============================================================================
+# Helper Functions
+# ============================================================================
+
+def fetch_rpc_keyset(fn: str, params: dict) -> List[dict]:
+    """item_id 키셋 페이지 RPC 전체 조회 (PostgREST max-rows 제한 회피)"""
+    rows: List[dict] = []
+    last_id = None
+    page_size = settings.REPLENISH_FETCH_PAGE_SIZE
+    
+    while True:
+        page = supabase.rpc(fn, {**params, "p_after": last_id, "p_limit": page_size}).execute().data or []
+        rows.extend(page)
+    
+        if len(page) < page_size:
+            return rows
+        last_id = page[-1]["item_id"]
+
+
+def fetch_bom() -> List[dict]:
+    """bom_components 전체 조회 (id 키셋 페이지)"""
+    rows: List[dict] = []
+    last_id = None
+    page_size = settings.REPLENISH_FETCH_PAGE_SIZE
+    
+    while True:
+        query = supabase.table("bom_components").select("id, parent_item_id, component_item_id, quantity")
+        if last_id:
+            query = query.gt("id", last_id)
+    
+        page = query.order("id").limit(page_size).execute().data or []
+        rows.extend(page)
+    
+        if len(page) < page_size:
+            return rows
+        last_id = page[-1]["id"]
+
+
+def compute_suggestions(window_days: int, lead_time_days: int, review_days: int) -> dict:
+    """
+    전 품목 발주 제안 계산
+    
+    출고 이력 / 공급 현황 / BOM을 한 인덱스 공간의 배열로 적재 후 일괄 계산
+    """
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=window_days - 1)
+    
+    demand = fetch_rpc_keyset("get_daily_outbound_demand", {
+        "p_from": start.isoformat(),
+        "p_to": end.isoformat()
+    })
+    supply = fetch_rpc_keyset("get_replenishment_supply", {})
+    bom = fetch_bom()
+    
+    item_ids = sorted(
+        {row["item_id"] for row in demand}
+        | {row["item_id"] for row in supply}
+        | {b["parent_item_id"] for b in bom}
+        | {b["component_item_id"] for b in bom}
+    )
+    index = {item_id: k for k, item_id in enumerate(item_ids)}
+    n_items = len(item_ids)
+    
+    item_idx = np.array(
+        [index[row["item_id"]] for row in demand for _ in row["days"]],
+        dtype=np.int64
+    )
+    day_idx = np.array([d for row in demand for d in row["days"]], dtype=np.int64)
+    qty = np.array([float(q) for row in demand for q in row["qtys"]])
+    rate = daily_rate(item_idx, day_idx, qty, n_items, window_days, window_days)
+    
+    onhand = np.zeros(n_items)
+    available = np.zeros(n_items)
+    safety_stock = np.zeros(n_items)
+    on_order = np.zeros(n_items)
+    for row in supply:
+        k = index[row["item_id"]]
+        onhand[k] = float(row["onhand"])
+        available[k] = float(row["available"])
+        safety_stock[k] = float(row["safety_stock"])
+        on_order[k] = float(row["on_order"])
+    
+    parent_idx, component_idx, component_qty = index_bom(bom, index)
+    result = suggest(
+        rate, available, on_order, safety_stock,
+        parent_idx, component_idx, component_qty,
+        lead_time_days + review_days,
+        settings.REPLENISH_BOM_MAX_DEPTH
+    )
+    
+    has_bom = np.zeros(n_items, dtype=bool)
+    has_bom[parent_idx] = True
+    
+    data = [
+        {
+            "item_id": item_ids[k],
+            "action": "make" if has_bom[k] else "purchase",
+            "suggested_qty": round(float(result["suggested"][k]), 4),
+            "daily_rate": round(float(result["daily_rate"][k]), 4),
+            "independent_demand": round(float(result["independent"][k]), 4),
+            "dependent_demand": round(float(result["dependent"][k]), 4),
+            "onhand": float(onhand[k]),
+            "available": float(available[k]),
+            "on_order": float(on_order[k]),
+            "safety_stock": float(safety_stock[k])
+        }
+        for k in np.flatnonzero(result["suggested"] > 0)
+    ]
+    
+    return {
+        "window": {"from": start.isoformat(), "to": end.isoformat()},
+        "horizon_days": lead_time_days + review_days,
+        "item_count": n_items,
+        "computed_at": datetime.utcnow().isoformat(),
+        "data": data
+    }
+
+
+def compute_lock(key: tuple) -> threading.Lock:
+    """파라미터 조합별 계산 잠금"""
+    with _cache_lock:
+        return _compute_locks.setdefault(key, threading.Lock())
+
+
+def attach_item_info(rows: List[dict]) -> List[dict]:
+    """제안 행에 품목 SKU/이름 추가 (in_() 청크 조회)"""
+    info = {}
+    chunk = settings.STOCKS_BATCH_MAX_IDS
+    ids = [row["item_id"] for row in rows]
+    
+    for start in range(0, len(ids), chunk):
+        result = supabase.table("items")\
+            .select("id, sku, name")\
+            .in_("id", ids[start:start + chunk])\
+            .execute()
+        info.update({item["id"]: item for item in result.data or []})
+    
+    for row in rows:
+        item = info.get(row["item_id"], {})
+        row["sku"] = item.get("sku")
+        row["name"] = item.get("name")
+    return rows
+
+
+# ============================================================================
+# API Endpoints
+# ============================================================================
+
+@router.get("/suggestions")
+def get_replenishment_suggestions(
+    window_days: Optional[int] = Query(None, ge=1, le=365, description="수요 평균 기간 (일)"),
+    lead_time_days: Optional[int] = Query(None, ge=0, le=365, description="조달 리드타임 (일)"),
+    review_days: Optional[int] = Query(None, ge=0, le=365, description="발주 주기 (일)"),
+    action: Optional[str] = Query(None, description="purchase | make"),
+    refresh: bool = Query(False, description="캐시 무시하고 재계산"),
+    current_user: dict = Depends(get_current_user_with_permission("stocks:read"))
+):
+    """
+    발주 제안 목록 (제안 수량 > 0 품목)
+    
+    - 일평균 출고량: 최근 window_days일(어제까지) 반영(POSTED) 출고 기준
+    - 제안 수량 = max(0, 안전재고 + 일평균 × (리드타임 + 발주 주기) + 종속 수요 - 가용재고 - 입고 예정)
+    - 종속 수요: 완제품 순소요를 bom_components로 전개 (BOM 있는 품목은 action=make)
+    - 파라미터 조합별로 REPLENISH_CACHE_TTL_SECONDS 동안 캐시
+    - 같은 조합의 동시 캐시 미스/refresh는 한 요청만 계산하고 결과 공유
+    - 계산이 동기 I/O + NumPy라 일반 def (스레드풀 실행, 이벤트 루프 비차단)
+    """
+    if action and action not in ("purchase", "make"):
+        raise HTTPException(status_code=400, detail=f"Invalid action: {action}")
+    
+    key = (
+        window_days or settings.REPLENISH_WINDOW_DAYS,
+        settings.REPLENISH_LEAD_TIME_DAYS if lead_time_days is None else lead_time_days,
+        settings.REPLENISH_REVIEW_DAYS if review_days is None else review_days
+    )
+    requested_at = time.monotonic()
+    
+    def usable(entry: Optional[tuple]) -> bool:
+        if not entry:
+            return False
+        if refresh:
+            # 요청 이후 완료된 계산이면 재사용
+            return entry[0] >= requested_at
+        return requested_at - entry[0] <= settings.REPLENISH_CACHE_TTL_SECONDS
+    
+    with _cache_lock:
+        cached = _cache.get(key)
+    
+    if not usable(cached):
+        with compute_lock(key):
+            with _cache_lock:
+                cached = _cache.get(key)
+    
+            if not usable(cached):
+                try:
+                    result = compute_suggestions(*key)
+                    attach_item_info(result["data"])
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail=str(e))
+    
+                cached = (time.monotonic(), result)
+                with _cache_lock:
+                    _cache[key] = cached
+    
+    result = cached[1]
+    data = [row for row in result["data"] if not action or row["action"] == action]
+    
+    return {**result, "data": data, "count": len(data)}
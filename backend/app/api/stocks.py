@@ -0,0 +1,312 @@
+"""
+Stocks API
+재고 조회 API (일괄 조회, 안전재고 미달, 가용재고/ATP, 시점 재고)
+"""
+from datetime import date, datetime, time, timezone
+from typing import List, Optional, Tuple
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Depends, Query
+from pydantic import BaseModel, Field
+from app.core.supabase import supabase
+from app.core.config import settings
+from app.core.auth import get_current_user_with_permission
+
+router = APIRouter(prefix="/api/v1/stocks", tags=["Stocks"])
+
+
+# ============================================================================
+# Pydantic Models
+# ============================================================================
+
+class AtpLine(BaseModel):
+    item_id: str
+    qty: float = Field(..., gt=0)
+
+
+class AtpRequest(BaseModel):
+    lines: List[AtpLine] = Field(..., min_length=1)
+
+
+class AtpItem(BaseModel):
+    item_id: str
+    onhand: float
+    reserved: float
+    available: float
+    version: int
+    requested: float = 0
+    fulfillable: bool = True
+
+
+class AtpResponse(BaseModel):
+    data: List[AtpItem]
+    all_fulfillable: bool
+    missing: List[str] = []
+
+
+class StockAsOfItem(BaseModel):
+    item_id: str
+    onhand: float
+    snapshot_at: Optional[datetime] = None
+
+
+class StockAsOfResponse(BaseModel):
+    as_of: datetime
+    data: List[StockAsOfItem]
+    missing: List[str] = []
+
+
+class StockSnapshotRequest(BaseModel):
+    at: Optional[datetime] = Field(None, description="스냅샷 시점 (기본: 당일 00:00)")
+
+
+# ============================================================================
+# Helper Functions
+# ============================================================================
+
+def parse_item_ids(item_ids: Optional[str]) -> List[str]:
+    """쉼표로 구분된 상품 ID 목록 파싱 (중복 제거, 순서 유지)"""
+    if not item_ids:
+        return []
+    return list(dict.fromkeys(i.strip() for i in item_ids.split(",") if i.strip()))
+
+
+def parse_low_cursor(after: str) -> Tuple[str, Optional[str]]:
+    """next_cursor("item_id:warehouse_id") → (item_id, warehouse_id 또는 None), UUID가 아니면 400"""
+    after_item, _, after_warehouse = after.partition(":")
+    try:
+        item_id = str(UUID(after_item))
+        warehouse_id = str(UUID(after_warehouse)) if after_warehouse else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return item_id, warehouse_id
+
+
+def fetch_atp(item_ids: List[str]) -> dict:
+    """품목별 가용재고 조회 (DB 함수 get_available_to_promise, 1회 호출, UUID가 아닌 ID는 400)"""
+    invalid = []
+    for item_id in item_ids:
+        try:
+            UUID(item_id)
+        except ValueError:
+            invalid.append(item_id)
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "invalid_item_ids", "message": "Invalid item ids", "ids": invalid}
+        )
+    
+    try:
+        result = supabase.rpc("get_available_to_promise", {"p_item_ids": item_ids}).execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {row["item_id"]: row for row in result.data or []}
+
+
+# ============================================================================
+# API Endpoints
+# ============================================================================
+
+@router.get("/")
+async def get_stocks(
+    item_ids: Optional[str] = Query(None, description="쉼표로 구분된 상품 ID 목록 (일괄 조회)"),
+    warehouse_id: Optional[str] = Query(None, description="창고 필터"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100)
+):
+    """
+    재고 조회 (창고별 행)
+    
+    - 기존 main.py 엔드포인트와 같은 공개 접근 (인증 없음)
+    - **item_ids**: 지정 시 해당 품목만 in_() 1회 조회 (요청 순서 유지, 없는 ID는 missing)
+    - **warehouse_id**: 창고 필터
+    - 미지정 시 page/limit 페이지 조회
+    - 창고 합계는 `/atp` (stock_totals 조회)
+    """
+    ids = parse_item_ids(item_ids)
+    
+    if len(ids) > settings.STOCKS_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many item_ids: {len(ids)} (max {settings.STOCKS_BATCH_MAX_IDS})"
+        )
+    
+    try:
+        query = supabase.table("stocks").select("*")
+        if warehouse_id:
+            query = query.eq("warehouse_id", warehouse_id)
+        
+        if ids:
+            result = query.in_("item_id", ids).execute()
+            
+            rows = {}
+            for row in result.data or []:
+                rows.setdefault(row["item_id"], []).append(row)
+            
+            data = [row for i in ids for row in rows.get(i, [])]
+            return {"data": data, "count": len(data), "missing": [i for i in ids if i not in rows]}
+        
+        skip = (page - 1) * limit
+        result = query.range(skip, skip + limit - 1).execute()
+        return {"data": result.data, "count": len(result.data)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/low")
+async def get_low_stocks(
+    warehouse_id: Optional[str] = Query(None, description="창고 필터"),
+    after: Optional[str] = Query(None, description="이전 페이지의 next_cursor"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(get_current_user_with_permission("stocks:read"))
+):
+    """
+    안전재고 미달 목록 (키셋 페이지네이션)
+    
+    - stocks.is_low (onhand < safety_stock 생성 컬럼) 부분 인덱스로 미달 행만 조회
+    - 창고별 행 단위, (item_id, warehouse_id) 순 정렬
+    - next_cursor("item_id:warehouse_id")를 다음 요청의 after로 전달
+    """
+    cursor = parse_low_cursor(after) if after else None
+    
+    try:
+        query = supabase.table("stocks").select("*").eq("is_low", True)
+        
+        if warehouse_id:
+            query = query.eq("warehouse_id", warehouse_id)
+        if cursor:
+            after_item, after_warehouse = cursor
+            if after_warehouse:
+                tie = f"warehouse_id.gt.{after_warehouse}"
+            else:
+                tie = "warehouse_id.not.is.null"
+            query = query.or_(f"item_id.gt.{after_item},and(item_id.eq.{after_item},{tie})")
+        
+        result = query.order("item_id")\
+            .order("warehouse_id", nullsfirst=True)\
+            .limit(limit + 1)\
+            .execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    rows = result.data or []
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    for row in rows:
+        row["shortage"] = row["safety_stock"] - row["onhand"]
+    
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = f"{last['item_id']}:{last.get('warehouse_id') or ''}"
+    
+    return {
+        "data": rows,
+        "count": len(rows),
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/atp", response_model=AtpResponse)
+async def get_atp(
+    item_ids: str = Query(..., description="쉼표로 구분된 상품 ID 목록"),
+    current_user: dict = Depends(get_current_user_with_permission("stocks:read"))
+):
+    """
+    가용재고(ATP) 일괄 조회
+    
+    - 창고 전체 합계 (stock_totals, 품목당 PK 조회 1회 / 읽기 시 합산 없음)
+    - available = onhand - reserved (출고 확정 시 예약, 반영/취소 시 해제)
+    """
+    ids = parse_item_ids(item_ids)
+    if not ids:
+        raise HTTPException(status_code=400, detail="item_ids is required")
+    
+    rows = fetch_atp(ids)
+    
+    return AtpResponse(
+        data=[AtpItem(**rows[i]) for i in ids if i in rows],
+        all_fulfillable=all(i in rows for i in ids),
+        missing=[i for i in ids if i not in rows]
+    )
+
+
+@router.post("/atp", response_model=AtpResponse)
+async def check_atp(
+    atp_in: AtpRequest,
+    current_user: dict = Depends(get_current_user_with_permission("stocks:read"))
+):
+    """
+    요청 수량 기준 출고 가능 여부 확인 (동일 품목 라인은 합산)
+    """
+    requested = {}
+    for line in atp_in.lines:
+        requested[line.item_id] = requested.get(line.item_id, 0) + line.qty
+    
+    rows = fetch_atp(list(requested))
+    
+    data = [
+        AtpItem(**rows[i], requested=qty, fulfillable=rows[i]["available"] >= qty)
+        for i, qty in requested.items() if i in rows
+    ]
+    missing = [i for i in requested if i not in rows]
+    
+    return AtpResponse(
+        data=data,
+        all_fulfillable=not missing and all(item.fulfillable for item in data),
+        missing=missing
+    )
+
+
+@router.get("/as-of", response_model=StockAsOfResponse)
+async def get_stock_as_of(
+    as_of_date: date = Query(..., alias="date", description="기준일 (해당일 종료 시점 재고)"),
+    item_ids: Optional[str] = Query(None, description="쉼표로 구분된 상품 ID 목록 (생략 시 전체)"),
+    current_user: dict = Depends(get_current_user_with_permission("stocks:read"))
+):
+    """
+    시점 재고 조회
+    
+    DB 함수 `get_stock_as_of`가 품목별로 기준 시점 이전의 가장 가까운 스냅샷에
+    이후 이동(stock_movements) 합계만 더해 계산 (원장 전체 재생 없음)
+    """
+    as_of = datetime.combine(as_of_date, time.max, tzinfo=timezone.utc)
+    ids = parse_item_ids(item_ids)
+    
+    try:
+        result = supabase.rpc("get_stock_as_of", {
+            "p_at": as_of.isoformat(),
+            "p_item_ids": ids or None
+        }).execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    rows = {row["item_id"]: row for row in result.data or []}
+    
+    return StockAsOfResponse(
+        as_of=as_of,
+        data=[StockAsOfItem(**rows[i]) for i in ids if i in rows] if ids else [
+            StockAsOfItem(**row) for row in rows.values()
+        ],
+        missing=[i for i in ids if i not in rows]
+    )
+
+
+@router.post("/snapshots")
+async def create_stock_snapshots(
+    snapshot_in: StockSnapshotRequest,
+    current_user: dict = Depends(get_current_user_with_permission("stocks:update"))
+):
+    """
+    품목별 재고 스냅샷 작성 (일일 작업은 pg_cron, 수동 실행/백필용)
+    
+    - 같은 시점 스냅샷이 이미 있는 품목은 건너뜀
+    """
+    try:
+        result = supabase.rpc("take_stock_snapshots", {
+            "p_at": snapshot_in.at.isoformat() if snapshot_in.at else None
+        }).execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {"ok": True, "created": result.data}
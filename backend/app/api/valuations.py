@@ -0,0 +1,311 @@
+"""
+Valuations API
+재고 평가 (이동평균 / 선입선출) 실행 및 결과 조회
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timezone
+from typing import List, Optional
+import numpy as np
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query
+from pydantic import BaseModel, Field
+from app.core.supabase import supabase
+from app.core.config import settings
+from app.core.auth import get_current_user_with_permission
+from app.services.valuation import METHODS, split_chunks, value_chunk
+
+router = APIRouter(prefix="/api/v1/valuations", tags=["Valuations"])
+
+
+# ============================================================================
+# Pydantic Models
+# ============================================================================
+
+class ValuationRunRequest(BaseModel):
+    as_of: Optional[date] = Field(None, description="평가 기준일 (해당일 종료 시점, 기본: 오늘)")
+    methods: List[str] = Field(default_factory=lambda: list(METHODS), min_length=1)
+
+
+# ============================================================================
+# Helper Functions
+# ============================================================================
+
+def fetch_keyset(table: str, columns: str, as_of: Optional[str] = None) -> List[dict]:
+    """id 키셋 페이지로 전체 행 조회 (PostgREST max-rows 제한 회피)"""
+    rows: List[dict] = []
+    last_id = None
+    page_size = settings.VALUATION_FETCH_PAGE_SIZE
+    
+    while True:
+        query = supabase.table(table).select(columns)
+        if as_of:
+            query = query.lte("created_at", as_of)
+        if last_id:
+            query = query.gt("id", last_id)
+        
+        page = query.order("id").limit(page_size).execute().data or []
+        rows.extend(page)
+        
+        if len(page) < page_size:
+            return rows
+        last_id = page[-1]["id"]
+
+
+def fetch_direct(table: str, columns: str, as_of: Optional[str] = None) -> List[dict]:
+    """
+    DATABASE_URL 직접 연결로 전체 행 조회 (쿼리 1회, 서버 측 커서로 묶음 단위 수신)
+    
+    PostgREST 페이지마다 HTTP 왕복 + JSON 변환 + 키셋 재탐색을 하던 것을
+    하나의 쿼리 실행으로 대체 (table/columns는 내부 상수만 전달)
+    """
+    import psycopg2
+    import psycopg2.extras
+    
+    sql = f"SELECT {columns} FROM {table}"
+    params = []
+    if as_of:
+        sql += " WHERE created_at <= %s"
+        params.append(as_of)
+    sql += " ORDER BY id"
+    
+    conn = psycopg2.connect(settings.DATABASE_URL)
+    try:
+        with conn.cursor(name=f"valuation_{table}", cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.itersize = settings.VALUATION_DB_FETCH_SIZE
+            cur.execute(sql, params)
+            return [dict(row) for row in cur]
+    finally:
+        conn.close()
+
+
+def fetch_all(table: str, columns: str, as_of: Optional[str] = None) -> List[dict]:
+    """전체 행 조회 (DATABASE_URL 설정 시 직접 연결, 아니면 PostgREST 키셋 페이지)"""
+    if settings.DATABASE_URL:
+        try:
+            return fetch_direct(table, columns, as_of)
+        except ImportError as e:
+            print(f"[WARN] Valuation direct load disabled: {e}")
+    return fetch_keyset(table, columns, as_of)
+
+
+def to_timestamp(value) -> float:
+    """created_at (PostgREST 문자열 / psycopg2 datetime) → epoch 초"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+def build_arrays(movements: List[dict], unit_costs: dict):
+    """원장 행 → 품목 순/시간 순 정렬 배열 (품목 ID 목록, 품목 인덱스, 수량, 단가, 기본 단가)"""
+    item_ids, item_idx = np.unique(
+        np.array([m["item_id"] for m in movements], dtype=object),
+        return_inverse=True
+    )
+    qty = np.array([float(m["quantity"]) for m in movements])
+    cost = np.array([np.nan if m["unit_cost"] is None else float(m["unit_cost"]) for m in movements])
+    ts = np.array([to_timestamp(m["created_at"]) for m in movements])
+    fallback_cost = np.array([float(unit_costs.get(i) or 0) for i in item_ids])
+    
+    order = np.lexsort((ts, item_idx))
+    return item_ids, item_idx[order], qty[order], cost[order], fallback_cost
+
+
+def run_valuation(run_id: str, as_of: datetime, methods: List[str]) -> None:
+    """
+    재고 평가 작업 (백그라운드)
+    
+    원장 전체를 배열로 적재 (DATABASE_URL 직접 연결 우선) → 품목 구간별로 프로세스 풀에서 계산 → inventory_valuations 저장
+    """
+    try:
+        movements = fetch_all(
+            "stock_movements",
+            "id, item_id, quantity, unit_cost, created_at",
+            as_of.isoformat()
+        )
+        rows = []
+        totals = {method: 0.0 for method in methods}
+        item_count = 0
+        
+        if movements:
+            unit_costs = {row["id"]: row["unit_cost"] for row in fetch_all("items", "id, unit_cost")}
+            item_ids, item_idx, qty, cost, fallback_cost = build_arrays(movements, unit_costs)
+            item_count = len(item_ids)
+            
+            chunks = split_chunks(item_idx, qty, cost, fallback_cost, methods, settings.VALUATION_CHUNK_ITEMS)
+            
+            if len(chunks) > 1:
+                with ProcessPoolExecutor(
+                    max_workers=settings.VALUATION_WORKERS or None,
+                    mp_context=multiprocessing.get_context("spawn")
+                ) as pool:
+                    results = list(pool.map(value_chunk, [args for _, args in chunks]))
+            else:
+                results = [value_chunk(args) for _, args in chunks]
+            
+            for (first, _), result in zip(chunks, results):
+                for method, (onhand, value) in result.items():
+                    unit_cost = np.divide(value, onhand, out=np.zeros_like(value), where=onhand > 0)
+                    totals[method] += float(value.sum())
+                    rows.extend(
+                        {
+                            "run_id": run_id,
+                            "item_id": item_ids[first + k],
+                            "method": method,
+                            "qty": round(float(onhand[k]), 4),
+                            "unit_cost": round(float(unit_cost[k]), 4),
+                            "value": round(float(value[k]), 4)
+                        }
+                        for k in range(onhand.size)
+                    )
+        
+        batch_size = settings.VALUATION_WRITE_BATCH_SIZE
+        for start in range(0, len(rows), batch_size):
+            supabase.table("inventory_valuations").insert(rows[start:start + batch_size]).execute()
+        
+        supabase.table("valuation_runs").update({
+            "status": "COMPLETED",
+            "item_count": item_count,
+            "movement_count": len(movements),
+            "total_value": {method: round(total, 4) for method, total in totals.items()},
+            "finished_at": datetime.utcnow().isoformat()
+        }).eq("id", run_id).execute()
+    except Exception as e:
+        print(f"[ERROR] Valuation run {run_id} failed: {e}")
+        try:
+            # 이미 저장된 배치 제거 (실패한 실행의 부분 결과가 조회되지 않도록)
+            supabase.table("inventory_valuations").delete().eq("run_id", run_id).execute()
+        except Exception as cleanup_error:
+            print(f"[WARN] Valuation run {run_id} partial rows not removed: {cleanup_error}")
+        supabase.table("valuation_runs").update({
+            "status": "FAILED",
+            "error": str(e),
+            "finished_at": datetime.utcnow().isoformat()
+        }).eq("id", run_id).execute()
+
+
+# ============================================================================
+# API Endpoints
+# ============================================================================
+
+@router.post("/runs", status_code=202)
+async def create_valuation_run(
+    run_in: ValuationRunRequest,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user_with_permission("stocks:update"))
+):
+    """
+    재고 평가 실행 (월말 마감 등)
+    
+    - 기준일 종료 시점까지의 stock_movements 전체로 품목별 이동평균/선입선출 평가
+    - 백그라운드 실행, 진행 상태는 `GET /runs/{run_id}`로 확인
+    """
+    methods = list(dict.fromkeys(run_in.methods))
+    invalid = [m for m in methods if m not in METHODS]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid methods: {', '.join(invalid)} (allowed: {', '.join(METHODS)})"
+        )
+    
+    as_of = datetime.combine(run_in.as_of or date.today(), time.max, tzinfo=timezone.utc)
+    
+    try:
+        result = supabase.table("valuation_runs").insert({
+            "as_of": as_of.isoformat(),
+            "methods": methods
+        }).execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    run = result.data[0]
+    background_tasks.add_task(run_valuation, run["id"], as_of, methods)
+    
+    return {"run_id": run["id"], "status": run["status"], "as_of": run["as_of"], "methods": methods}
+
+
+@router.get("/runs")
+async def list_valuation_runs(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user_with_permission("stocks:read"))
+):
+    """재고 평가 실행 이력 (최근 순)"""
+    try:
+        result = supabase.table("valuation_runs")\
+            .select("*")\
+            .order("started_at", desc=True)\
+            .limit(limit)\
+            .execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {"data": result.data, "count": len(result.data)}
+
+
+@router.get("/runs/{run_id}")
+async def get_valuation_run(
+    run_id: str,
+    current_user: dict = Depends(get_current_user_with_permission("stocks:read"))
+):
+    """재고 평가 실행 상태 / 합계"""
+    try:
+        result = supabase.table("valuation_runs").select("*").eq("id", run_id).execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Valuation run not found")
+    
+    return {"data": result.data[0]}
+
+
+@router.get("/runs/{run_id}/items")
+async def get_valuation_items(
+    run_id: str,
+    method: str = Query("moving_average", description="moving_average | fifo"),
+    item_ids: Optional[str] = Query(None, description="쉼표로 구분된 상품 ID 목록"),
+    after: Optional[str] = Query(None, description="이전 페이지의 next_cursor (item_id)"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: dict = Depends(get_current_user_with_permission("stocks:read"))
+):
+    """품목별 평가 결과 (item_id 키셋 페이지네이션, COMPLETED 실행만)"""
+    if method not in METHODS:
+        raise HTTPException(status_code=400, detail=f"Invalid method: {method}")
+    
+    try:
+        run = supabase.table("valuation_runs").select("status").eq("id", run_id).execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not run.data:
+        raise HTTPException(status_code=404, detail="Valuation run not found")
+    if run.data[0]["status"] != "COMPLETED":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Valuation run is {run.data[0]['status']} (items are available only for COMPLETED runs)"
+        )
+    
+    try:
+        query = supabase.table("inventory_valuations")\
+            .select("item_id, qty, unit_cost, value")\
+            .eq("run_id", run_id)\
+            .eq("method", method)
+        
+        ids = [i.strip() for i in (item_ids or "").split(",") if i.strip()]
+        if ids:
+            query = query.in_("item_id", ids)
+        if after:
+            query = query.gt("item_id", after)
+        
+        result = query.order("item_id").limit(limit + 1).execute()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    rows = result.data or []
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    return {
+        "data": rows,
+        "count": len(rows),
+        "next_cursor": rows[-1]["item_id"] if has_more else None
+    }
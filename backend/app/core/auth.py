@@ -2,13 +2,14 @@
 Authentication & Authorization
 Backend dev token 기반 인증 (main.py 로그인 API와 호환)
 """
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.supabase import supabase
 from typing import Optional, List
 
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
@@ -18,8 +19,11 @@ async def get_current_user(
     Get current authenticated user from dev token
     (main.py의 로그인 API와 호환)
     """
-    token = credentials.credentials
-    
+    return await authenticate_token(credentials.credentials)
+
+
+async def authenticate_token(token: str) -> dict:
+    """dev token → 사용자 (user_roles 조회)"""
     try:
         print(f"[AUTH DEBUG] Received token: {token[:20]}..." if len(token) > 20 else f"[AUTH DEBUG] Received token: {token}")
         
@@ -70,29 +74,55 @@ def get_current_user_with_permission(permission: str):
         @router.get("/items", dependencies=[Depends(get_current_user_with_permission("items:read"))])
     """
     async def permission_checker(current_user: dict = Depends(get_current_user)):
-        user_role = current_user.get("role", "readonly")
-        
-        # 권한 체크 로직 (간단 버전)
-        # admin, manager는 모든 권한 허용
-        if user_role in ["admin", "manager"]:
-            return current_user
-        
-        # staff는 읽기/쓰기 허용
-        if user_role == "staff" and not permission.endswith(":delete"):
-            return current_user
-        
-        # readonly는 읽기만 허용
-        if user_role == "readonly" and permission.endswith(":read"):
-            return current_user
-        
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"Insufficient permissions. Required: {permission}"
-        )
+        return check_permission(current_user, permission)
     
     return permission_checker
 
 
+def get_current_user_with_permission_or_query_token(permission: str):
+    """
+    get_current_user_with_permission + ?token= 쿼리 파라미터 허용
+    
+    브라우저 EventSource(SSE)는 Authorization 헤더를 보낼 수 없으므로 스트림 엔드포인트 전용.
+    헤더가 있으면 헤더 우선. 쿼리 토큰은 접근 로그에 남을 수 있음.
+    """
+    async def permission_checker(
+        token: Optional[str] = Query(None, description="Bearer 토큰 (Authorization 헤더를 보낼 수 없는 EventSource용)"),
+        credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+    ):
+        raw = credentials.credentials if credentials else token
+        if not raw:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated"
+            )
+        return check_permission(await authenticate_token(raw), permission)
+    
+    return permission_checker
+
+
+def check_permission(current_user: dict, permission: str) -> dict:
+    """역할별 권한 체크 (간단 버전), 없으면 403"""
+    user_role = current_user.get("role", "readonly")
+    
+    # admin, manager는 모든 권한 허용
+    if user_role in ["admin", "manager"]:
+        return current_user
+    
+    # staff는 읽기/쓰기 허용
+    if user_role == "staff" and not permission.endswith(":delete"):
+        return current_user
+    
+    # readonly는 읽기만 허용
+    if user_role == "readonly" and permission.endswith(":read"):
+        return current_user
+    
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=f"Insufficient permissions. Required: {permission}"
+    )
+
+
 def require_role(required_roles: List[str]):
     """
     Dependency to require specific roles
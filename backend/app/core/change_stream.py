@@ -0,0 +1,185 @@
+"""
+Change Stream
+Postgres LISTEN/NOTIFY 변경 이벤트 → 워커 내 구독자 팬아웃
+
+- 워커(프로세스)마다 DB 연결 1개로 채널 LISTEN (백그라운드 스레드)
+- 채널 이름은 연결 시 DB 함수 change_stream_channel()에서 조회 (NOTIFY 트리거와 같은 정의)
+- 페이로드 {"topic": ..., "events": [...]}를 토픽별 구독자에게만 전달
+- 구독자별 큐가 가득 차면 쌓인 이벤트를 버리고 resync 이벤트 1건으로 대체
+- 연결이 끊겼다 복구되면 전체 구독자에게 resync 전달 (그 사이 알림 유실)
+"""
+import asyncio
+import json
+import select
+import threading
+import time
+from typing import Dict, Optional, Set
+from app.core.config import settings
+
+RESYNC = {"topic": "resync", "events": []}
+
+
+class Subscription:
+    """구독자 1명 (이벤트 루프 쪽 큐)"""
+    
+    def __init__(self, topics: Optional[Set[str]], ids: Optional[Set[str]], queue_size: int):
+        self.topics = topics
+        self.ids = ids
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=queue_size)
+    
+    def matches(self, event: dict) -> bool:
+        if not self.ids:
+            return True
+        return (event.get("entity_id") or event.get("item_id")) in self.ids
+    
+    def deliver(self, message: dict) -> None:
+        """이벤트 루프 스레드에서 실행 (call_soon_threadsafe)"""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class ChangeHub:
+    """LISTEN 연결 1개를 워커 내 구독자들에게 팬아웃"""
+    
+    def __init__(self, dsn: str, queue_size: int, reconnect_seconds: float):
+        self.dsn = dsn
+        self.queue_size = max(queue_size, 1)
+        self.reconnect_seconds = reconnect_seconds
+        self._by_topic: Dict[str, Set[Subscription]] = {}
+        self._all: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    # === 수명 주기 ===
+    
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+    
+    def start(self) -> None:
+        """LISTEN 스레드 시작 (DATABASE_URL 미설정 또는 psycopg2 미설치 시 비활성)"""
+        if self.running:
+            return
+        if not self.dsn:
+            print("[WARN] Change stream disabled: DATABASE_URL not set")
+            return
+        try:
+            import psycopg2  # noqa: F401
+        except ImportError as e:
+            print(f"[WARN] Change stream disabled: {e}")
+            return
+    
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="change-stream", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    # === 구독 ===
+    
+    def subscribe(self, topics: Optional[Set[str]] = None, ids: Optional[Set[str]] = None) -> Subscription:
+        """구독 등록 (이벤트 루프 안에서 호출, topics 미지정 시 전체 토픽)"""
+        sub = Subscription(topics or None, ids or None, self.queue_size)
+        with self._lock:
+            if sub.topics:
+                for topic in sub.topics:
+                    self._by_topic.setdefault(topic, set()).add(sub)
+            else:
+                self._all.add(sub)
+        return sub
+    
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._all.discard(sub)
+            for topic in sub.topics or ():
+                subs = self._by_topic.get(topic)
+                if subs:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._by_topic[topic]
+    
+    # === 백그라운드 ===
+    
+    def _run(self) -> None:
+        import psycopg2
+        import psycopg2.extensions
+        from psycopg2 import sql
+    
+        connected_before = False
+    
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute("SELECT change_stream_channel()")
+                    channel = cur.fetchone()[0]
+                    cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+    
+                if connected_before:
+                    self._publish(RESYNC)
+                connected_before = True
+                print(f"[INFO] Change stream listening on '{channel}'")
+    
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0).payload)
+            except Exception as e:
+                print(f"[WARN] Change stream connection lost: {e}")
+                time.sleep(self.reconnect_seconds)
+            finally:
+                if conn is not None:
+                    conn.close()
+    
+    def _dispatch(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            print(f"[WARN] Change stream payload ignored: {payload[:200]}")
+            return
+        self._publish(message)
+    
+    def _publish(self, message: dict) -> None:
+        """토픽 구독자 + 전체 구독자에게 전달 (구독자별 ID 필터 적용)"""
+        topic = message.get("topic")
+    
+        with self._lock:
+            if topic == RESYNC["topic"]:
+                subs = set(self._all).union(*self._by_topic.values())
+            else:
+                subs = self._all | self._by_topic.get(topic, set())
+    
+        for sub in subs:
+            if sub.ids and topic != RESYNC["topic"]:
+                events = [e for e in message.get("events", []) if sub.matches(e)]
+                if not events:
+                    continue
+                out = {"topic": topic, "events": events}
+            else:
+                out = message
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, out)
+            except RuntimeError:
+                # 이벤트 루프 종료 (워커 셧다운 중)
+                pass
+
+
+change_hub = ChangeHub(
+    dsn=settings.DATABASE_URL,
+    queue_size=settings.CHANGE_STREAM_QUEUE_SIZE,
+    reconnect_seconds=settings.CHANGE_STREAM_RECONNECT_SECONDS
+)
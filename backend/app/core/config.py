@@ -35,8 +35,55 @@ class Settings(BaseSettings):
         "http://localhost:3000",
     ]
     
+    # Items API
+    ITEMS_BATCH_MAX_IDS: int = 200  # ids= 일괄 조회 최대 개수
+    ITEMS_BULK_MAX_IDS: int = 5000  # 일괄 수정/삭제 최대 대상 수
+    ITEMS_BULK_CHUNK_SIZE: int = 100  # 일괄 수정/삭제 시 문장당 ID 수 (in_() URL 길이 ≈ 37바이트 × N)
+    
+    # Stocks API
+    STOCKS_BATCH_MAX_IDS: int = 500  # item_ids= 일괄 조회 최대 개수
+    
+    # Outbounds API
+    OUTBOUND_BATCH_MAX_IDS: int = 500  # 일괄 상태 전이 최대 문서 수
+    OUTBOUND_ARCHIVE_AFTER_MONTHS: int = 12  # 종결 후 보관 이동까지 개월 수
+    OUTBOUND_ARCHIVE_BATCH_SIZE: int = 1000  # 보관 이동 트랜잭션당 문서 수
+    OUTBOUND_ARCHIVE_MAX_BATCHES: int = 20  # API 요청 1회당 최대 배치 수 (남으면 has_more)
+    # 일일 pg_cron 작업(032 run_outbound_archive)은 위 두 기본값(12개월, 1000건)과 같은 인자로 등록됨 - 변경 시 함께 재등록
+    
+    # Inbounds API
+    INBOUND_RECEIPT_MAX_LINES: int = 5000  # 일괄 입고(컨테이너) 최대 라인 수
+    
+    # Inventory Valuation (재고 평가)
+    VALUATION_WORKERS: int = 0  # 프로세스 풀 크기 (0 = CPU 수)
+    VALUATION_CHUNK_ITEMS: int = 5000  # 작업 단위 품목 수
+    VALUATION_FETCH_PAGE_SIZE: int = 1000  # 원장 조회 페이지 크기 (PostgREST max-rows 이하, DATABASE_URL 미설정 시)
+    VALUATION_DB_FETCH_SIZE: int = 50000  # 직접 연결 시 서버 측 커서 묶음 크기
+    VALUATION_WRITE_BATCH_SIZE: int = 1000  # 결과 저장 문장당 행 수
+    
+    # Replenishment (발주 제안)
+    REPLENISH_WINDOW_DAYS: int = 28  # 일평균 출고량 산출 기간
+    REPLENISH_LEAD_TIME_DAYS: int = 14  # 조달 리드타임
+    REPLENISH_REVIEW_DAYS: int = 7  # 발주 주기
+    REPLENISH_CACHE_TTL_SECONDS: int = 3600  # 제안 결과 캐시 유효 시간
+    REPLENISH_BOM_MAX_DEPTH: int = 10  # BOM 전개 최대 단계 (순환 BOM 방어)
+    REPLENISH_FETCH_PAGE_SIZE: int = 1000  # 입력 조회 페이지 크기 (PostgREST max-rows 이하)
+    
+    # Document Numbering
+    DOC_NUMBER_BLOCK_SIZE: int = 10  # 프로세스별 문서번호 예약 블록 크기 (1 = 항상 DB 할당)
+    
+    # Idempotency-Key 저장소
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_WAIT_TIMEOUT_SECONDS: float = 30.0  # 처리 중인 동일 키 요청 대기 시간
+    IDEMPOTENCY_LEASE_SECONDS: int = 60  # 처리 중 키 선점 기한 (처리 워커 중단 시 이후 재선점)
+    IDEMPOTENCY_POLL_INTERVAL_MS: int = 200  # 처리 중 키 재확인 간격
+    
+    # Change Stream (LISTEN/NOTIFY → SSE, 채널은 DB 함수 change_stream_channel())
+    CHANGE_STREAM_QUEUE_SIZE: int = 1000  # 구독자별 대기 이벤트 수 (초과 시 resync)
+    CHANGE_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    CHANGE_STREAM_RECONNECT_SECONDS: float = 5.0
+    
     # Database
-    DATABASE_URL: str = ""  # Supabase PostgreSQL URL (optional)
+    DATABASE_URL: str = ""  # Supabase PostgreSQL URL (optional, 변경 스트림 LISTEN / 재고 평가 원장 적재)
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,147 @@
+"""
+Documents
+입고/출고 문서 공통 상태 전이 규칙 + DB 오류 변환
+
+- 상태 전이 테이블: action → 허용 상태(from), 전이 후 상태(to, None이면 상태 유지), 거부 메시지
+- 확정/반영/취소는 DB 함수(confirm_*, post_*, cancel_*)가 같은 규칙으로 잠금 후 처리하며,
+  여기서는 오류 메시지와 단순 전이(compare-and-set UPDATE)에 사용한다.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Optional
+from fastapi import HTTPException
+from postgrest.exceptions import APIError
+from app.core.supabase import supabase
+
+
+# 메시지의 {document}/{documents}는 문서 이름(단수/복수), {status}는 현재 상태로 치환
+DOCUMENT_STATE_MACHINE = {
+    "update": {
+        "from": ("DRAFT",), "to": None,
+        "error": "Only DRAFT {documents} can be updated"
+    },
+    "add_item": {
+        "from": ("DRAFT",), "to": None,
+        "error": "Only DRAFT {documents} can add items"
+    },
+    "update_item": {
+        "from": ("DRAFT",), "to": None,
+        "error": "Only DRAFT {documents} can update items"
+    },
+    "delete_item": {
+        "from": ("DRAFT",), "to": None,
+        "error": "Only DRAFT {documents} can delete items"
+    },
+    "confirm": {
+        "from": ("DRAFT",), "to": "CONFIRMED",
+        "error": "Cannot confirm from status: {status}"
+    },
+    "post": {
+        "from": ("CONFIRMED",), "to": "POSTED",
+        "error": "Cannot post from status: {status}"
+    },
+    "cancel": {
+        "from": ("DRAFT", "CONFIRMED"), "to": "CANCELED",
+        "error": "Cannot cancel from status: {status}",
+        "errors": {
+            "POSTED": "Cannot cancel POSTED {document} (use return flow)",
+            "CANCELED": "Already canceled"
+        }
+    },
+}
+
+
+class DocumentStateMachine:
+    """문서 유형별 상태 전이 + 가드 트리거/DB 함수 오류 변환"""
+    
+    def __init__(self, table: str, document: str, extra_actions: Optional[Dict[str, dict]] = None):
+        self.table = table
+        self.document = document
+        self.rules = {**DOCUMENT_STATE_MACHINE, **(extra_actions or {})}
+        # 목표 상태 → action (일괄 전이용)
+        self.action_by_target = {
+            rule["to"]: action for action, rule in self.rules.items() if rule["to"]
+        }
+    
+    def status_error(self, action: str, status: Optional[str]) -> HTTPException:
+        """상태 전이 거부 예외 생성"""
+        rule = self.rules[action]
+        message = rule.get("errors", {}).get(status, rule["error"])
+        return HTTPException(
+            status_code=400,
+            detail=message.format(status=status, document=self.document, documents=f"{self.document}s")
+        )
+    
+    def not_found(self) -> HTTPException:
+        return HTTPException(status_code=404, detail=f"{self.document.capitalize()} not found")
+    
+    def raise_transition_error(self, document_id: str, action: str) -> None:
+        """조건부 UPDATE 실패 원인 판별 (실패 경로에서만 현재 상태 조회)"""
+        result = supabase.table(self.table)\
+            .select("status")\
+            .eq("id", document_id)\
+            .execute()
+    
+        if not result.data:
+            raise self.not_found()
+    
+        raise self.status_error(action, result.data[0]["status"])
+    
+    def transition(self, document_id: str, action: str, values: Optional[dict] = None) -> dict:
+        """
+        상태 조건부 UPDATE (compare-and-set)
+    
+        허용 상태일 때만 한 번의 UPDATE로 값/상태를 변경하고,
+        영향받은 행이 없으면 404/400으로 변환한다.
+        """
+        rule = self.rules[action]
+    
+        update_data = dict(values or {})
+        if rule["to"]:
+            update_data["status"] = rule["to"]
+        update_data["updated_at"] = datetime.utcnow().isoformat()
+    
+        result = supabase.table(self.table)\
+            .update(update_data)\
+            .eq("id", document_id)\
+            .in_("status", list(rule["from"]))\
+            .execute()
+    
+        if not result.data:
+            self.raise_transition_error(document_id, action)
+    
+        return result.data[0]
+    
+    def raise_for_line_guard(self, e: APIError, action: str) -> None:
+        """라인 변경 가드 트리거(ER002) / FK 오류를 HTTPException으로 변환"""
+        if e.code == "ER002":
+            raise self.status_error(action, e.details)
+        if e.code == "23503":
+            raise self.not_found()
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    def raise_for_rpc(self, result: dict, action: str) -> None:
+        """문서 DB 함수 결과({"ok": false, "error": ...})의 공통 오류를 HTTPException으로 변환"""
+        if result and result.get("ok"):
+            return
+    
+        error = (result or {}).get("error")
+    
+        if error == "not_found":
+            raise self.not_found()
+    
+        if error == "invalid_status" and action in self.rules:
+            raise self.status_error(action, result.get("status"))
+    
+        if error == "no_items":
+            raise HTTPException(status_code=400, detail=f"Cannot {action} without items")
+    
+        raise HTTPException(status_code=500, detail=f"Failed to {action} {self.document}: {error}")
+
+
+def to_utc_bound(day: Optional[date], next_day: bool = False) -> Optional[str]:
+    """날짜 필터를 created_at 비교용 UTC 시각 문자열로 변환"""
+    if day is None:
+        return None
+    if next_day:
+        day = day + timedelta(days=1)
+    return datetime.combine(day, time.min, tzinfo=timezone.utc).isoformat()
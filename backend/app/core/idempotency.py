@@ -0,0 +1,131 @@
+"""
+Idempotency
+Idempotency-Key 헤더 기반 중복 요청 처리 (DB 저장소, 워커 간 공유)
+
+- 같은 키로 재요청 시 첫 응답을 그대로 반환 (어느 워커로 라우팅되어도 동일)
+- 처리 중인 키로 동시에 들어온 요청은 첫 요청이 끝날 때까지 대기 후 결과 공유
+- 키 재사용(요청 본문 불일치)은 422
+- 성공 응답만 보관하며, 실패한 요청은 키를 해제해 재시도 가능
+- 키는 (scope, key) 유일 (idempotency_keys 테이블, INSERT ... ON CONFLICT로 선점)
+- 처리 워커가 중단되면 선점 기한(lease) 이후 다음 요청이 이어받음
+"""
+import hashlib
+import json
+import time
+from typing import Any, Callable, Optional, Tuple
+from fastapi import HTTPException
+from app.core.supabase import supabase
+from app.core.config import settings
+
+
+class IdempotencyStore:
+    """키별 응답 보관 + 처리 중 요청 병합 (idempotency_keys 테이블)"""
+    
+    def __init__(self, ttl_seconds: int, lease_seconds: int, wait_timeout_seconds: float, poll_interval_ms: int):
+        self.ttl = ttl_seconds
+        self.lease = lease_seconds
+        self.wait_timeout = wait_timeout_seconds
+        self.poll_interval = poll_interval_ms / 1000
+    
+    @staticmethod
+    def fingerprint(payload: Any) -> str:
+        """요청 본문 지문 (키 재사용 감지용)"""
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def _claim(self, scope: str, key: str, fingerprint: str) -> dict:
+        return supabase.rpc("claim_idempotency_key", {
+            "p_scope": scope,
+            "p_key": key,
+            "p_fingerprint": fingerprint,
+            "p_ttl_seconds": self.ttl,
+            "p_lease_seconds": self.lease
+        }).execute().data
+    
+    def run(self, scope: str, key: str, fingerprint: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        (scope, key) 단위로 func를 한 번만 실행
+    
+        Returns:
+            (결과, 재사용 여부)
+        """
+        deadline = time.monotonic() + self.wait_timeout
+    
+        while True:
+            claim = self._claim(scope, key, fingerprint)
+            state = claim["state"]
+    
+            if state == "claimed":
+                break
+    
+            if state == "mismatch":
+                raise HTTPException(
+                    status_code=422,
+                    detail={
+                        "code": "idempotency_key_reused",
+                        "message": "같은 Idempotency-Key로 다른 요청을 보낼 수 없습니다."
+                    }
+                )
+    
+            if state == "completed":
+                return claim["response"], True
+    
+            # in_progress: 첫 요청 완료(또는 실패로 해제)까지 대기 후 다시 선점 시도
+            if time.monotonic() >= deadline:
+                raise HTTPException(
+                    status_code=409,
+                    detail={
+                        "code": "idempotency_in_progress",
+                        "message": "같은 Idempotency-Key 요청이 아직 처리 중입니다."
+                    }
+                )
+            time.sleep(self.poll_interval)
+    
+        try:
+            result = func()
+        except Exception:
+            try:
+                supabase.rpc("release_idempotency_key", {"p_scope": scope, "p_key": key}).execute()
+            except Exception as e:
+                # 해제 실패 시 lease 만료 후 재선점 가능
+                print(f"[WARN] Idempotency key {scope}:{key} not released: {e}")
+            raise
+    
+        # 재요청 응답과 같은 형태로 보관 (JSON 직렬화 결과)
+        response = json.loads(json.dumps(result, default=str))
+        try:
+            supabase.rpc("complete_idempotency_key", {
+                "p_scope": scope,
+                "p_key": key,
+                "p_response": response
+            }).execute()
+        except Exception as e:
+            # 처리는 끝났으므로 응답은 반환 (키는 lease 만료 전까지 in_progress로 남음)
+            print(f"[WARN] Idempotency key {scope}:{key} not completed: {e}")
+        return response, False
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS,
+    wait_timeout_seconds=settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS,
+    poll_interval_ms=settings.IDEMPOTENCY_POLL_INTERVAL_MS
+)
+
+
+def run_idempotent(
+    idempotency_key: Optional[str],
+    scope: str,
+    payload: Any,
+    func: Callable[[], Any]
+) -> Tuple[Any, bool]:
+    """Idempotency-Key가 있으면 저장소를 통해, 없으면 그대로 실행"""
+    if not idempotency_key:
+        return func(), False
+    
+    return idempotency_store.run(
+        scope,
+        idempotency_key,
+        IdempotencyStore.fingerprint(payload),
+        func
+    )
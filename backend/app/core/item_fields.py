@@ -0,0 +1,43 @@
+"""
+Item Fields
+items 조회 fields= 파라미터 파싱 (items 라우터 / main.py 레거시 핸들러 공용)
+
+라우터 import 실패 시에도 main.py 레거시 핸들러가 동작하도록
+app.api.items(인증/분류 체계 의존)와 분리한다.
+"""
+from typing import List, Optional
+from fastapi import HTTPException
+
+# 조회 가능 컬럼 (app.api.items.Item 모델 필드와 동일하게 유지)
+ITEM_FIELDS = frozenset({
+    "id", "sku", "name", "description", "category_id", "item_type",
+    "uom", "unit_cost", "status", "created_at", "updated_at"
+})
+
+
+def parse_item_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    fields= 파라미터 파싱 및 Item 모델 기준 검증
+    
+    Returns:
+        요청 컬럼 목록 (id 항상 포함), 미지정 시 None
+        
+    Raises:
+        HTTPException: 알 수 없는 컬럼 포함 시
+    """
+    if not fields:
+        return None
+    
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    invalid = [f for f in requested if f not in ITEM_FIELDS]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "invalid_fields",
+                "message": f"알 수 없는 필드: {', '.join(invalid)}",
+                "allowed": sorted(ITEM_FIELDS)
+            }
+        )
+    
+    return list(dict.fromkeys(["id", *requested]))
@@ -0,0 +1,56 @@
+"""
+Document Numbering
+일자별 문서번호 할당 (YYYYMMDD-####)
+
+DB 카운터(document_counters)에서 번호 블록을 원자적으로 예약하고
+프로세스 내에서 소진한다. 블록이 남아 있는 동안은 DB 호출이 없다.
+
+주의: 재시작 시 미사용 번호는 버려지므로 번호는 유일하지만 연속적이지 않을 수 있다.
+"""
+import threading
+from datetime import datetime
+from app.core.supabase import supabase
+from app.core.config import settings
+
+
+class DocumentNumberAllocator:
+    """문서 유형별 번호 블록 할당기 (thread-safe)"""
+    
+    def __init__(self, doc_type: str, block_size: int = 1):
+        self.doc_type = doc_type
+        self.block_size = max(block_size, 1)
+        self._lock = threading.Lock()
+        self._day: str = ""
+        self._next = 0
+        self._end = -1
+    
+    def _reserve(self, day: datetime, count: int) -> None:
+        """DB에서 count개 번호 예약"""
+        result = supabase.rpc("allocate_document_numbers", {
+            "p_doc_type": self.doc_type,
+            "p_day": day.date().isoformat(),
+            "p_count": count
+        }).execute()
+        
+        last_no = int(result.data)
+        self._next = last_no - count + 1
+        self._end = last_no
+    
+    def next_number(self) -> str:
+        """다음 문서번호 반환"""
+        now = datetime.now()
+        today = now.strftime("%Y%m%d")
+        
+        with self._lock:
+            if self._day != today or self._next > self._end:
+                self._reserve(now, self.block_size)
+                self._day = today
+            
+            number = self._next
+            self._next += 1
+        
+        return f"{today}-{number:04d}"
+
+
+outbound_numbers = DocumentNumberAllocator("outbound", settings.DOC_NUMBER_BLOCK_SIZE)
+inbound_numbers = DocumentNumberAllocator("inbound", settings.DOC_NUMBER_BLOCK_SIZE)
@@ -9,6 +9,8 @@ from pydantic import BaseModel
 from typing import Optional
 from app.core.config import settings
 from app.core.supabase import supabase
+from app.core.item_fields import parse_item_fields
+from app.core.change_stream import change_hub
 
 # Outbounds API 라우터
 try:
@@ -18,6 +20,14 @@ except ImportError:
     OUTBOUNDS_ENABLED = False
     print("[WARN] Outbounds API not available")
 
+# Inbounds API 라우터
+try:
+    from app.api.inbounds import router as inbounds_router
+    INBOUNDS_ENABLED = True
+except ImportError:
+    INBOUNDS_ENABLED = False
+    print("[WARN] Inbounds API not available")
+
 # Categories API 라우터
 try:
     from app.api.categories import router as categories_router
@@ -42,6 +52,46 @@ except ImportError:
     ITEMS_BOM_ENABLED = False
     print("[WARN] Items BOM API not available")
 
+# Stocks API 라우터
+try:
+    from app.api.stocks import router as stocks_router
+    STOCKS_ENABLED = True
+except ImportError:
+    STOCKS_ENABLED = False
+    print("[WARN] Stocks API not available")
+
+# Flows API 라우터
+try:
+    from app.api.flows import router as flows_router
+    FLOWS_ENABLED = True
+except ImportError:
+    FLOWS_ENABLED = False
+    print("[WARN] Flows API not available")
+
+# Events API 라우터 (실시간 변경 스트림)
+try:
+    from app.api.events import router as events_router
+    EVENTS_ENABLED = True
+except ImportError:
+    EVENTS_ENABLED = False
+    print("[WARN] Events API not available")
+
+# Valuations API 라우터 (numpy 필요)
+try:
+    from app.api.valuations import router as valuations_router
+    VALUATIONS_ENABLED = True
+except ImportError as e:
+    VALUATIONS_ENABLED = False
+    print(f"[WARN] Valuations API not available: {e}")
+
+# Replenishment API 라우터 (numpy 필요)
+try:
+    from app.api.replenishment import router as replenishment_router
+    REPLENISHMENT_ENABLED = True
+except ImportError as e:
+    REPLENISHMENT_ENABLED = False
+    print(f"[WARN] Replenishment API not available: {e}")
+
 security = HTTPBearer()
 
 # 엔진 식별 정보 (환경변수에서 직접 로드)
@@ -86,6 +136,11 @@ if OUTBOUNDS_ENABLED:
     app.include_router(outbounds_router)
     print("[INFO] Outbounds API registered")
 
+# Inbounds API 라우터 등록
+if INBOUNDS_ENABLED:
+    app.include_router(inbounds_router)
+    print("[INFO] Inbounds API registered")
+
 # Categories API 라우터 등록
 if CATEGORIES_ENABLED:
     app.include_router(categories_router, prefix="/api/v1")
@@ -101,6 +156,47 @@ if ITEMS_BOM_ENABLED:
     app.include_router(items_bom_router)
     print("[INFO] Items BOM API registered")
 
+# Stocks API 라우터 등록
+if STOCKS_ENABLED:
+    app.include_router(stocks_router)
+    print("[INFO] Stocks API registered")
+
+
+# Flows API 라우터 등록
+if FLOWS_ENABLED:
+    app.include_router(flows_router)
+    print("[INFO] Flows API registered")
+
+
+# Events API 라우터 등록
+if EVENTS_ENABLED:
+    app.include_router(events_router)
+    print("[INFO] Events API registered")
+
+
+# Valuations API 라우터 등록
+if VALUATIONS_ENABLED:
+    app.include_router(valuations_router)
+    print("[INFO] Valuations API registered")
+
+
+# Replenishment API 라우터 등록
+if REPLENISHMENT_ENABLED:
+    app.include_router(replenishment_router)
+    print("[INFO] Replenishment API registered")
+
+
+@app.on_event("startup")
+def start_change_stream():
+    """변경 스트림 LISTEN 시작"""
+    change_hub.start()
+
+
+@app.on_event("shutdown")
+def stop_change_stream():
+    """변경 스트림 종료"""
+    change_hub.stop()
+
 
 # 전역 응답 헤더 미들웨어 (운영 소스 추적)
 @app.middleware("http")
@@ -236,11 +332,34 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 
 
 # Items API
+ITEM_CATEGORY_EMBED = "category:categories(id, name, description)"
+
+
+def build_item_select_with_category(fields: Optional[str]) -> str:
+    """
+    fields= 파라미터를 select 절로 변환 (category 조인 포함 여부 결정)
+    
+    - 미지정: 전체 컬럼 + category
+    - 지정: 요청 컬럼만, `category` 포함 시에만 조인
+    """
+    if not fields:
+        return f"*, {ITEM_CATEGORY_EMBED}"
+    
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    with_category = "category" in requested
+    columns = parse_item_fields(",".join(f for f in requested if f != "category")) or ["id"]
+    
+    if with_category:
+        columns.append(ITEM_CATEGORY_EMBED)
+    return ", ".join(columns)
+
+
 @app.get("/api/v1/items/")
 async def get_items(
     page: int = 1, 
     limit: int = 10,
-    category_id: Optional[str] = None
+    category_id: Optional[str] = None,
+    fields: Optional[str] = None
 ):
     """
     Get all items from Supabase with pagination
@@ -248,13 +367,14 @@ async def get_items(
     - **page**: Page number (default: 1)
     - **limit**: Items per page (default: 10)
     - **category_id**: Filter by category ID (optional)
+    - **fields**: Comma-separated columns to return, e.g. `id,sku,name` (optional)
     """
     try:
         skip = (page - 1) * limit
         
         # Build query with category join
         query = supabase.table("items").select(
-            "*, category:categories(id, name, description)",
+            build_item_select_with_category(fields),
             count="exact"
         )
         
@@ -271,16 +391,18 @@ async def get_items(
             "page": page,
             "limit": limit
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch items: {str(e)}")
 
 
 @app.get("/api/v1/items/{item_id}")
-async def get_item(item_id: str):
+async def get_item(item_id: str, fields: Optional[str] = None):
     """Get specific item by ID with category information"""
     try:
         result = supabase.table("items").select(
-            "*, category:categories(id, name, description)"
+            build_item_select_with_category(fields)
         ).eq("id", item_id).single().execute()
         
         if not result.data:
@@ -293,30 +415,6 @@ async def get_item(item_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to fetch item: {str(e)}")
 
 
-# Inbounds API
-@app.get("/api/v1/inbounds/")
-async def get_inbounds(page: int = 1, limit: int = 10):
-    """Get all inbounds from Supabase with pagination"""
-    try:
-        skip = (page - 1) * limit
-        result = supabase.table("inbounds").select("*").range(skip, skip + limit - 1).execute()
-        return {"data": result.data, "count": len(result.data)}
-    except Exception as e:
-        return {"error": str(e)}
-
-
-# Stocks API
-@app.get("/api/v1/stocks/")
-async def get_stocks(page: int = 1, limit: int = 10):
-    """Get all stocks from Supabase with pagination"""
-    try:
-        skip = (page - 1) * limit
-        result = supabase.table("stocks").select("*").range(skip, skip + limit - 1).execute()
-        return {"data": result.data, "count": len(result.data)}
-    except Exception as e:
-        return {"error": str(e)}
-
-
 # Engines API (중요!)
 @app.get("/api/engines")
 async def get_engines(skip: int = 0, limit: int = 100):
@@ -338,17 +436,6 @@ async def get_engine(engine_id: str):
         return {"error": str(e)}
 
 
-# Flows API
-@app.get("/api/flows")
-async def get_flows(skip: int = 0, limit: int = 100):
-    """Get all flows from Supabase"""
-    try:
-        result = supabase.table("flows").select("*").range(skip, skip + limit - 1).execute()
-        return {"data": result.data, "count": len(result.data)}
-    except Exception as e:
-        return {"error": str(e)}
-
-
 if __name__ == "__main__":
     import uvicorn
     import multiprocessing
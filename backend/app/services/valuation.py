@@ -0,0 +1,166 @@
+"""
+Inventory Valuation
+재고 평가 계산 (이동평균 / 선입선출)
+
+재고 이동 원장을 품목 순 → 시간 순으로 정렬한 평면 배열로 받아
+전체 품목을 NumPy 배열 연산으로 한 번에 계산한다.
+
+- 이동평균: 품목 내 n번째 이동끼리 묶어 한 단계씩 진행
+  (반복 횟수 = 품목별 최대 이동 건수, 각 단계는 전 품목 벡터 연산)
+- 선입선출: 기말 수량을 최근 입고분부터 채우는 방식으로
+  품목별 역순 누적합 한 번에 계산
+
+프로세스 풀 작업자에서도 실행되므로 numpy 외 앱 모듈을 import하지 않는다.
+"""
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+METHODS = ("moving_average", "fifo")
+
+
+def group_starts(item_idx: np.ndarray) -> np.ndarray:
+    """품목 순 정렬 배열에서 각 품목 구간의 시작 위치"""
+    if item_idx.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.r_[0, np.flatnonzero(np.diff(item_idx)) + 1]
+
+
+def value_moving_average(
+    item_idx: np.ndarray,
+    qty: np.ndarray,
+    cost: np.ndarray,
+    fallback_cost: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    이동평균 평가
+    
+    - 입고(qty > 0): 평균단가 갱신, 단가 없으면(NaN) 현재 평균 → 품목 기본 단가
+    - 출고(qty < 0): 현재 평균단가로 차감
+    - 재고가 0 이하가 되면 평가액 0
+    - 재고 0 이하에서 입고: 입고 후 남는 수량만 입고 단가로 평가 (마이너스 재고 상계분 제외)
+    
+    반환값: (품목별 수량, 품목별 평가액)
+    """
+    n_items = fallback_cost.size
+    onhand = np.zeros(n_items)
+    value = np.zeros(n_items)
+    
+    if item_idx.size == 0:
+        return onhand, value
+    
+    starts = group_starts(item_idx)
+    counts = np.diff(np.r_[starts, item_idx.size])
+    rank = np.arange(item_idx.size) - np.repeat(starts, counts)
+    
+    by_rank = np.argsort(rank, kind="stable")
+    bounds = np.searchsorted(rank[by_rank], np.arange(counts.max() + 1))
+    
+    for r in range(counts.max()):
+        rows = by_rank[bounds[r]:bounds[r + 1]]
+        i = item_idx[rows]
+        q = qty[rows]
+        c = cost[rows]
+        
+        current_qty = onhand[i]
+        current_value = value[i]
+        avg = np.divide(current_value, current_qty, out=np.zeros_like(current_value), where=current_qty > 0)
+        
+        receipt_cost = np.where(np.isnan(c), np.where(current_qty > 0, avg, fallback_cost[i]), c)
+        new_qty = current_qty + q
+        new_value = np.where(
+            q > 0,
+            np.where(current_qty > 0, current_value + q * receipt_cost, new_qty * receipt_cost),
+            current_value + q * avg
+        )
+        
+        onhand[i] = new_qty
+        value[i] = np.where(new_qty > 0, new_value, 0.0)
+    
+    return onhand, value
+
+
+def value_fifo(
+    item_idx: np.ndarray,
+    qty: np.ndarray,
+    cost: np.ndarray,
+    fallback_cost: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    선입선출 평가
+    
+    기말 수량을 최근 입고분부터 채워 평가한다 (먼저 들어온 분량이 먼저 출고된 것으로 간주).
+    입고 이력으로 채워지지 않는 수량은 품목 기본 단가로 평가.
+    
+    반환값: (품목별 수량, 품목별 평가액)
+    """
+    n_items = fallback_cost.size
+    onhand = np.clip(np.bincount(item_idx, weights=qty, minlength=n_items).astype(float), 0, None)
+    
+    receipts = qty > 0
+    # 품목 오름차순/시간 오름차순 배열을 뒤집으면 품목 내 최신 입고가 앞에 온다
+    ri = item_idx[receipts][::-1]
+    rq = qty[receipts][::-1]
+    rc = cost[receipts][::-1]
+    rc = np.where(np.isnan(rc), fallback_cost[ri], rc)
+    
+    value = np.zeros(n_items)
+    covered = np.zeros(n_items)
+    
+    if ri.size:
+        cum = np.cumsum(rq)
+        starts = group_starts(ri)
+        counts = np.diff(np.r_[starts, ri.size])
+        offset = np.repeat(cum[starts] - rq[starts], counts)
+        before = cum - rq - offset
+        
+        take = np.clip(onhand[ri] - before, 0, rq)
+        value = np.bincount(ri, weights=take * rc, minlength=n_items)
+        covered = np.bincount(ri, weights=take, minlength=n_items)
+    
+    value += (onhand - covered) * fallback_cost
+    
+    return onhand, value
+
+
+VALUATORS = {
+    "moving_average": value_moving_average,
+    "fifo": value_fifo,
+}
+
+
+def value_chunk(
+    args: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Sequence[str]]
+) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """품목 구간 하나를 평가 (프로세스 풀 작업 단위)"""
+    item_idx, qty, cost, fallback_cost, methods = args
+    return {method: VALUATORS[method](item_idx, qty, cost, fallback_cost) for method in methods}
+
+
+def split_chunks(
+    item_idx: np.ndarray,
+    qty: np.ndarray,
+    cost: np.ndarray,
+    fallback_cost: np.ndarray,
+    methods: Sequence[str],
+    chunk_items: int
+) -> List[Tuple[int, tuple]]:
+    """
+    품목 순 정렬 배열을 품목 구간별 작업으로 분할
+    
+    반환값: [(구간 첫 품목 인덱스, value_chunk 인자), ...] (품목 인덱스는 구간 기준으로 재지정)
+    """
+    n_items = fallback_cost.size
+    chunks = []
+    
+    for first in range(0, n_items, max(chunk_items, 1)):
+        last = min(first + chunk_items, n_items)
+        lo, hi = np.searchsorted(item_idx, [first, last])
+        chunks.append((first, (
+            item_idx[lo:hi] - first,
+            qty[lo:hi],
+            cost[lo:hi],
+            fallback_cost[first:last],
+            tuple(methods)
+        )))
+    
+    return chunks
@@ -0,0 +1,60 @@
+-- =============================================================================
+-- Migration: 005_item_search
+-- Description: SKU/상품명 자동완성 검색 (pg_trgm 인덱스 + 랭킹 함수)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. 트라이그램 확장
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 2. 인덱스 (부분 일치 / 오타 허용 / 접두사 검색)
+CREATE INDEX IF NOT EXISTS idx_items_sku_trgm ON items USING gin (sku gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_items_name_trgm ON items USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_items_sku_prefix ON items (lower(sku) text_pattern_ops);
+
+-- 3. 검색 함수
+--    랭킹: SKU 완전일치 > SKU 접두사 > 상품명 접두사 > 부분일치, 동점은 트라이그램 유사도
+CREATE OR REPLACE FUNCTION search_items(
+    p_query TEXT,
+    p_limit INT DEFAULT 20,
+    p_status TEXT DEFAULT NULL
+)
+RETURNS TABLE (item JSONB, rank REAL) AS $$
+DECLARE
+    v_term TEXT := lower(trim(p_query));
+    v_like TEXT;
+BEGIN
+    IF v_term IS NULL OR v_term = '' THEN
+        RETURN;
+    END IF;
+
+    -- LIKE 와일드카드 이스케이프
+    v_like := replace(replace(replace(v_term, '\', '\\'), '%', '\%'), '_', '\_');
+
+    RETURN QUERY
+    SELECT
+        to_jsonb(i) AS item,
+        (
+            CASE
+                WHEN lower(i.sku) = v_term THEN 3.0
+                WHEN lower(i.sku) LIKE v_like || '%' THEN 2.0
+                WHEN lower(i.name) LIKE v_like || '%' THEN 1.5
+                WHEN i.sku ILIKE '%' || v_like || '%' OR i.name ILIKE '%' || v_like || '%' THEN 1.0
+                ELSE 0.0
+            END
+            + GREATEST(similarity(i.sku, v_term), word_similarity(v_term, i.name))
+        )::REAL AS rank
+    FROM items i
+    WHERE (p_status IS NULL OR i.status = p_status)
+      AND (
+            i.sku ILIKE '%' || v_like || '%'
+         OR i.name ILIKE '%' || v_like || '%'
+         OR i.sku % v_term
+         OR v_term <% i.name
+      )
+    ORDER BY rank DESC, i.sku
+    LIMIT LEAST(GREATEST(COALESCE(p_limit, 20), 1), 100);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION search_items IS '상품 자동완성 검색 (SKU/상품명, 접두사·부분일치·오타 허용)';
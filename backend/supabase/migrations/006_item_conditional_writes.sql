@@ -0,0 +1,38 @@
+-- =============================================================================
+-- Migration: 006_item_conditional_writes
+-- Description: 상품 생성/삭제 단일 라운드트립 처리 (SKU 유니크 + 조건부 삭제 함수)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. SKU 유니크 인덱스 (INSERT ... ON CONFLICT (sku) 대상)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_items_sku ON items(sku);
+
+-- 2. 조건부 삭제 함수
+--    BOM 부모인 상품은 삭제하지 않음. 상품 행을 먼저 잠가서
+--    BOM 추가(FK 검사)와 삭제가 동시에 진행되지 않도록 한다.
+--
+--    반환값: 'deleted' | 'not_found' | 'bom_exists' | 'in_use'
+CREATE OR REPLACE FUNCTION delete_item_if_unused(p_item_id UUID)
+RETURNS TEXT AS $$
+BEGIN
+    PERFORM 1 FROM items WHERE id = p_item_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN 'not_found';
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM bom_components WHERE parent_item_id = p_item_id) THEN
+        RETURN 'bom_exists';
+    END IF;
+
+    BEGIN
+        DELETE FROM items WHERE id = p_item_id;
+    EXCEPTION WHEN foreign_key_violation THEN
+        -- 다른 상품의 BOM 구성품으로 사용 중 (ON DELETE RESTRICT)
+        RETURN 'in_use';
+    END;
+
+    RETURN 'deleted';
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION delete_item_if_unused IS '상품 조건부 삭제 (BOM 연결 시 거부)';
@@ -0,0 +1,49 @@
+-- =============================================================================
+-- Migration: 007_document_counters
+-- Description: 문서번호 일자별 카운터 (원자적 upsert-increment)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. 일자별 카운터 테이블
+CREATE TABLE IF NOT EXISTS document_counters (
+    doc_type TEXT NOT NULL,
+    day DATE NOT NULL,
+    last_no INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (doc_type, day)
+);
+
+ALTER TABLE document_counters ENABLE ROW LEVEL SECURITY;
+
+-- 2. 기존 출고 문서번호로 카운터 초기화 (YYYYMMDD-####)
+INSERT INTO document_counters (doc_type, day, last_no)
+SELECT
+    'outbound',
+    to_date(split_part(outbound_no, '-', 1), 'YYYYMMDD'),
+    MAX(split_part(outbound_no, '-', 2)::INT)
+FROM outbounds
+WHERE outbound_no ~ '^[0-9]{8}-[0-9]+$'
+GROUP BY 1, 2
+ON CONFLICT (doc_type, day) DO UPDATE
+    SET last_no = GREATEST(document_counters.last_no, EXCLUDED.last_no);
+
+-- 3. 번호 블록 할당 함수
+--    p_count개를 예약하고 블록의 마지막 번호를 반환한다.
+--    (예약 범위: 반환값 - p_count + 1 ~ 반환값)
+--    행 단위 잠금으로 동시 호출 시에도 번호가 겹치지 않는다.
+CREATE OR REPLACE FUNCTION allocate_document_numbers(
+    p_doc_type TEXT,
+    p_day DATE,
+    p_count INT DEFAULT 1
+)
+RETURNS INT AS $$
+    INSERT INTO document_counters (doc_type, day, last_no)
+    VALUES (p_doc_type, p_day, GREATEST(p_count, 1))
+    ON CONFLICT (doc_type, day) DO UPDATE
+        SET last_no = document_counters.last_no + EXCLUDED.last_no,
+            updated_at = NOW()
+    RETURNING last_no;
+$$ LANGUAGE sql;
+
+COMMENT ON TABLE document_counters IS '문서 유형/일자별 번호 카운터';
+COMMENT ON FUNCTION allocate_document_numbers IS '문서번호 블록 원자적 할당';
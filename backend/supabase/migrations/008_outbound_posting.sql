@@ -0,0 +1,104 @@
+-- =============================================================================
+-- Migration: 008_outbound_posting
+-- Description: 출고 반영 단일 트랜잭션 처리 (재고 일괄 차감 + 상태 변경 + flow 기록)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. 출고 재고 차감 (내부 함수)
+--    대상 문서들의 라인을 품목별로 합산한 뒤, 부족 품목이 하나라도 있으면
+--    아무것도 변경하지 않고 부족 목록을 반환한다. 모두 충분하면 한 번에 차감하고 '[]' 반환.
+CREATE OR REPLACE FUNCTION deduct_outbound_stock(p_outbound_ids UUID[])
+RETURNS JSONB AS $$
+DECLARE
+    v_shortages JSONB;
+BEGIN
+    -- 관련 재고 행 잠금 (item_id 순서로 잠가 교착 상태 방지)
+    PERFORM 1
+    FROM stocks s
+    WHERE s.item_id IN (
+        SELECT oi.item_id FROM outbound_items oi WHERE oi.outbound_id = ANY(p_outbound_ids)
+    )
+    ORDER BY s.item_id
+    FOR UPDATE;
+
+    WITH demand AS (
+        SELECT oi.item_id, SUM(oi.qty) AS qty
+        FROM outbound_items oi
+        WHERE oi.outbound_id = ANY(p_outbound_ids)
+        GROUP BY oi.item_id
+    )
+    SELECT COALESCE(
+        jsonb_agg(
+            jsonb_build_object(
+                'item_id', d.item_id,
+                'required', d.qty,
+                'available', COALESCE(s.onhand, 0),
+                'reason', CASE WHEN s.item_id IS NULL THEN 'stock_not_found' ELSE 'insufficient' END
+            )
+            ORDER BY d.item_id
+        ),
+        '[]'::jsonb
+    )
+    INTO v_shortages
+    FROM demand d
+    LEFT JOIN stocks s ON s.item_id = d.item_id
+    WHERE s.item_id IS NULL OR s.onhand < d.qty;
+
+    IF jsonb_array_length(v_shortages) > 0 THEN
+        RETURN v_shortages;
+    END IF;
+
+    UPDATE stocks s
+    SET onhand = s.onhand - d.qty,
+        updated_at = NOW()
+    FROM (
+        SELECT oi.item_id, SUM(oi.qty) AS qty
+        FROM outbound_items oi
+        WHERE oi.outbound_id = ANY(p_outbound_ids)
+        GROUP BY oi.item_id
+    ) d
+    WHERE s.item_id = d.item_id;
+
+    RETURN '[]'::jsonb;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. 출고 반영 함수 (CONFIRMED → POSTED)
+--    반환값: {"ok": true, "status": "POSTED"}
+--           {"ok": false, "error": "not_found" | "invalid_status" | "insufficient_stock", ...}
+CREATE OR REPLACE FUNCTION post_outbound(
+    p_outbound_id UUID,
+    p_actor TEXT DEFAULT 'system'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_status TEXT;
+    v_shortages JSONB;
+BEGIN
+    SELECT status INTO v_status FROM outbounds WHERE id = p_outbound_id FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'not_found');
+    END IF;
+
+    IF v_status <> 'CONFIRMED' THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'invalid_status', 'status', v_status);
+    END IF;
+
+    v_shortages := deduct_outbound_stock(ARRAY[p_outbound_id]);
+    IF jsonb_array_length(v_shortages) > 0 THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'insufficient_stock', 'shortages', v_shortages);
+    END IF;
+
+    UPDATE outbounds SET status = 'POSTED', updated_at = NOW() WHERE id = p_outbound_id;
+
+    INSERT INTO flows (entity_type, entity_id, from_status, to_status, actor, payload)
+    VALUES ('outbound', p_outbound_id, 'CONFIRMED', 'POSTED', p_actor,
+            jsonb_build_object('timestamp', NOW()));
+
+    RETURN jsonb_build_object('ok', true, 'status', 'POSTED');
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION deduct_outbound_stock IS '출고 문서 라인 합산 재고 차감 (부족 시 변경 없음)';
+COMMENT ON FUNCTION post_outbound IS '출고 반영 (재고 차감/상태 변경/flow 기록 단일 트랜잭션)';
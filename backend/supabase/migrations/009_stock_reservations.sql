@@ -0,0 +1,282 @@
+-- =============================================================================
+-- Migration: 009_stock_reservations
+-- Description: 출고 확정 시 재고 예약 / 취소 시 해제, 가용재고(ATP) 조회
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. stocks 예약 수량 / 버전 컬럼
+ALTER TABLE stocks
+ADD COLUMN IF NOT EXISTS reserved NUMERIC(18, 4) NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+
+-- 2. 문서별 예약 내역 (해제/반영 시 정확한 수량 복원용)
+CREATE TABLE IF NOT EXISTS stock_reservations (
+    outbound_id UUID NOT NULL REFERENCES outbounds(id) ON DELETE CASCADE,
+    item_id UUID NOT NULL,
+    qty NUMERIC(18, 4) NOT NULL CHECK (qty > 0),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (outbound_id, item_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_stock_reservations_item_id ON stock_reservations(item_id);
+
+ALTER TABLE stock_reservations ENABLE ROW LEVEL SECURITY;
+
+-- 3. 재고 예약 (내부 함수)
+--    품목별 조건부 UPDATE (onhand - reserved >= qty) 로 예약하고 version을 올린다.
+--    한 품목이라도 실패하면 서브트랜잭션을 되돌리고 부족 목록을 반환한다.
+CREATE OR REPLACE FUNCTION reserve_outbound_stock(p_outbound_ids UUID[])
+RETURNS JSONB AS $$
+DECLARE
+    v_needed INT;
+    v_updated INT;
+    v_shortages JSONB;
+BEGIN
+    BEGIN
+        -- 관련 재고 행만 item_id 순서로 잠금 (교착 상태 방지)
+        PERFORM 1
+        FROM stocks s
+        WHERE s.item_id IN (
+            SELECT oi.item_id FROM outbound_items oi WHERE oi.outbound_id = ANY(p_outbound_ids)
+        )
+        ORDER BY s.item_id
+        FOR UPDATE;
+
+        SELECT COUNT(DISTINCT oi.item_id) INTO v_needed
+        FROM outbound_items oi
+        WHERE oi.outbound_id = ANY(p_outbound_ids);
+
+        WITH demand AS (
+            SELECT oi.item_id, SUM(oi.qty) AS qty
+            FROM outbound_items oi
+            WHERE oi.outbound_id = ANY(p_outbound_ids)
+            GROUP BY oi.item_id
+        ),
+        updated AS (
+            UPDATE stocks s
+            SET reserved = s.reserved + d.qty,
+                version = s.version + 1,
+                updated_at = NOW()
+            FROM demand d
+            WHERE s.item_id = d.item_id
+              AND s.onhand - s.reserved >= d.qty
+            RETURNING s.item_id
+        )
+        SELECT COUNT(*) INTO v_updated FROM updated;
+
+        IF v_updated < v_needed THEN
+            RAISE EXCEPTION 'insufficient stock' USING ERRCODE = 'ER001';
+        END IF;
+
+        INSERT INTO stock_reservations (outbound_id, item_id, qty)
+        SELECT oi.outbound_id, oi.item_id, SUM(oi.qty)
+        FROM outbound_items oi
+        WHERE oi.outbound_id = ANY(p_outbound_ids)
+        GROUP BY oi.outbound_id, oi.item_id
+        ON CONFLICT (outbound_id, item_id) DO UPDATE SET qty = EXCLUDED.qty;
+
+        RETURN '[]'::jsonb;
+    EXCEPTION WHEN SQLSTATE 'ER001' THEN
+        WITH demand AS (
+            SELECT oi.item_id, SUM(oi.qty) AS qty
+            FROM outbound_items oi
+            WHERE oi.outbound_id = ANY(p_outbound_ids)
+            GROUP BY oi.item_id
+        )
+        SELECT COALESCE(
+            jsonb_agg(
+                jsonb_build_object(
+                    'item_id', d.item_id,
+                    'required', d.qty,
+                    'available', COALESCE(s.onhand - s.reserved, 0),
+                    'reason', CASE WHEN s.item_id IS NULL THEN 'stock_not_found' ELSE 'insufficient' END
+                )
+                ORDER BY d.item_id
+            ),
+            '[]'::jsonb
+        )
+        INTO v_shortages
+        FROM demand d
+        LEFT JOIN stocks s ON s.item_id = d.item_id
+        WHERE s.item_id IS NULL OR s.onhand - s.reserved < d.qty;
+
+        RETURN v_shortages;
+    END;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. 예약 해제 (내부 함수)
+CREATE OR REPLACE FUNCTION release_outbound_stock(p_outbound_ids UUID[])
+RETURNS VOID AS $$
+BEGIN
+    UPDATE stocks s
+    SET reserved = GREATEST(s.reserved - r.qty, 0),
+        version = s.version + 1,
+        updated_at = NOW()
+    FROM (
+        SELECT item_id, SUM(qty) AS qty
+        FROM stock_reservations
+        WHERE outbound_id = ANY(p_outbound_ids)
+        GROUP BY item_id
+    ) r
+    WHERE s.item_id = r.item_id;
+
+    DELETE FROM stock_reservations WHERE outbound_id = ANY(p_outbound_ids);
+END;
+$$ LANGUAGE plpgsql;
+
+-- 5. 출고 재고 차감: 예약분을 함께 소진하도록 재정의 (008 대체)
+CREATE OR REPLACE FUNCTION deduct_outbound_stock(p_outbound_ids UUID[])
+RETURNS JSONB AS $$
+DECLARE
+    v_shortages JSONB;
+BEGIN
+    PERFORM 1
+    FROM stocks s
+    WHERE s.item_id IN (
+        SELECT oi.item_id FROM outbound_items oi WHERE oi.outbound_id = ANY(p_outbound_ids)
+    )
+    ORDER BY s.item_id
+    FOR UPDATE;
+
+    WITH demand AS (
+        SELECT oi.item_id, SUM(oi.qty) AS qty
+        FROM outbound_items oi
+        WHERE oi.outbound_id = ANY(p_outbound_ids)
+        GROUP BY oi.item_id
+    )
+    SELECT COALESCE(
+        jsonb_agg(
+            jsonb_build_object(
+                'item_id', d.item_id,
+                'required', d.qty,
+                'available', COALESCE(s.onhand, 0),
+                'reason', CASE WHEN s.item_id IS NULL THEN 'stock_not_found' ELSE 'insufficient' END
+            )
+            ORDER BY d.item_id
+        ),
+        '[]'::jsonb
+    )
+    INTO v_shortages
+    FROM demand d
+    LEFT JOIN stocks s ON s.item_id = d.item_id
+    WHERE s.item_id IS NULL OR s.onhand < d.qty;
+
+    IF jsonb_array_length(v_shortages) > 0 THEN
+        RETURN v_shortages;
+    END IF;
+
+    UPDATE stocks s
+    SET onhand = s.onhand - d.qty,
+        reserved = GREATEST(s.reserved - d.reserved_qty, 0),
+        version = s.version + 1,
+        updated_at = NOW()
+    FROM (
+        SELECT oi.item_id,
+               SUM(oi.qty) AS qty,
+               COALESCE((
+                   SELECT SUM(r.qty) FROM stock_reservations r
+                   WHERE r.outbound_id = ANY(p_outbound_ids) AND r.item_id = oi.item_id
+               ), 0) AS reserved_qty
+        FROM outbound_items oi
+        WHERE oi.outbound_id = ANY(p_outbound_ids)
+        GROUP BY oi.item_id
+    ) d
+    WHERE s.item_id = d.item_id;
+
+    DELETE FROM stock_reservations WHERE outbound_id = ANY(p_outbound_ids);
+
+    RETURN '[]'::jsonb;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 6. 출고 확정 함수 (DRAFT → CONFIRMED, 재고 예약)
+CREATE OR REPLACE FUNCTION confirm_outbound(
+    p_outbound_id UUID,
+    p_actor TEXT DEFAULT 'system'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_status TEXT;
+    v_shortages JSONB;
+BEGIN
+    SELECT status INTO v_status FROM outbounds WHERE id = p_outbound_id FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'not_found');
+    END IF;
+
+    IF v_status <> 'DRAFT' THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'invalid_status', 'status', v_status);
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM outbound_items WHERE outbound_id = p_outbound_id) THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'no_items');
+    END IF;
+
+    v_shortages := reserve_outbound_stock(ARRAY[p_outbound_id]);
+    IF jsonb_array_length(v_shortages) > 0 THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'insufficient_stock', 'shortages', v_shortages);
+    END IF;
+
+    UPDATE outbounds SET status = 'CONFIRMED', updated_at = NOW() WHERE id = p_outbound_id;
+
+    INSERT INTO flows (entity_type, entity_id, from_status, to_status, actor, payload)
+    VALUES ('outbound', p_outbound_id, 'DRAFT', 'CONFIRMED', p_actor,
+            jsonb_build_object('timestamp', NOW()));
+
+    RETURN jsonb_build_object('ok', true, 'status', 'CONFIRMED');
+END;
+$$ LANGUAGE plpgsql;
+
+-- 7. 출고 취소 함수 (DRAFT/CONFIRMED → CANCELED, 예약 해제)
+CREATE OR REPLACE FUNCTION cancel_outbound(
+    p_outbound_id UUID,
+    p_actor TEXT DEFAULT 'system'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_status TEXT;
+BEGIN
+    SELECT status INTO v_status FROM outbounds WHERE id = p_outbound_id FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'not_found');
+    END IF;
+
+    IF v_status NOT IN ('DRAFT', 'CONFIRMED') THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'invalid_status', 'status', v_status);
+    END IF;
+
+    IF v_status = 'CONFIRMED' THEN
+        PERFORM release_outbound_stock(ARRAY[p_outbound_id]);
+    END IF;
+
+    UPDATE outbounds SET status = 'CANCELED', updated_at = NOW() WHERE id = p_outbound_id;
+
+    INSERT INTO flows (entity_type, entity_id, from_status, to_status, actor, payload)
+    VALUES ('outbound', p_outbound_id, v_status, 'CANCELED', p_actor,
+            jsonb_build_object('timestamp', NOW()));
+
+    RETURN jsonb_build_object('ok', true, 'status', 'CANCELED');
+END;
+$$ LANGUAGE plpgsql;
+
+-- 8. 가용재고(ATP) 조회
+CREATE OR REPLACE FUNCTION get_available_to_promise(p_item_ids UUID[])
+RETURNS TABLE (
+    item_id UUID,
+    onhand NUMERIC,
+    reserved NUMERIC,
+    available NUMERIC,
+    version BIGINT
+) AS $$
+    SELECT s.item_id, s.onhand, s.reserved, s.onhand - s.reserved, s.version
+    FROM stocks s
+    WHERE s.item_id = ANY(p_item_ids);
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON TABLE stock_reservations IS '출고 문서별 재고 예약 내역';
+COMMENT ON FUNCTION confirm_outbound IS '출고 확정 (상태 변경/재고 예약/flow 기록 단일 트랜잭션)';
+COMMENT ON FUNCTION cancel_outbound IS '출고 취소 (확정 문서는 예약 해제)';
+COMMENT ON FUNCTION get_available_to_promise IS '품목별 가용재고 (onhand - reserved)';
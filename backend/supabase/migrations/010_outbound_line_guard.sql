@@ -0,0 +1,51 @@
+-- =============================================================================
+-- Migration: 010_outbound_line_guard
+-- Description: 출고 라인 변경 시 문서 상태(DRAFT) 검증 트리거
+--              (API의 선조회 없이 쓰기 한 번으로 상태 조건 보장)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. 라인 변경 가드 함수
+--    부모 문서를 FOR SHARE로 잠가 확정(FOR UPDATE)과 동시에 진행되지 않도록 한다.
+--    DRAFT가 아니면 ERRCODE 'ER002' (DETAIL = 현재 상태)로 거부.
+--    부모가 없으면(CASCADE 삭제 중 등) 통과시키고 FK 제약에 맡긴다.
+--    보관 작업 등 내부 처리는 SET LOCAL erp.bypass_line_guard = 'on' 으로 우회.
+CREATE OR REPLACE FUNCTION guard_outbound_item_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_outbound_id UUID;
+    v_status TEXT;
+BEGIN
+    IF current_setting('erp.bypass_line_guard', true) = 'on' THEN
+        RETURN COALESCE(NEW, OLD);
+    END IF;
+
+    v_outbound_id := CASE WHEN TG_OP = 'DELETE' THEN OLD.outbound_id ELSE NEW.outbound_id END;
+
+    SELECT status INTO v_status FROM outbounds WHERE id = v_outbound_id FOR SHARE;
+
+    IF FOUND AND v_status <> 'DRAFT' THEN
+        RAISE EXCEPTION 'outbound_not_draft'
+            USING ERRCODE = 'ER002', DETAIL = v_status;
+    END IF;
+
+    -- 라인 이동 방지 (다른 문서로 옮기는 UPDATE)
+    IF TG_OP = 'UPDATE' AND NEW.outbound_id <> OLD.outbound_id THEN
+        RAISE EXCEPTION 'outbound_item_move_not_allowed' USING ERRCODE = 'ER002', DETAIL = v_status;
+    END IF;
+
+    RETURN COALESCE(NEW, OLD);
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. 트리거
+DROP TRIGGER IF EXISTS trg_guard_outbound_items ON outbound_items;
+CREATE TRIGGER trg_guard_outbound_items
+    BEFORE INSERT OR UPDATE OR DELETE ON outbound_items
+    FOR EACH ROW
+    EXECUTE FUNCTION guard_outbound_item_changes();
+
+-- 3. 상태 조건부 UPDATE용 인덱스 (id + status)
+CREATE INDEX IF NOT EXISTS idx_outbounds_id_status ON outbounds(id, status);
+
+COMMENT ON FUNCTION guard_outbound_item_changes IS '출고 라인 변경은 DRAFT 문서에서만 허용';
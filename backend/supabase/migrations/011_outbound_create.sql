@@ -0,0 +1,67 @@
+-- =============================================================================
+-- Migration: 011_outbound_create
+-- Description: 출고 문서 + 라인 + flow 단일 트랜잭션 생성
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 출고 문서 생성 함수
+--   p_outbound_no: 앱에서 예약한 문서번호 (NULL이면 카운터에서 할당)
+--   p_header: {"store_id", "customer_id", "memo"}
+--   p_items: [{"item_id", "qty", "unit_price"}, ...]
+--   반환값: 문서 행 + "items" (입력 순서 유지)
+CREATE OR REPLACE FUNCTION create_outbound_with_items(
+    p_outbound_no TEXT,
+    p_header JSONB,
+    p_items JSONB DEFAULT '[]'::jsonb,
+    p_actor TEXT DEFAULT 'system'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_outbound outbounds;
+    v_outbound_no TEXT := p_outbound_no;
+    v_items JSONB;
+BEGIN
+    IF v_outbound_no IS NULL THEN
+        v_outbound_no := to_char(CURRENT_DATE, 'YYYYMMDD') || '-' ||
+            lpad(allocate_document_numbers('outbound', CURRENT_DATE, 1)::TEXT, 4, '0');
+    END IF;
+
+    INSERT INTO outbounds (outbound_no, status, store_id, customer_id, memo)
+    VALUES (
+        v_outbound_no,
+        'DRAFT',
+        NULLIF(p_header->>'store_id', '')::UUID,
+        NULLIF(p_header->>'customer_id', '')::UUID,
+        p_header->>'memo'
+    )
+    RETURNING * INTO v_outbound;
+
+    WITH src AS (
+        SELECT gen_random_uuid() AS id, t.ord, t.line
+        FROM jsonb_array_elements(COALESCE(p_items, '[]'::jsonb)) WITH ORDINALITY AS t(line, ord)
+    ),
+    inserted AS (
+        INSERT INTO outbound_items (id, outbound_id, item_id, qty, unit_price)
+        SELECT
+            src.id,
+            v_outbound.id,
+            (src.line->>'item_id')::UUID,
+            (src.line->>'qty')::NUMERIC,
+            COALESCE((src.line->>'unit_price')::NUMERIC, 0)
+        FROM src
+        RETURNING *
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(inserted) ORDER BY src.ord), '[]'::jsonb)
+    INTO v_items
+    FROM inserted
+    JOIN src ON src.id = inserted.id;
+
+    INSERT INTO flows (entity_type, entity_id, from_status, to_status, actor, payload)
+    VALUES ('outbound', v_outbound.id, NULL, 'DRAFT', p_actor,
+            jsonb_build_object('timestamp', NOW()));
+
+    RETURN to_jsonb(v_outbound) || jsonb_build_object('items', v_items);
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION create_outbound_with_items IS '출고 문서/라인/flow 단일 트랜잭션 생성';
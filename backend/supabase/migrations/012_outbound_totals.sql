@@ -0,0 +1,60 @@
+-- =============================================================================
+-- Migration: 012_outbound_totals
+-- Description: 출고 문서 라인 수/수량/금액 집계 컬럼 (라인 변경 시 트리거로 갱신)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. 집계 컬럼
+ALTER TABLE outbounds
+ADD COLUMN IF NOT EXISTS line_count INT NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS total_qty NUMERIC(18, 4) NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS total_amount NUMERIC(18, 4) NOT NULL DEFAULT 0;
+
+-- 2. 라인 변경 시 문서 집계 증분 갱신
+CREATE OR REPLACE FUNCTION update_outbound_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE outbounds
+        SET line_count = line_count - 1,
+            total_qty = total_qty - OLD.qty,
+            total_amount = total_amount - OLD.qty * OLD.unit_price
+        WHERE id = OLD.outbound_id;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE outbounds
+        SET line_count = line_count + 1,
+            total_qty = total_qty + NEW.qty,
+            total_amount = total_amount + NEW.qty * NEW.unit_price
+        WHERE id = NEW.outbound_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_outbound_totals ON outbound_items;
+CREATE TRIGGER trg_outbound_totals
+    AFTER INSERT OR UPDATE OF qty, unit_price, outbound_id OR DELETE ON outbound_items
+    FOR EACH ROW
+    EXECUTE FUNCTION update_outbound_totals();
+
+-- 3. 기존 문서 집계 초기화
+UPDATE outbounds o
+SET line_count = COALESCE(t.line_count, 0),
+    total_qty = COALESCE(t.total_qty, 0),
+    total_amount = COALESCE(t.total_amount, 0)
+FROM (
+    SELECT o2.id,
+           COUNT(oi.id) AS line_count,
+           SUM(oi.qty) AS total_qty,
+           SUM(oi.qty * oi.unit_price) AS total_amount
+    FROM outbounds o2
+    LEFT JOIN outbound_items oi ON oi.outbound_id = o2.id
+    GROUP BY o2.id
+) t
+WHERE o.id = t.id;
+
+COMMENT ON COLUMN outbounds.line_count IS '라인 수 (trg_outbound_totals 갱신)';
+COMMENT ON COLUMN outbounds.total_amount IS '합계 금액 sum(qty * unit_price) (trg_outbound_totals 갱신)';
@@ -0,0 +1,131 @@
+-- =============================================================================
+-- Migration: 013_outbound_search
+-- Description: 출고 검색 인덱스 (문서번호/메모/고객명/라인 SKU) + 상태/기간 복합 인덱스
+-- Date: 2026-10-19
+-- =============================================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 1. 검색 텍스트 / tsvector 컬럼
+ALTER TABLE outbounds
+ADD COLUMN IF NOT EXISTS search_text TEXT NOT NULL DEFAULT '';
+
+ALTER TABLE outbounds
+ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('simple', search_text)) STORED;
+
+-- 2. 검색 텍스트 생성 함수
+CREATE OR REPLACE FUNCTION build_outbound_search_text(
+    p_outbound_id UUID,
+    p_outbound_no TEXT,
+    p_memo TEXT,
+    p_customer_id UUID
+)
+RETURNS TEXT AS $$
+DECLARE
+    v_customer TEXT;
+    v_skus TEXT;
+BEGIN
+    SELECT c.name INTO v_customer FROM customers c WHERE c.id = p_customer_id;
+
+    SELECT string_agg(DISTINCT i.sku, ' ') INTO v_skus
+    FROM outbound_items oi
+    JOIN items i ON i.id = oi.item_id
+    WHERE oi.outbound_id = p_outbound_id;
+
+    RETURN lower(concat_ws(' ', p_outbound_no, p_memo, v_customer, v_skus));
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- 3. 문서 변경 시 검색 텍스트 갱신
+CREATE OR REPLACE FUNCTION set_outbound_search_text()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_text := build_outbound_search_text(NEW.id, NEW.outbound_no, NEW.memo, NEW.customer_id);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_outbound_search_text ON outbounds;
+CREATE TRIGGER trg_outbound_search_text
+    BEFORE INSERT OR UPDATE OF outbound_no, memo, customer_id ON outbounds
+    FOR EACH ROW
+    EXECUTE FUNCTION set_outbound_search_text();
+
+-- 4. 라인 변경 시 검색 텍스트 갱신 (SKU 반영)
+CREATE OR REPLACE FUNCTION refresh_outbound_search_text()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_outbound_id UUID := CASE WHEN TG_OP = 'DELETE' THEN OLD.outbound_id ELSE NEW.outbound_id END;
+BEGIN
+    UPDATE outbounds o
+    SET search_text = build_outbound_search_text(o.id, o.outbound_no, o.memo, o.customer_id)
+    WHERE o.id = v_outbound_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_outbound_items_search_text ON outbound_items;
+CREATE TRIGGER trg_outbound_items_search_text
+    AFTER INSERT OR UPDATE OF item_id OR DELETE ON outbound_items
+    FOR EACH ROW
+    EXECUTE FUNCTION refresh_outbound_search_text();
+
+-- 5. 기존 문서 초기화
+UPDATE outbounds o
+SET search_text = build_outbound_search_text(o.id, o.outbound_no, o.memo, o.customer_id);
+
+-- 6. 인덱스
+CREATE INDEX IF NOT EXISTS idx_outbounds_search_trgm ON outbounds USING gin (search_text gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_outbounds_search_vector ON outbounds USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS idx_outbounds_status_created_at ON outbounds(status, created_at DESC);
+
+-- 7. 검색 함수 (파라미터 바인딩 - 필터 문자열 조합 없음)
+--    랭킹: 문서번호 일치 > 문서번호 접두사 > 전문검색 점수 + 트라이그램 유사도
+CREATE OR REPLACE FUNCTION search_outbounds(
+    p_query TEXT,
+    p_status TEXT DEFAULT NULL,
+    p_date_from TIMESTAMPTZ DEFAULT NULL,
+    p_date_to TIMESTAMPTZ DEFAULT NULL,
+    p_limit INT DEFAULT 20,
+    p_offset INT DEFAULT 0
+)
+RETURNS TABLE (outbound JSONB, rank REAL, total BIGINT) AS $$
+DECLARE
+    v_term TEXT := lower(trim(p_query));
+    v_like TEXT;
+    v_tsquery TSQUERY;
+BEGIN
+    IF v_term IS NULL OR v_term = '' THEN
+        RETURN;
+    END IF;
+
+    v_like := replace(replace(replace(v_term, '\', '\\'), '%', '\%'), '_', '\_');
+    v_tsquery := plainto_tsquery('simple', v_term);
+
+    RETURN QUERY
+    SELECT
+        to_jsonb(o) - 'search_text' - 'search_vector' AS outbound,
+        (
+            CASE
+                WHEN lower(o.outbound_no) = v_term THEN 3.0
+                WHEN lower(o.outbound_no) LIKE v_like || '%' THEN 2.0
+                ELSE 0.0
+            END
+            + ts_rank(o.search_vector, v_tsquery)
+            + word_similarity(v_term, o.search_text)
+        )::REAL AS rank,
+        COUNT(*) OVER () AS total
+    FROM outbounds o
+    WHERE (p_status IS NULL OR o.status = p_status)
+      AND (p_date_from IS NULL OR o.created_at >= p_date_from)
+      AND (p_date_to IS NULL OR o.created_at < p_date_to)
+      AND (o.search_text LIKE '%' || v_like || '%' OR o.search_vector @@ v_tsquery)
+    ORDER BY rank DESC, o.created_at DESC
+    LIMIT LEAST(GREATEST(COALESCE(p_limit, 20), 1), 200)
+    OFFSET GREATEST(COALESCE(p_offset, 0), 0);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON COLUMN outbounds.search_text IS '검색용 텍스트 (문서번호/메모/고객명/라인 SKU, 트리거 갱신)';
+COMMENT ON FUNCTION search_outbounds IS '출고 검색 (트라이그램/전문검색 인덱스, 랭킹)';
@@ -0,0 +1,132 @@
+-- =============================================================================
+-- Migration: 014_outbound_batch_transition
+-- Description: 출고 문서 일괄 확정/반영/취소 (재고는 품목별 합산 후 일괄 처리)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 일괄 상태 전이 함수
+--   p_target: 'CONFIRMED' | 'POSTED' | 'CANCELED'
+--   반환값: 요청 순서대로 [{"id", "ok", "status" | "error", ...}, ...]
+--
+--   1) 전체 문서를 id 순서로 잠그고 상태/라인 검증
+--   2) 재고 처리: 대상 문서 전체를 품목별로 합산해 한 번에 예약/차감.
+--      부족 시에는 요청 순서대로 문서 단위 처리로 전환 (가능한 문서만 성공)
+--   3) 성공 문서 상태 변경 / flow 기록을 각각 한 문장으로 처리
+CREATE OR REPLACE FUNCTION transition_outbounds_batch(
+    p_ids UUID[],
+    p_target TEXT,
+    p_actor TEXT DEFAULT 'system'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_ids UUID[];
+    v_from TEXT[];
+    v_eligible UUID[] := ARRAY[]::UUID[];
+    v_results JSONB := '{}'::jsonb;
+    v_shortages JSONB;
+    v_id UUID;
+    v_row RECORD;
+BEGIN
+    v_from := CASE p_target
+        WHEN 'CONFIRMED' THEN ARRAY['DRAFT']
+        WHEN 'POSTED' THEN ARRAY['CONFIRMED']
+        WHEN 'CANCELED' THEN ARRAY['DRAFT', 'CONFIRMED']
+    END;
+
+    IF v_from IS NULL THEN
+        RAISE EXCEPTION 'Invalid target status: %', p_target;
+    END IF;
+
+    -- 중복 제거 (요청 순서 유지)
+    SELECT array_agg(t.id ORDER BY t.ord) INTO v_ids
+    FROM (
+        SELECT DISTINCT ON (u.id) u.id, u.ord
+        FROM unnest(p_ids) WITH ORDINALITY AS u(id, ord)
+        ORDER BY u.id, u.ord
+    ) t;
+
+    IF v_ids IS NULL THEN
+        RETURN '[]'::jsonb;
+    END IF;
+
+    -- 1. 잠금 및 검증
+    FOR v_row IN
+        SELECT o.id, o.status,
+               EXISTS (SELECT 1 FROM outbound_items oi WHERE oi.outbound_id = o.id) AS has_items
+        FROM outbounds o
+        WHERE o.id = ANY(v_ids)
+        ORDER BY o.id
+        FOR UPDATE OF o
+    LOOP
+        IF NOT (v_row.status = ANY(v_from)) THEN
+            v_results := v_results || jsonb_build_object(v_row.id::TEXT,
+                jsonb_build_object('ok', false, 'error', 'invalid_status', 'status', v_row.status));
+        ELSIF p_target = 'CONFIRMED' AND NOT v_row.has_items THEN
+            v_results := v_results || jsonb_build_object(v_row.id::TEXT,
+                jsonb_build_object('ok', false, 'error', 'no_items'));
+        ELSE
+            v_eligible := array_append(v_eligible, v_row.id);
+            v_results := v_results || jsonb_build_object(v_row.id::TEXT,
+                jsonb_build_object('ok', true, 'from', v_row.status));
+        END IF;
+    END LOOP;
+
+    -- 2. 재고 처리
+    IF p_target IN ('CONFIRMED', 'POSTED') AND cardinality(v_eligible) > 0 THEN
+        IF p_target = 'CONFIRMED' THEN
+            v_shortages := reserve_outbound_stock(v_eligible);
+        ELSE
+            v_shortages := deduct_outbound_stock(v_eligible);
+        END IF;
+
+        IF jsonb_array_length(v_shortages) > 0 THEN
+            -- 합산 기준 부족 → 문서 단위로 순서대로 처리
+            FOREACH v_id IN ARRAY v_ids LOOP
+                CONTINUE WHEN NOT (v_id = ANY(v_eligible));
+
+                IF p_target = 'CONFIRMED' THEN
+                    v_shortages := reserve_outbound_stock(ARRAY[v_id]);
+                ELSE
+                    v_shortages := deduct_outbound_stock(ARRAY[v_id]);
+                END IF;
+
+                IF jsonb_array_length(v_shortages) > 0 THEN
+                    v_eligible := array_remove(v_eligible, v_id);
+                    v_results := v_results || jsonb_build_object(v_id::TEXT,
+                        jsonb_build_object('ok', false, 'error', 'insufficient_stock', 'shortages', v_shortages));
+                END IF;
+            END LOOP;
+        END IF;
+    ELSIF p_target = 'CANCELED' THEN
+        PERFORM release_outbound_stock(ARRAY(
+            SELECT e.id FROM unnest(v_eligible) AS e(id)
+            WHERE v_results->(e.id::TEXT)->>'from' = 'CONFIRMED'
+        ));
+    END IF;
+
+    -- 3. 상태 변경 / flow 기록
+    UPDATE outbounds
+    SET status = p_target, updated_at = NOW()
+    WHERE id = ANY(v_eligible);
+
+    INSERT INTO flows (entity_type, entity_id, from_status, to_status, actor, payload)
+    SELECT 'outbound', e.id, v_results->(e.id::TEXT)->>'from', p_target, p_actor,
+           jsonb_build_object('timestamp', NOW(), 'batch', true)
+    FROM unnest(v_eligible) AS e(id);
+
+    RETURN (
+        SELECT jsonb_agg(
+            jsonb_build_object('id', t.id) ||
+            CASE
+                WHEN v_results ? t.id::TEXT AND (v_results->(t.id::TEXT)->>'ok')::BOOLEAN
+                    THEN jsonb_build_object('ok', true, 'status', p_target)
+                ELSE COALESCE(v_results->(t.id::TEXT), jsonb_build_object('ok', false, 'error', 'not_found'))
+            END
+            ORDER BY t.ord
+        )
+        FROM unnest(v_ids) WITH ORDINALITY AS t(id, ord)
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION transition_outbounds_batch IS '출고 문서 일괄 상태 전이 (재고 품목별 합산 처리)';
@@ -0,0 +1,126 @@
+-- =============================================================================
+-- Migration: 015_outbound_replace_items
+-- Description: 출고 라인 전체 교체 (diff 계산 후 INSERT/UPDATE/DELETE 일괄 적용)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 출고 라인 교체 함수
+--   p_items: 최종 라인 집합 [{"id"?, "item_id", "qty", "unit_price"}, ...]
+--     - id 있음: 기존 라인 수정 (값이 바뀐 경우만)
+--     - id 없음: 신규 라인
+--     - 목록에 없는 기존 라인: 삭제
+--   반환값: {"ok": true, "inserted", "updated", "deleted", "items": [...]} (입력 순서)
+--           {"ok": false, "error": "not_found" | "invalid_status" | "line_not_found" | "duplicate_line", ...}
+--
+--   상태 검증은 헤더를 FOR UPDATE로 잠근 뒤 한 번만 수행하고,
+--   이후 라인 쓰기는 가드 트리거(행 단위 FOR SHARE)를 우회한다.
+CREATE OR REPLACE FUNCTION replace_outbound_items(
+    p_outbound_id UUID,
+    p_items JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_status TEXT;
+    v_unknown JSONB;
+    v_inserted INT;
+    v_updated INT;
+    v_deleted INT;
+    v_items JSONB;
+BEGIN
+    -- 1. 상태 검증 (한 번)
+    SELECT status INTO v_status FROM outbounds WHERE id = p_outbound_id FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'not_found');
+    END IF;
+
+    IF v_status <> 'DRAFT' THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'invalid_status', 'status', v_status);
+    END IF;
+
+    CREATE TEMP TABLE IF NOT EXISTS tmp_outbound_lines (
+        ord BIGINT,
+        id UUID,
+        item_id UUID,
+        qty NUMERIC,
+        unit_price NUMERIC
+    ) ON COMMIT DROP;
+    TRUNCATE tmp_outbound_lines;
+
+    INSERT INTO tmp_outbound_lines (ord, id, item_id, qty, unit_price)
+    SELECT
+        t.ord,
+        COALESCE(NULLIF(t.line->>'id', '')::UUID, gen_random_uuid()),
+        (t.line->>'item_id')::UUID,
+        (t.line->>'qty')::NUMERIC,
+        COALESCE((t.line->>'unit_price')::NUMERIC, 0)
+    FROM jsonb_array_elements(COALESCE(p_items, '[]'::jsonb)) WITH ORDINALITY AS t(line, ord);
+
+    -- 2. 다른 문서의 라인이거나 존재하지 않는 id 거부
+    SELECT jsonb_agg(l.line->>'id')
+    INTO v_unknown
+    FROM jsonb_array_elements(COALESCE(p_items, '[]'::jsonb)) AS l(line)
+    WHERE NULLIF(l.line->>'id', '') IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM outbound_items oi
+          WHERE oi.id = (l.line->>'id')::UUID AND oi.outbound_id = p_outbound_id
+      );
+
+    IF v_unknown IS NOT NULL THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'line_not_found', 'ids', v_unknown);
+    END IF;
+
+    SELECT jsonb_agg(d.id)
+    INTO v_unknown
+    FROM (SELECT id FROM tmp_outbound_lines GROUP BY id HAVING COUNT(*) > 1) d;
+
+    IF v_unknown IS NOT NULL THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'duplicate_line', 'ids', v_unknown);
+    END IF;
+
+    PERFORM set_config('erp.bypass_line_guard', 'on', true);
+
+    -- 3. diff 적용
+    DELETE FROM outbound_items oi
+    WHERE oi.outbound_id = p_outbound_id
+      AND NOT EXISTS (SELECT 1 FROM tmp_outbound_lines t WHERE t.id = oi.id);
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+
+    UPDATE outbound_items oi
+    SET item_id = t.item_id,
+        qty = t.qty,
+        unit_price = t.unit_price,
+        updated_at = NOW()
+    FROM tmp_outbound_lines t
+    WHERE oi.id = t.id
+      AND oi.outbound_id = p_outbound_id
+      AND (oi.item_id, oi.qty, oi.unit_price) IS DISTINCT FROM (t.item_id, t.qty, t.unit_price);
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+
+    INSERT INTO outbound_items (id, outbound_id, item_id, qty, unit_price)
+    SELECT t.id, p_outbound_id, t.item_id, t.qty, t.unit_price
+    FROM tmp_outbound_lines t
+    WHERE NOT EXISTS (SELECT 1 FROM outbound_items oi WHERE oi.id = t.id)
+    ORDER BY t.ord;
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+
+    PERFORM set_config('erp.bypass_line_guard', 'off', true);
+
+    UPDATE outbounds SET updated_at = NOW() WHERE id = p_outbound_id;
+
+    SELECT COALESCE(jsonb_agg(to_jsonb(oi) ORDER BY t.ord), '[]'::jsonb)
+    INTO v_items
+    FROM tmp_outbound_lines t
+    JOIN outbound_items oi ON oi.id = t.id;
+
+    RETURN jsonb_build_object(
+        'ok', true,
+        'inserted', v_inserted,
+        'updated', v_updated,
+        'deleted', v_deleted,
+        'items', v_items
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION replace_outbound_items IS '출고 라인 전체 교체 (DRAFT, 상태 검증 1회 + 일괄 diff 적용)';
@@ -0,0 +1,225 @@
+-- =============================================================================
+-- Migration: 016_stock_ledger
+-- Description: 재고 이동 원장(append-only) + 품목별 주기 스냅샷, 시점 재고 조회
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. stock_movements 원장 컬럼 정비
+--    (001의 INT 수량 → stocks/outbound_items와 같은 NUMERIC, 사용자 참조 대신 actor 문자열)
+ALTER TABLE stock_movements
+    ALTER COLUMN quantity TYPE NUMERIC(18, 4),
+    ALTER COLUMN before_stock TYPE NUMERIC(18, 4),
+    ALTER COLUMN after_stock TYPE NUMERIC(18, 4),
+    ALTER COLUMN before_stock DROP NOT NULL,
+    ALTER COLUMN after_stock DROP NOT NULL,
+    ALTER COLUMN created_at SET NOT NULL;
+
+ALTER TABLE stock_movements
+    ADD COLUMN IF NOT EXISTS warehouse_id UUID,
+    ADD COLUMN IF NOT EXISTS unit_cost NUMERIC(18, 4),
+    ADD COLUMN IF NOT EXISTS actor TEXT;
+
+-- 시점 조회: 품목별 (item_id, created_at) 범위 합산 / 스냅샷 작성 시 기간 스캔
+CREATE INDEX IF NOT EXISTS idx_movements_item ON stock_movements(item_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_movements_created_at ON stock_movements(created_at);
+CREATE INDEX IF NOT EXISTS idx_movements_reference ON stock_movements(reference_type, reference_id);
+
+-- 2. append-only 보장 (정정은 반대 부호의 adjustment 행으로)
+CREATE OR REPLACE FUNCTION prevent_stock_movement_changes()
+RETURNS TRIGGER AS $$
+BEGIN
+    RAISE EXCEPTION 'stock_movements is append-only'
+        USING ERRCODE = 'ER003', HINT = 'Insert a compensating adjustment movement instead';
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_stock_movements_append_only ON stock_movements;
+CREATE TRIGGER trg_stock_movements_append_only
+    BEFORE UPDATE OR DELETE ON stock_movements
+    FOR EACH ROW
+    EXECUTE FUNCTION prevent_stock_movement_changes();
+
+-- 3. 품목별 재고 스냅샷 (snapshot_at 시점까지의 이동 반영 잔량)
+CREATE TABLE IF NOT EXISTS stock_snapshots (
+    item_id UUID NOT NULL,
+    snapshot_at TIMESTAMPTZ NOT NULL,
+    onhand NUMERIC(18, 4) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (item_id, snapshot_at)
+);
+
+CREATE INDEX IF NOT EXISTS idx_stock_snapshots_at ON stock_snapshots(snapshot_at);
+
+ALTER TABLE stock_snapshots ENABLE ROW LEVEL SECURITY;
+
+-- 4. 기초 잔량: 원장 도입 이전 재고를 adjustment 이동으로 등록
+INSERT INTO stock_movements (item_id, movement_type, quantity, reference_type,
+                             before_stock, after_stock, note, actor)
+SELECT s.item_id, 'adjustment', s.onhand, 'opening', 0, s.onhand,
+       'Opening balance (016_stock_ledger)', 'system'
+FROM stocks s
+WHERE s.onhand <> 0
+  AND NOT EXISTS (
+      SELECT 1 FROM stock_movements m
+      WHERE m.item_id = s.item_id AND m.reference_type = 'opening'
+  );
+
+-- 5. 시점 재고 조회
+--    품목별로 p_at 이전 가장 가까운 스냅샷 + (스냅샷, p_at] 구간 이동 합계.
+--    스냅샷이 없으면 p_at까지 원장 전체 합계.
+CREATE OR REPLACE FUNCTION get_stock_as_of(
+    p_at TIMESTAMPTZ,
+    p_item_ids UUID[] DEFAULT NULL
+)
+RETURNS TABLE (
+    item_id UUID,
+    onhand NUMERIC,
+    snapshot_at TIMESTAMPTZ
+) AS $$
+    SELECT
+        i.item_id,
+        COALESCE(snap.onhand, 0) + COALESCE(delta.qty, 0),
+        snap.snapshot_at
+    FROM (
+        SELECT s.item_id FROM stocks s
+        WHERE p_item_ids IS NULL OR s.item_id = ANY(p_item_ids)
+    ) i
+    LEFT JOIN LATERAL (
+        SELECT ss.onhand, ss.snapshot_at
+        FROM stock_snapshots ss
+        WHERE ss.item_id = i.item_id AND ss.snapshot_at <= p_at
+        ORDER BY ss.snapshot_at DESC
+        LIMIT 1
+    ) snap ON true
+    LEFT JOIN LATERAL (
+        SELECT SUM(m.quantity) AS qty
+        FROM stock_movements m
+        WHERE m.item_id = i.item_id
+          AND m.created_at <= p_at
+          AND (snap.snapshot_at IS NULL OR m.created_at > snap.snapshot_at)
+    ) delta ON true;
+$$ LANGUAGE sql STABLE;
+
+-- 6. 스냅샷 작성 (주기 작업 / 수동 호출)
+--    반환값: 작성된 스냅샷 행 수 (이미 있는 시점은 건너뜀)
+CREATE OR REPLACE FUNCTION take_stock_snapshots(p_at TIMESTAMPTZ DEFAULT NULL)
+RETURNS INT AS $$
+DECLARE
+    v_at TIMESTAMPTZ := COALESCE(p_at, date_trunc('day', NOW()));
+    v_count INT;
+BEGIN
+    INSERT INTO stock_snapshots (item_id, snapshot_at, onhand)
+    SELECT a.item_id, v_at, a.onhand
+    FROM get_stock_as_of(v_at) a
+    ON CONFLICT (item_id, snapshot_at) DO NOTHING;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 7. 출고 재고 차감: 원장 기록 추가 (009 대체)
+--    문서·품목별로 이동 1행, before/after는 같은 품목 내 문서 id 순 누적으로 계산
+CREATE OR REPLACE FUNCTION deduct_outbound_stock(p_outbound_ids UUID[])
+RETURNS JSONB AS $$
+DECLARE
+    v_shortages JSONB;
+BEGIN
+    PERFORM 1
+    FROM stocks s
+    WHERE s.item_id IN (
+        SELECT oi.item_id FROM outbound_items oi WHERE oi.outbound_id = ANY(p_outbound_ids)
+    )
+    ORDER BY s.item_id
+    FOR UPDATE;
+
+    WITH demand AS (
+        SELECT oi.item_id, SUM(oi.qty) AS qty
+        FROM outbound_items oi
+        WHERE oi.outbound_id = ANY(p_outbound_ids)
+        GROUP BY oi.item_id
+    )
+    SELECT COALESCE(
+        jsonb_agg(
+            jsonb_build_object(
+                'item_id', d.item_id,
+                'required', d.qty,
+                'available', COALESCE(s.onhand, 0),
+                'reason', CASE WHEN s.item_id IS NULL THEN 'stock_not_found' ELSE 'insufficient' END
+            )
+            ORDER BY d.item_id
+        ),
+        '[]'::jsonb
+    )
+    INTO v_shortages
+    FROM demand d
+    LEFT JOIN stocks s ON s.item_id = d.item_id
+    WHERE s.item_id IS NULL OR s.onhand < d.qty;
+
+    IF jsonb_array_length(v_shortages) > 0 THEN
+        RETURN v_shortages;
+    END IF;
+
+    WITH lines AS (
+        SELECT oi.outbound_id, oi.item_id, SUM(oi.qty) AS qty
+        FROM outbound_items oi
+        WHERE oi.outbound_id = ANY(p_outbound_ids)
+        GROUP BY oi.outbound_id, oi.item_id
+    ),
+    demand AS (
+        SELECT l.item_id,
+               SUM(l.qty) AS qty,
+               COALESCE((
+                   SELECT SUM(r.qty) FROM stock_reservations r
+                   WHERE r.outbound_id = ANY(p_outbound_ids) AND r.item_id = l.item_id
+               ), 0) AS reserved_qty
+        FROM lines l
+        GROUP BY l.item_id
+    ),
+    updated AS (
+        UPDATE stocks s
+        SET onhand = s.onhand - d.qty,
+            reserved = GREATEST(s.reserved - d.reserved_qty, 0),
+            version = s.version + 1,
+            updated_at = NOW()
+        FROM demand d
+        WHERE s.item_id = d.item_id
+        RETURNING s.item_id, s.onhand + d.qty AS before_total
+    )
+    INSERT INTO stock_movements (item_id, movement_type, quantity, reference_type, reference_id,
+                                 before_stock, after_stock, actor)
+    SELECT
+        l.item_id,
+        'outbound',
+        -l.qty,
+        'outbound',
+        l.outbound_id,
+        u.before_total - SUM(l.qty) OVER w + l.qty,
+        u.before_total - SUM(l.qty) OVER w,
+        'system'
+    FROM lines l
+    JOIN updated u ON u.item_id = l.item_id
+    WINDOW w AS (PARTITION BY l.item_id ORDER BY l.outbound_id
+                 ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW);
+
+    DELETE FROM stock_reservations WHERE outbound_id = ANY(p_outbound_ids);
+
+    RETURN '[]'::jsonb;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 8. 기초 스냅샷 + 일일 스냅샷 스케줄 (pg_cron 사용 가능 시)
+SELECT take_stock_snapshots(NOW());
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('stock-snapshots-daily', '5 0 * * *', 'SELECT take_stock_snapshots()');
+    END IF;
+END;
+$$;
+
+COMMENT ON TABLE stock_movements IS '재고 이동 원장 (append-only, 양수: 입고 / 음수: 출고)';
+COMMENT ON TABLE stock_snapshots IS '품목별 재고 스냅샷 (시점 조회 시 원장 재생 구간 단축)';
+COMMENT ON FUNCTION get_stock_as_of IS '시점 재고 (최근 스냅샷 + 이후 이동 합계)';
+COMMENT ON FUNCTION take_stock_snapshots IS '품목별 재고 스냅샷 작성 (기본: 당일 00:00)';
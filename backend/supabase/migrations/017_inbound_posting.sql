@@ -0,0 +1,443 @@
+-- =============================================================================
+-- Migration: 017_inbound_posting
+-- Description: 입고 문서/라인 (DRAFT → CONFIRMED → POSTED), 재고 일괄 증가, 일괄 입고
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. inbounds 테이블 (출고 문서와 같은 형태)
+CREATE TABLE IF NOT EXISTS inbounds (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    inbound_no TEXT UNIQUE NOT NULL,
+    status TEXT NOT NULL DEFAULT 'DRAFT',
+    supplier_id UUID NULL,
+    warehouse_id UUID NULL,
+    reference_no TEXT NULL,
+    memo TEXT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- 001 초기 스키마(inbound_code, 소문자 상태)로 생성된 경우 정비
+ALTER TABLE inbounds
+    ADD COLUMN IF NOT EXISTS inbound_no TEXT,
+    ADD COLUMN IF NOT EXISTS supplier_id UUID,
+    ADD COLUMN IF NOT EXISTS warehouse_id UUID,
+    ADD COLUMN IF NOT EXISTS reference_no TEXT,
+    ADD COLUMN IF NOT EXISTS memo TEXT,
+    ADD COLUMN IF NOT EXISTS line_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_qty NUMERIC(18, 4) NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS total_amount NUMERIC(18, 4) NOT NULL DEFAULT 0;
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'inbounds' AND column_name = 'inbound_code'
+    ) THEN
+        ALTER TABLE inbounds ALTER COLUMN inbound_code DROP NOT NULL;
+        ALTER TABLE inbounds ALTER COLUMN requested_date DROP NOT NULL;
+        UPDATE inbounds SET inbound_no = inbound_code WHERE inbound_no IS NULL;
+        UPDATE inbounds SET memo = note WHERE memo IS NULL AND note IS NOT NULL;
+    END IF;
+END;
+$$;
+
+ALTER TABLE inbounds DROP CONSTRAINT IF EXISTS inbounds_status_check;
+
+UPDATE inbounds
+SET status = CASE status
+    WHEN 'draft' THEN 'DRAFT'
+    WHEN 'pending' THEN 'CONFIRMED'
+    WHEN 'approved' THEN 'CONFIRMED'
+    WHEN 'received' THEN 'POSTED'
+    WHEN 'cancelled' THEN 'CANCELED'
+    ELSE status
+END
+WHERE status IN ('draft', 'pending', 'approved', 'received', 'cancelled');
+
+ALTER TABLE inbounds
+    ALTER COLUMN status SET DEFAULT 'DRAFT',
+    ALTER COLUMN inbound_no SET NOT NULL,
+    ADD CONSTRAINT inbounds_status_check
+        CHECK (status IN ('DRAFT', 'CONFIRMED', 'POSTED', 'CANCELED'));
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_inbounds_inbound_no ON inbounds(inbound_no);
+CREATE INDEX IF NOT EXISTS idx_inbounds_status_created_at ON inbounds(status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_inbounds_id_status ON inbounds(id, status);
+
+-- 2. inbound_items 테이블 (입고 라인)
+CREATE TABLE IF NOT EXISTS inbound_items (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    inbound_id UUID NOT NULL REFERENCES inbounds(id) ON DELETE CASCADE,
+    item_id UUID NOT NULL,
+    qty NUMERIC(18, 4) NOT NULL CHECK (qty > 0),
+    unit_cost NUMERIC(18, 4) NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_inbound_items_inbound_id ON inbound_items(inbound_id);
+CREATE INDEX IF NOT EXISTS idx_inbound_items_item_id ON inbound_items(item_id);
+
+DROP TRIGGER IF EXISTS update_inbounds_updated_at ON inbounds;
+CREATE TRIGGER update_inbounds_updated_at
+    BEFORE UPDATE ON inbounds
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_inbound_items_updated_at ON inbound_items;
+CREATE TRIGGER update_inbound_items_updated_at
+    BEFORE UPDATE ON inbound_items
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+ALTER TABLE inbounds ENABLE ROW LEVEL SECURITY;
+ALTER TABLE inbound_items ENABLE ROW LEVEL SECURITY;
+
+-- 3. 라인 변경 가드 (010과 동일 규칙: DRAFT만, ER002 / DETAIL = 현재 상태)
+CREATE OR REPLACE FUNCTION guard_inbound_item_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_inbound_id UUID;
+    v_status TEXT;
+BEGIN
+    IF current_setting('erp.bypass_line_guard', true) = 'on' THEN
+        RETURN COALESCE(NEW, OLD);
+    END IF;
+
+    v_inbound_id := CASE WHEN TG_OP = 'DELETE' THEN OLD.inbound_id ELSE NEW.inbound_id END;
+
+    SELECT status INTO v_status FROM inbounds WHERE id = v_inbound_id FOR SHARE;
+
+    IF FOUND AND v_status <> 'DRAFT' THEN
+        RAISE EXCEPTION 'inbound_not_draft'
+            USING ERRCODE = 'ER002', DETAIL = v_status;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND NEW.inbound_id <> OLD.inbound_id THEN
+        RAISE EXCEPTION 'inbound_item_move_not_allowed' USING ERRCODE = 'ER002', DETAIL = v_status;
+    END IF;
+
+    RETURN COALESCE(NEW, OLD);
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_guard_inbound_items ON inbound_items;
+CREATE TRIGGER trg_guard_inbound_items
+    BEFORE INSERT OR UPDATE OR DELETE ON inbound_items
+    FOR EACH ROW
+    EXECUTE FUNCTION guard_inbound_item_changes();
+
+-- 4. 문서 집계 (문장 단위 트리거: 컨테이너 단위 대량 라인도 문서당 UPDATE 1회)
+CREATE OR REPLACE FUNCTION refresh_inbound_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE inbounds i
+    SET line_count = COALESCE(t.line_count, 0),
+        total_qty = COALESCE(t.total_qty, 0),
+        total_amount = COALESCE(t.total_amount, 0)
+    FROM (
+        SELECT a.inbound_id,
+               COUNT(ii.id) AS line_count,
+               SUM(ii.qty) AS total_qty,
+               SUM(ii.qty * ii.unit_cost) AS total_amount
+        FROM (SELECT DISTINCT inbound_id FROM changed_rows) a
+        LEFT JOIN inbound_items ii ON ii.inbound_id = a.inbound_id
+        GROUP BY a.inbound_id
+    ) t
+    WHERE i.id = t.inbound_id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_inbound_totals_insert ON inbound_items;
+CREATE TRIGGER trg_inbound_totals_insert
+    AFTER INSERT ON inbound_items
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_inbound_totals();
+
+DROP TRIGGER IF EXISTS trg_inbound_totals_update ON inbound_items;
+CREATE TRIGGER trg_inbound_totals_update
+    AFTER UPDATE ON inbound_items
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_inbound_totals();
+
+DROP TRIGGER IF EXISTS trg_inbound_totals_delete ON inbound_items;
+CREATE TRIGGER trg_inbound_totals_delete
+    AFTER DELETE ON inbound_items
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_inbound_totals();
+
+-- 5. 기존 입고 문서번호로 카운터 초기화
+INSERT INTO document_counters (doc_type, day, last_no)
+SELECT
+    'inbound',
+    to_date(split_part(inbound_no, '-', 1), 'YYYYMMDD'),
+    MAX(split_part(inbound_no, '-', 2)::INT)
+FROM inbounds
+WHERE inbound_no ~ '^[0-9]{8}-[0-9]+$'
+GROUP BY 1, 2
+ON CONFLICT (doc_type, day) DO UPDATE
+    SET last_no = GREATEST(document_counters.last_no, EXCLUDED.last_no);
+
+-- 6. 입고 재고 증가 (내부 함수)
+--    품목별로 합산해 stocks에 한 문장으로 upsert (item_id 순서로 잠금)하고
+--    문서·품목별 이동을 원장에 기록한다. 반환값: 원장 행 수
+CREATE UNIQUE INDEX IF NOT EXISTS uq_stocks_item_id ON stocks(item_id);
+
+CREATE OR REPLACE FUNCTION increment_inbound_stock(p_inbound_ids UUID[])
+RETURNS INT AS $$
+DECLARE
+    v_count INT;
+BEGIN
+    WITH lines AS (
+        SELECT ii.inbound_id, ib.warehouse_id, ii.item_id,
+               SUM(ii.qty) AS qty,
+               SUM(ii.qty * ii.unit_cost) AS amount
+        FROM inbound_items ii
+        JOIN inbounds ib ON ib.id = ii.inbound_id
+        WHERE ii.inbound_id = ANY(p_inbound_ids)
+        GROUP BY ii.inbound_id, ib.warehouse_id, ii.item_id
+    ),
+    supply AS (
+        SELECT item_id, SUM(qty) AS qty
+        FROM lines
+        GROUP BY item_id
+    ),
+    upserted AS (
+        INSERT INTO stocks AS s (item_id, onhand, updated_at)
+        SELECT sp.item_id, sp.qty, NOW()
+        FROM supply sp
+        ORDER BY sp.item_id
+        ON CONFLICT (item_id) DO UPDATE
+            SET onhand = s.onhand + EXCLUDED.onhand,
+                version = s.version + 1,
+                updated_at = NOW()
+        RETURNING s.item_id, s.onhand AS after_total
+    )
+    INSERT INTO stock_movements (item_id, warehouse_id, movement_type, quantity,
+                                 reference_type, reference_id, before_stock, after_stock,
+                                 unit_cost, actor)
+    SELECT
+        l.item_id,
+        l.warehouse_id,
+        'inbound',
+        l.qty,
+        'inbound',
+        l.inbound_id,
+        u.after_total - sp.qty + SUM(l.qty) OVER w - l.qty,
+        u.after_total - sp.qty + SUM(l.qty) OVER w,
+        l.amount / l.qty,
+        'system'
+    FROM lines l
+    JOIN supply sp ON sp.item_id = l.item_id
+    JOIN upserted u ON u.item_id = l.item_id
+    WINDOW w AS (PARTITION BY l.item_id ORDER BY l.inbound_id
+                 ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW);
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 7. 입고 문서 생성 (011과 동일 규칙)
+--   p_header: {"supplier_id", "warehouse_id", "reference_no", "memo"}
+--   p_items: [{"item_id", "qty", "unit_cost"}, ...]
+--   반환값: 문서 행 + "items" (입력 순서 유지)
+CREATE OR REPLACE FUNCTION create_inbound_with_items(
+    p_inbound_no TEXT,
+    p_header JSONB,
+    p_items JSONB DEFAULT '[]'::jsonb,
+    p_actor TEXT DEFAULT 'system'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_inbound inbounds;
+    v_inbound_no TEXT := p_inbound_no;
+    v_items JSONB;
+BEGIN
+    IF v_inbound_no IS NULL THEN
+        v_inbound_no := to_char(CURRENT_DATE, 'YYYYMMDD') || '-' ||
+            lpad(allocate_document_numbers('inbound', CURRENT_DATE, 1)::TEXT, 4, '0');
+    END IF;
+
+    INSERT INTO inbounds (inbound_no, status, supplier_id, warehouse_id, reference_no, memo)
+    VALUES (
+        v_inbound_no,
+        'DRAFT',
+        NULLIF(p_header->>'supplier_id', '')::UUID,
+        NULLIF(p_header->>'warehouse_id', '')::UUID,
+        p_header->>'reference_no',
+        p_header->>'memo'
+    )
+    RETURNING * INTO v_inbound;
+
+    WITH src AS (
+        SELECT gen_random_uuid() AS id, t.ord, t.line
+        FROM jsonb_array_elements(COALESCE(p_items, '[]'::jsonb)) WITH ORDINALITY AS t(line, ord)
+    ),
+    inserted AS (
+        INSERT INTO inbound_items (id, inbound_id, item_id, qty, unit_cost)
+        SELECT
+            src.id,
+            v_inbound.id,
+            (src.line->>'item_id')::UUID,
+            (src.line->>'qty')::NUMERIC,
+            COALESCE((src.line->>'unit_cost')::NUMERIC, 0)
+        FROM src
+        RETURNING *
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(inserted) ORDER BY src.ord), '[]'::jsonb)
+    INTO v_items
+    FROM inserted
+    JOIN src ON src.id = inserted.id;
+
+    INSERT INTO flows (entity_type, entity_id, from_status, to_status, actor, payload)
+    VALUES ('inbound', v_inbound.id, NULL, 'DRAFT', p_actor,
+            jsonb_build_object('timestamp', NOW()));
+
+    -- 집계 트리거 반영 후 행 반환
+    SELECT * INTO v_inbound FROM inbounds WHERE id = v_inbound.id;
+
+    RETURN to_jsonb(v_inbound) || jsonb_build_object('items', v_items);
+END;
+$$ LANGUAGE plpgsql;
+
+-- 8. 입고 확정 (DRAFT → CONFIRMED)
+CREATE OR REPLACE FUNCTION confirm_inbound(
+    p_inbound_id UUID,
+    p_actor TEXT DEFAULT 'system'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_status TEXT;
+BEGIN
+    SELECT status INTO v_status FROM inbounds WHERE id = p_inbound_id FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'not_found');
+    END IF;
+
+    IF v_status <> 'DRAFT' THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'invalid_status', 'status', v_status);
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM inbound_items WHERE inbound_id = p_inbound_id) THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'no_items');
+    END IF;
+
+    UPDATE inbounds SET status = 'CONFIRMED', updated_at = NOW() WHERE id = p_inbound_id;
+
+    INSERT INTO flows (entity_type, entity_id, from_status, to_status, actor, payload)
+    VALUES ('inbound', p_inbound_id, 'DRAFT', 'CONFIRMED', p_actor,
+            jsonb_build_object('timestamp', NOW()));
+
+    RETURN jsonb_build_object('ok', true, 'status', 'CONFIRMED');
+END;
+$$ LANGUAGE plpgsql;
+
+-- 9. 입고 반영 (CONFIRMED → POSTED, 재고 증가)
+CREATE OR REPLACE FUNCTION post_inbound(
+    p_inbound_id UUID,
+    p_actor TEXT DEFAULT 'system'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_status TEXT;
+    v_movements INT;
+BEGIN
+    SELECT status INTO v_status FROM inbounds WHERE id = p_inbound_id FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'not_found');
+    END IF;
+
+    IF v_status <> 'CONFIRMED' THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'invalid_status', 'status', v_status);
+    END IF;
+
+    v_movements := increment_inbound_stock(ARRAY[p_inbound_id]);
+
+    UPDATE inbounds SET status = 'POSTED', updated_at = NOW() WHERE id = p_inbound_id;
+
+    INSERT INTO flows (entity_type, entity_id, from_status, to_status, actor, payload)
+    VALUES ('inbound', p_inbound_id, 'CONFIRMED', 'POSTED', p_actor,
+            jsonb_build_object('timestamp', NOW(), 'movements', v_movements));
+
+    RETURN jsonb_build_object('ok', true, 'status', 'POSTED', 'movements', v_movements);
+END;
+$$ LANGUAGE plpgsql;
+
+-- 10. 입고 취소 (DRAFT/CONFIRMED → CANCELED)
+CREATE OR REPLACE FUNCTION cancel_inbound(
+    p_inbound_id UUID,
+    p_actor TEXT DEFAULT 'system'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_status TEXT;
+BEGIN
+    SELECT status INTO v_status FROM inbounds WHERE id = p_inbound_id FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'not_found');
+    END IF;
+
+    IF v_status NOT IN ('DRAFT', 'CONFIRMED') THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'invalid_status', 'status', v_status);
+    END IF;
+
+    UPDATE inbounds SET status = 'CANCELED', updated_at = NOW() WHERE id = p_inbound_id;
+
+    INSERT INTO flows (entity_type, entity_id, from_status, to_status, actor, payload)
+    VALUES ('inbound', p_inbound_id, v_status, 'CANCELED', p_actor,
+            jsonb_build_object('timestamp', NOW()));
+
+    RETURN jsonb_build_object('ok', true, 'status', 'CANCELED');
+END;
+$$ LANGUAGE plpgsql;
+
+-- 11. 일괄 입고 (컨테이너 단위: 문서 생성 + 즉시 반영, 단일 트랜잭션)
+CREATE OR REPLACE FUNCTION receive_inbound(
+    p_inbound_no TEXT,
+    p_header JSONB,
+    p_items JSONB,
+    p_actor TEXT DEFAULT 'system'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_inbound JSONB;
+    v_id UUID;
+    v_movements INT;
+BEGIN
+    IF jsonb_array_length(COALESCE(p_items, '[]'::jsonb)) = 0 THEN
+        RETURN jsonb_build_object('ok', false, 'error', 'no_items');
+    END IF;
+
+    v_inbound := create_inbound_with_items(p_inbound_no, p_header, p_items, p_actor);
+    v_id := (v_inbound->>'id')::UUID;
+
+    v_movements := increment_inbound_stock(ARRAY[v_id]);
+
+    UPDATE inbounds SET status = 'POSTED', updated_at = NOW() WHERE id = v_id;
+
+    INSERT INTO flows (entity_type, entity_id, from_status, to_status, actor, payload)
+    VALUES ('inbound', v_id, 'DRAFT', 'POSTED', p_actor,
+            jsonb_build_object('timestamp', NOW(), 'movements', v_movements, 'receipt', true));
+
+    RETURN jsonb_build_object(
+        'ok', true,
+        'movements', v_movements,
+        'inbound', (SELECT to_jsonb(i) FROM inbounds i WHERE i.id = v_id)
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE inbound_items IS '입고 라인 아이템 테이블';
+COMMENT ON FUNCTION increment_inbound_stock IS '입고 문서 재고 증가 (품목별 합산 upsert + 원장 기록)';
+COMMENT ON FUNCTION post_inbound IS '입고 반영 (상태 변경/재고 증가/flow 기록 단일 트랜잭션)';
+COMMENT ON FUNCTION receive_inbound IS '일괄 입고 (문서 생성 + 즉시 반영)';
@@ -0,0 +1,41 @@
+-- =============================================================================
+-- Migration: 018_stock_low_flag
+-- Description: 안전재고 미달 플래그(생성 컬럼) + 부분 인덱스, 창고 컬럼
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. 안전재고 / 창고 컬럼
+ALTER TABLE stocks
+ADD COLUMN IF NOT EXISTS warehouse_id UUID,
+ADD COLUMN IF NOT EXISTS safety_stock NUMERIC(18, 4) NOT NULL DEFAULT 0;
+
+-- items.safety_stock(001 초기 스키마)이 있으면 초기값으로 사용
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'items' AND column_name = 'safety_stock'
+    ) THEN
+        UPDATE stocks s
+        SET safety_stock = i.safety_stock
+        FROM items i
+        WHERE i.id = s.item_id
+          AND i.safety_stock IS NOT NULL;
+    END IF;
+END;
+$$;
+
+-- 2. 미달 플래그 (onhand 변경 시 자동 갱신되는 저장 생성 컬럼)
+ALTER TABLE stocks
+ADD COLUMN IF NOT EXISTS is_low BOOLEAN
+    GENERATED ALWAYS AS (onhand < safety_stock) STORED;
+
+-- 3. 미달 행만 담는 부분 인덱스 (키셋 페이지네이션: item_id 순)
+CREATE INDEX IF NOT EXISTS idx_stocks_low
+    ON stocks(item_id) WHERE is_low;
+
+CREATE INDEX IF NOT EXISTS idx_stocks_low_warehouse
+    ON stocks(warehouse_id, item_id) WHERE is_low;
+
+COMMENT ON COLUMN stocks.safety_stock IS '안전재고 (onhand가 이 값보다 작으면 is_low)';
+COMMENT ON COLUMN stocks.is_low IS '안전재고 미달 여부 (생성 컬럼, 부분 인덱스 idx_stocks_low)';
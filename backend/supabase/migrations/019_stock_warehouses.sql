@@ -0,0 +1,499 @@
+-- =============================================================================
+-- Migration: 019_stock_warehouses
+-- Description: 창고별 재고 행 (item_id, warehouse_id) + 품목별 합계 테이블(stock_totals)
+--              출고/입고 재고 처리 함수의 창고 기준 재정의
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. stocks: 품목당 1행 → 품목 × 창고당 1행
+--    warehouse_id NULL은 '창고 미지정' 행 (기존 데이터)으로 하나만 허용
+DROP INDEX IF EXISTS uq_stocks_item_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_stocks_item_warehouse
+    ON stocks(item_id, warehouse_id) NULLS NOT DISTINCT;
+
+CREATE INDEX IF NOT EXISTS idx_stocks_warehouse_id ON stocks(warehouse_id);
+
+-- 안전재고 미달 키셋 (item_id, warehouse_id) 순
+DROP INDEX IF EXISTS idx_stocks_low;
+CREATE INDEX IF NOT EXISTS idx_stocks_low
+    ON stocks(item_id, warehouse_id) WHERE is_low;
+
+-- 2. 출고 문서 창고
+ALTER TABLE outbounds
+ADD COLUMN IF NOT EXISTS warehouse_id UUID;
+
+-- 3. 품목별 합계 (창고 전체), 읽기 시 합산 없이 PK 조회 1회
+CREATE TABLE IF NOT EXISTS stock_totals (
+    item_id UUID PRIMARY KEY,
+    onhand NUMERIC(18, 4) NOT NULL DEFAULT 0,
+    reserved NUMERIC(18, 4) NOT NULL DEFAULT 0,
+    available NUMERIC(18, 4) GENERATED ALWAYS AS (onhand - reserved) STORED,
+    warehouse_count INT NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE stock_totals ENABLE ROW LEVEL SECURITY;
+
+INSERT INTO stock_totals (item_id, onhand, reserved, warehouse_count, version)
+SELECT item_id, SUM(onhand), SUM(reserved), COUNT(*), MAX(version)
+FROM stocks
+GROUP BY item_id
+ON CONFLICT (item_id) DO UPDATE
+    SET onhand = EXCLUDED.onhand,
+        reserved = EXCLUDED.reserved,
+        warehouse_count = EXCLUDED.warehouse_count,
+        version = EXCLUDED.version,
+        updated_at = NOW();
+
+-- 4. 합계 유지 트리거 (문장 단위: 변경된 품목별 증감만 한 번에 반영)
+CREATE OR REPLACE FUNCTION apply_stock_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stock_totals AS t (item_id, onhand, reserved, warehouse_count, version)
+        SELECT item_id, SUM(onhand), SUM(reserved), COUNT(*), 1
+        FROM new_rows
+        GROUP BY item_id
+        ORDER BY item_id
+        ON CONFLICT (item_id) DO UPDATE
+            SET onhand = t.onhand + EXCLUDED.onhand,
+                reserved = t.reserved + EXCLUDED.reserved,
+                warehouse_count = t.warehouse_count + EXCLUDED.warehouse_count,
+                version = t.version + 1,
+                updated_at = NOW();
+    ELSIF TG_OP = 'UPDATE' THEN
+        UPDATE stock_totals t
+        SET onhand = t.onhand + d.onhand,
+            reserved = t.reserved + d.reserved,
+            version = t.version + 1,
+            updated_at = NOW()
+        FROM (
+            SELECT item_id, SUM(onhand) AS onhand, SUM(reserved) AS reserved
+            FROM (
+                SELECT item_id, onhand, reserved FROM new_rows
+                UNION ALL
+                SELECT item_id, -onhand, -reserved FROM old_rows
+            ) c
+            GROUP BY item_id
+            HAVING SUM(onhand) <> 0 OR SUM(reserved) <> 0
+        ) d
+        WHERE t.item_id = d.item_id;
+    ELSE
+        UPDATE stock_totals t
+        SET onhand = t.onhand - d.onhand,
+            reserved = t.reserved - d.reserved,
+            warehouse_count = t.warehouse_count - d.rows,
+            version = t.version + 1,
+            updated_at = NOW()
+        FROM (
+            SELECT item_id, SUM(onhand) AS onhand, SUM(reserved) AS reserved, COUNT(*) AS rows
+            FROM old_rows
+            GROUP BY item_id
+        ) d
+        WHERE t.item_id = d.item_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_stock_totals_insert ON stocks;
+CREATE TRIGGER trg_stock_totals_insert
+    AFTER INSERT ON stocks
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_stock_totals();
+
+DROP TRIGGER IF EXISTS trg_stock_totals_update ON stocks;
+CREATE TRIGGER trg_stock_totals_update
+    AFTER UPDATE ON stocks
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_stock_totals();
+
+DROP TRIGGER IF EXISTS trg_stock_totals_delete ON stocks;
+CREATE TRIGGER trg_stock_totals_delete
+    AFTER DELETE ON stocks
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_stock_totals();
+
+-- 5. 출고 문서별 품목 × 창고 수요 (내부 함수)
+CREATE OR REPLACE FUNCTION outbound_stock_demand(p_outbound_ids UUID[])
+RETURNS TABLE (
+    outbound_id UUID,
+    item_id UUID,
+    warehouse_id UUID,
+    qty NUMERIC
+) AS $$
+    SELECT oi.outbound_id, oi.item_id, o.warehouse_id, SUM(oi.qty)
+    FROM outbound_items oi
+    JOIN outbounds o ON o.id = oi.outbound_id
+    WHERE oi.outbound_id = ANY(p_outbound_ids)
+    GROUP BY oi.outbound_id, oi.item_id, o.warehouse_id;
+$$ LANGUAGE sql STABLE;
+
+-- 6. 재고 예약 (009 대체: 출고 문서 창고의 재고 행 기준)
+CREATE OR REPLACE FUNCTION reserve_outbound_stock(p_outbound_ids UUID[])
+RETURNS JSONB AS $$
+DECLARE
+    v_needed INT;
+    v_updated INT;
+    v_shortages JSONB;
+BEGIN
+    BEGIN
+        -- 관련 재고 행만 (item_id, warehouse_id) 순서로 잠금 (교착 상태 방지)
+        PERFORM 1
+        FROM stocks s
+        JOIN (
+            SELECT DISTINCT d.item_id, d.warehouse_id
+            FROM outbound_stock_demand(p_outbound_ids) d
+        ) d ON d.item_id = s.item_id AND d.warehouse_id IS NOT DISTINCT FROM s.warehouse_id
+        ORDER BY s.item_id, s.warehouse_id
+        FOR UPDATE OF s;
+
+        SELECT COUNT(*) INTO v_needed
+        FROM (
+            SELECT DISTINCT d.item_id, d.warehouse_id
+            FROM outbound_stock_demand(p_outbound_ids) d
+        ) x;
+
+        WITH demand AS (
+            SELECT d.item_id, d.warehouse_id, SUM(d.qty) AS qty
+            FROM outbound_stock_demand(p_outbound_ids) d
+            GROUP BY d.item_id, d.warehouse_id
+        ),
+        updated AS (
+            UPDATE stocks s
+            SET reserved = s.reserved + d.qty,
+                version = s.version + 1,
+                updated_at = NOW()
+            FROM demand d
+            WHERE s.item_id = d.item_id
+              AND s.warehouse_id IS NOT DISTINCT FROM d.warehouse_id
+              AND s.onhand - s.reserved >= d.qty
+            RETURNING s.item_id
+        )
+        SELECT COUNT(*) INTO v_updated FROM updated;
+
+        IF v_updated < v_needed THEN
+            RAISE EXCEPTION 'insufficient stock' USING ERRCODE = 'ER001';
+        END IF;
+
+        INSERT INTO stock_reservations (outbound_id, item_id, qty)
+        SELECT d.outbound_id, d.item_id, d.qty
+        FROM outbound_stock_demand(p_outbound_ids) d
+        ON CONFLICT (outbound_id, item_id) DO UPDATE SET qty = EXCLUDED.qty;
+
+        RETURN '[]'::jsonb;
+    EXCEPTION WHEN SQLSTATE 'ER001' THEN
+        WITH demand AS (
+            SELECT d.item_id, d.warehouse_id, SUM(d.qty) AS qty
+            FROM outbound_stock_demand(p_outbound_ids) d
+            GROUP BY d.item_id, d.warehouse_id
+        )
+        SELECT COALESCE(
+            jsonb_agg(
+                jsonb_build_object(
+                    'item_id', d.item_id,
+                    'warehouse_id', d.warehouse_id,
+                    'required', d.qty,
+                    'available', COALESCE(s.onhand - s.reserved, 0),
+                    'reason', CASE WHEN s.item_id IS NULL THEN 'stock_not_found' ELSE 'insufficient' END
+                )
+                ORDER BY d.item_id
+            ),
+            '[]'::jsonb
+        )
+        INTO v_shortages
+        FROM demand d
+        LEFT JOIN stocks s
+            ON s.item_id = d.item_id AND s.warehouse_id IS NOT DISTINCT FROM d.warehouse_id
+        WHERE s.item_id IS NULL OR s.onhand - s.reserved < d.qty;
+
+        RETURN v_shortages;
+    END;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 7. 예약 해제 (009 대체)
+CREATE OR REPLACE FUNCTION release_outbound_stock(p_outbound_ids UUID[])
+RETURNS VOID AS $$
+BEGIN
+    UPDATE stocks s
+    SET reserved = GREATEST(s.reserved - r.qty, 0),
+        version = s.version + 1,
+        updated_at = NOW()
+    FROM (
+        SELECT r.item_id, o.warehouse_id, SUM(r.qty) AS qty
+        FROM stock_reservations r
+        JOIN outbounds o ON o.id = r.outbound_id
+        WHERE r.outbound_id = ANY(p_outbound_ids)
+        GROUP BY r.item_id, o.warehouse_id
+    ) r
+    WHERE s.item_id = r.item_id
+      AND s.warehouse_id IS NOT DISTINCT FROM r.warehouse_id;
+
+    DELETE FROM stock_reservations WHERE outbound_id = ANY(p_outbound_ids);
+END;
+$$ LANGUAGE plpgsql;
+
+-- 8. 출고 재고 차감 (016 대체: 창고 행 기준, 원장에 창고 기록)
+CREATE OR REPLACE FUNCTION deduct_outbound_stock(p_outbound_ids UUID[])
+RETURNS JSONB AS $$
+DECLARE
+    v_shortages JSONB;
+BEGIN
+    PERFORM 1
+    FROM stocks s
+    JOIN (
+        SELECT DISTINCT d.item_id, d.warehouse_id
+        FROM outbound_stock_demand(p_outbound_ids) d
+    ) d ON d.item_id = s.item_id AND d.warehouse_id IS NOT DISTINCT FROM s.warehouse_id
+    ORDER BY s.item_id, s.warehouse_id
+    FOR UPDATE OF s;
+
+    WITH demand AS (
+        SELECT d.item_id, d.warehouse_id, SUM(d.qty) AS qty
+        FROM outbound_stock_demand(p_outbound_ids) d
+        GROUP BY d.item_id, d.warehouse_id
+    )
+    SELECT COALESCE(
+        jsonb_agg(
+            jsonb_build_object(
+                'item_id', d.item_id,
+                'warehouse_id', d.warehouse_id,
+                'required', d.qty,
+                'available', COALESCE(s.onhand, 0),
+                'reason', CASE WHEN s.item_id IS NULL THEN 'stock_not_found' ELSE 'insufficient' END
+            )
+            ORDER BY d.item_id
+        ),
+        '[]'::jsonb
+    )
+    INTO v_shortages
+    FROM demand d
+    LEFT JOIN stocks s
+        ON s.item_id = d.item_id AND s.warehouse_id IS NOT DISTINCT FROM d.warehouse_id
+    WHERE s.item_id IS NULL OR s.onhand < d.qty;
+
+    IF jsonb_array_length(v_shortages) > 0 THEN
+        RETURN v_shortages;
+    END IF;
+
+    WITH lines AS (
+        SELECT * FROM outbound_stock_demand(p_outbound_ids)
+    ),
+    demand AS (
+        SELECT l.item_id,
+               l.warehouse_id,
+               SUM(l.qty) AS qty,
+               COALESCE(SUM(r.qty), 0) AS reserved_qty
+        FROM lines l
+        LEFT JOIN stock_reservations r
+            ON r.outbound_id = l.outbound_id AND r.item_id = l.item_id
+        GROUP BY l.item_id, l.warehouse_id
+    ),
+    updated AS (
+        UPDATE stocks s
+        SET onhand = s.onhand - d.qty,
+            reserved = GREATEST(s.reserved - d.reserved_qty, 0),
+            version = s.version + 1,
+            updated_at = NOW()
+        FROM demand d
+        WHERE s.item_id = d.item_id
+          AND s.warehouse_id IS NOT DISTINCT FROM d.warehouse_id
+        RETURNING s.item_id, s.warehouse_id, s.onhand + d.qty AS before_total
+    )
+    INSERT INTO stock_movements (item_id, warehouse_id, movement_type, quantity,
+                                 reference_type, reference_id, before_stock, after_stock, actor)
+    SELECT
+        l.item_id,
+        l.warehouse_id,
+        'outbound',
+        -l.qty,
+        'outbound',
+        l.outbound_id,
+        u.before_total - SUM(l.qty) OVER w + l.qty,
+        u.before_total - SUM(l.qty) OVER w,
+        'system'
+    FROM lines l
+    JOIN updated u
+        ON u.item_id = l.item_id AND u.warehouse_id IS NOT DISTINCT FROM l.warehouse_id
+    WINDOW w AS (PARTITION BY l.item_id, l.warehouse_id ORDER BY l.outbound_id
+                 ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW);
+
+    DELETE FROM stock_reservations WHERE outbound_id = ANY(p_outbound_ids);
+
+    RETURN '[]'::jsonb;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 9. 입고 재고 증가 (017 대체: 입고 문서 창고 행에 upsert)
+CREATE OR REPLACE FUNCTION increment_inbound_stock(p_inbound_ids UUID[])
+RETURNS INT AS $$
+DECLARE
+    v_count INT;
+BEGIN
+    WITH lines AS (
+        SELECT ii.inbound_id, ib.warehouse_id, ii.item_id,
+               SUM(ii.qty) AS qty,
+               SUM(ii.qty * ii.unit_cost) AS amount
+        FROM inbound_items ii
+        JOIN inbounds ib ON ib.id = ii.inbound_id
+        WHERE ii.inbound_id = ANY(p_inbound_ids)
+        GROUP BY ii.inbound_id, ib.warehouse_id, ii.item_id
+    ),
+    supply AS (
+        SELECT item_id, warehouse_id, SUM(qty) AS qty
+        FROM lines
+        GROUP BY item_id, warehouse_id
+    ),
+    upserted AS (
+        INSERT INTO stocks AS s (item_id, warehouse_id, onhand, updated_at)
+        SELECT sp.item_id, sp.warehouse_id, sp.qty, NOW()
+        FROM supply sp
+        ORDER BY sp.item_id, sp.warehouse_id
+        ON CONFLICT (item_id, warehouse_id) DO UPDATE
+            SET onhand = s.onhand + EXCLUDED.onhand,
+                version = s.version + 1,
+                updated_at = NOW()
+        RETURNING s.item_id, s.warehouse_id, s.onhand AS after_total
+    )
+    INSERT INTO stock_movements (item_id, warehouse_id, movement_type, quantity,
+                                 reference_type, reference_id, before_stock, after_stock,
+                                 unit_cost, actor)
+    SELECT
+        l.item_id,
+        l.warehouse_id,
+        'inbound',
+        l.qty,
+        'inbound',
+        l.inbound_id,
+        u.after_total - sp.qty + SUM(l.qty) OVER w - l.qty,
+        u.after_total - sp.qty + SUM(l.qty) OVER w,
+        l.amount / l.qty,
+        'system'
+    FROM lines l
+    JOIN supply sp
+        ON sp.item_id = l.item_id AND sp.warehouse_id IS NOT DISTINCT FROM l.warehouse_id
+    JOIN upserted u
+        ON u.item_id = l.item_id AND u.warehouse_id IS NOT DISTINCT FROM l.warehouse_id
+    WINDOW w AS (PARTITION BY l.item_id, l.warehouse_id ORDER BY l.inbound_id
+                 ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW);
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 10. 가용재고(ATP): 창고 합계 테이블 PK 조회 (009 대체)
+CREATE OR REPLACE FUNCTION get_available_to_promise(p_item_ids UUID[])
+RETURNS TABLE (
+    item_id UUID,
+    onhand NUMERIC,
+    reserved NUMERIC,
+    available NUMERIC,
+    version BIGINT
+) AS $$
+    SELECT t.item_id, t.onhand, t.reserved, t.available, t.version
+    FROM stock_totals t
+    WHERE t.item_id = ANY(p_item_ids);
+$$ LANGUAGE sql STABLE;
+
+-- 11. 시점 재고: 품목 목록을 stock_totals에서 (016 대체, 창고 행 중복 방지)
+CREATE OR REPLACE FUNCTION get_stock_as_of(
+    p_at TIMESTAMPTZ,
+    p_item_ids UUID[] DEFAULT NULL
+)
+RETURNS TABLE (
+    item_id UUID,
+    onhand NUMERIC,
+    snapshot_at TIMESTAMPTZ
+) AS $$
+    SELECT
+        i.item_id,
+        COALESCE(snap.onhand, 0) + COALESCE(delta.qty, 0),
+        snap.snapshot_at
+    FROM (
+        SELECT t.item_id FROM stock_totals t
+        WHERE p_item_ids IS NULL OR t.item_id = ANY(p_item_ids)
+    ) i
+    LEFT JOIN LATERAL (
+        SELECT ss.onhand, ss.snapshot_at
+        FROM stock_snapshots ss
+        WHERE ss.item_id = i.item_id AND ss.snapshot_at <= p_at
+        ORDER BY ss.snapshot_at DESC
+        LIMIT 1
+    ) snap ON true
+    LEFT JOIN LATERAL (
+        SELECT SUM(m.quantity) AS qty
+        FROM stock_movements m
+        WHERE m.item_id = i.item_id
+          AND m.created_at <= p_at
+          AND (snap.snapshot_at IS NULL OR m.created_at > snap.snapshot_at)
+    ) delta ON true;
+$$ LANGUAGE sql STABLE;
+
+-- 12. 출고 문서 생성: 창고 포함 (011 대체)
+CREATE OR REPLACE FUNCTION create_outbound_with_items(
+    p_outbound_no TEXT,
+    p_header JSONB,
+    p_items JSONB DEFAULT '[]'::jsonb,
+    p_actor TEXT DEFAULT 'system'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_outbound outbounds;
+    v_outbound_no TEXT := p_outbound_no;
+    v_items JSONB;
+BEGIN
+    IF v_outbound_no IS NULL THEN
+        v_outbound_no := to_char(CURRENT_DATE, 'YYYYMMDD') || '-' ||
+            lpad(allocate_document_numbers('outbound', CURRENT_DATE, 1)::TEXT, 4, '0');
+    END IF;
+
+    INSERT INTO outbounds (outbound_no, status, store_id, customer_id, warehouse_id, memo)
+    VALUES (
+        v_outbound_no,
+        'DRAFT',
+        NULLIF(p_header->>'store_id', '')::UUID,
+        NULLIF(p_header->>'customer_id', '')::UUID,
+        NULLIF(p_header->>'warehouse_id', '')::UUID,
+        p_header->>'memo'
+    )
+    RETURNING * INTO v_outbound;
+
+    WITH src AS (
+        SELECT gen_random_uuid() AS id, t.ord, t.line
+        FROM jsonb_array_elements(COALESCE(p_items, '[]'::jsonb)) WITH ORDINALITY AS t(line, ord)
+    ),
+    inserted AS (
+        INSERT INTO outbound_items (id, outbound_id, item_id, qty, unit_price)
+        SELECT
+            src.id,
+            v_outbound.id,
+            (src.line->>'item_id')::UUID,
+            (src.line->>'qty')::NUMERIC,
+            COALESCE((src.line->>'unit_price')::NUMERIC, 0)
+        FROM src
+        RETURNING *
+    )
+    SELECT COALESCE(jsonb_agg(to_jsonb(inserted) ORDER BY src.ord), '[]'::jsonb)
+    INTO v_items
+    FROM inserted
+    JOIN src ON src.id = inserted.id;
+
+    INSERT INTO flows (entity_type, entity_id, from_status, to_status, actor, payload)
+    VALUES ('outbound', v_outbound.id, NULL, 'DRAFT', p_actor,
+            jsonb_build_object('timestamp', NOW()));
+
+    RETURN to_jsonb(v_outbound) || jsonb_build_object('items', v_items);
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE stock_totals IS '품목별 재고 합계 (창고 전체, trg_stock_totals_* 갱신)';
+COMMENT ON COLUMN stocks.warehouse_id IS '창고 (NULL: 창고 미지정 행)';
+COMMENT ON FUNCTION outbound_stock_demand IS '출고 문서별 품목 × 창고 수요';
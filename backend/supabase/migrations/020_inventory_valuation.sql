@@ -0,0 +1,47 @@
+-- =============================================================================
+-- Migration: 020_inventory_valuation
+-- Description: 재고 평가 실행 이력 / 품목별 평가 결과 (이동평균, 선입선출)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. 평가 실행 이력
+CREATE TABLE IF NOT EXISTS valuation_runs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    as_of TIMESTAMPTZ NOT NULL,
+    methods TEXT[] NOT NULL,
+    status TEXT NOT NULL DEFAULT 'RUNNING',
+    item_count INT NOT NULL DEFAULT 0,
+    movement_count INT NOT NULL DEFAULT 0,
+    total_value JSONB NOT NULL DEFAULT '{}'::jsonb,
+    error TEXT NULL,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMPTZ NULL,
+
+    CONSTRAINT valuation_runs_status_check
+        CHECK (status IN ('RUNNING', 'COMPLETED', 'FAILED'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_valuation_runs_as_of ON valuation_runs(as_of DESC);
+
+-- 2. 품목별 평가 결과
+CREATE TABLE IF NOT EXISTS inventory_valuations (
+    run_id UUID NOT NULL REFERENCES valuation_runs(id) ON DELETE CASCADE,
+    item_id UUID NOT NULL,
+    method TEXT NOT NULL,
+    qty NUMERIC(18, 4) NOT NULL,
+    unit_cost NUMERIC(18, 4) NOT NULL,
+    value NUMERIC(18, 4) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (run_id, method, item_id),
+
+    CONSTRAINT inventory_valuations_method_check
+        CHECK (method IN ('moving_average', 'fifo'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_inventory_valuations_item_id ON inventory_valuations(item_id);
+
+ALTER TABLE valuation_runs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE inventory_valuations ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE valuation_runs IS '재고 평가 실행 이력 (월말 마감 등)';
+COMMENT ON TABLE inventory_valuations IS '품목별 재고 평가 결과 (이동평균 / 선입선출)';
@@ -0,0 +1,74 @@
+-- =============================================================================
+-- Migration: 021_replenishment_inputs
+-- Description: 발주 제안 입력 조회 (품목별 일별 출고량, 가용/안전재고/입고 예정)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. 반영(POSTED) 출고 기간 조회용 부분 인덱스 (반영 시각 = updated_at)
+CREATE INDEX IF NOT EXISTS idx_outbounds_posted_at
+    ON outbounds(updated_at) WHERE status = 'POSTED';
+
+-- 2. 품목별 일별 출고량 (희소 배열: 기간 시작일 기준 일 오프셋 / 수량)
+--    item_id 키셋 페이지 (p_after 이후 p_limit개 품목)
+CREATE OR REPLACE FUNCTION get_daily_outbound_demand(
+    p_from DATE,
+    p_to DATE,
+    p_after UUID DEFAULT NULL,
+    p_limit INT DEFAULT 1000
+)
+RETURNS TABLE (
+    item_id UUID,
+    days INT[],
+    qtys NUMERIC[]
+) AS $$
+    SELECT d.item_id,
+           array_agg(d.day_offset ORDER BY d.day_offset),
+           array_agg(d.qty ORDER BY d.day_offset)
+    FROM (
+        SELECT oi.item_id,
+               (o.updated_at::DATE - p_from) AS day_offset,
+               SUM(oi.qty) AS qty
+        FROM outbounds o
+        JOIN outbound_items oi ON oi.outbound_id = o.id
+        WHERE o.status = 'POSTED'
+          AND o.updated_at >= p_from
+          AND o.updated_at < p_to + 1
+          AND (p_after IS NULL OR oi.item_id > p_after)
+        GROUP BY oi.item_id, o.updated_at::DATE
+    ) d
+    GROUP BY d.item_id
+    ORDER BY d.item_id
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- 3. 품목별 공급 현황 (현재고/가용재고 합계, 창고 안전재고 합계, 미반영 입고 수량)
+CREATE OR REPLACE FUNCTION get_replenishment_supply(
+    p_after UUID DEFAULT NULL,
+    p_limit INT DEFAULT 1000
+)
+RETURNS TABLE (
+    item_id UUID,
+    onhand NUMERIC,
+    available NUMERIC,
+    safety_stock NUMERIC,
+    on_order NUMERIC
+) AS $$
+    SELECT t.item_id,
+           t.onhand,
+           t.available,
+           COALESCE((SELECT SUM(s.safety_stock) FROM stocks s WHERE s.item_id = t.item_id), 0),
+           COALESCE((
+               SELECT SUM(ii.qty)
+               FROM inbound_items ii
+               JOIN inbounds ib ON ib.id = ii.inbound_id
+               WHERE ii.item_id = t.item_id
+                 AND ib.status IN ('DRAFT', 'CONFIRMED')
+           ), 0)
+    FROM stock_totals t
+    WHERE p_after IS NULL OR t.item_id > p_after
+    ORDER BY t.item_id
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION get_daily_outbound_demand IS '품목별 일별 출고량 (발주 제안 수요 입력)';
+COMMENT ON FUNCTION get_replenishment_supply IS '품목별 가용/안전재고/입고 예정 (발주 제안 공급 입력)';
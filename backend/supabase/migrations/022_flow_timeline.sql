@@ -0,0 +1,91 @@
+-- =============================================================================
+-- Migration: 022_flow_timeline
+-- Description: 문서별 상태 전이 이력 조회 인덱스 + 문서별 최신 상태 테이블
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. 이력 키셋 조회 인덱스 ((created_at, id) 역순)
+--    문서별: (entity_type, entity_id) 일치 + 시간 역순
+--    전체: 시간 역순 (기존 created_at 단일 인덱스 대체)
+CREATE INDEX IF NOT EXISTS idx_flows_entity_timeline
+    ON flows(entity_type, entity_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_flows_timeline
+    ON flows(created_at DESC, id DESC);
+
+DROP INDEX IF EXISTS idx_flows_entity;
+DROP INDEX IF EXISTS idx_flows_created_at;
+
+-- 2. 문서별 최신 상태 (이력 스캔 없이 현재 상태 조회)
+CREATE TABLE IF NOT EXISTS flow_latest (
+    entity_type TEXT NOT NULL,
+    entity_id UUID NOT NULL,
+    flow_id UUID NOT NULL,
+    from_status TEXT NULL,
+    to_status TEXT NOT NULL,
+    actor TEXT NULL,
+    transition_count INT NOT NULL DEFAULT 1,
+    created_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (entity_type, entity_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_flow_latest_status
+    ON flow_latest(entity_type, to_status, created_at DESC);
+
+-- 3. flows INSERT 시 최신 상태 갱신 (문장 단위, 배치 INSERT 1회 처리)
+--    flows는 DB 상태 전이 함수가 트랜잭션 안에서만 기록하며 created_at은 트랜잭션 시작 시각이므로,
+--    먼저 시작한 긴 트랜잭션이 나중에 커밋되어 과거 시각 기록이 늦게 들어와도
+--    created_at이 더 최근인 경우에만 상태를 교체
+CREATE OR REPLACE FUNCTION refresh_flow_latest()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO flow_latest AS l (
+        entity_type, entity_id, flow_id, from_status, to_status, actor, transition_count, created_at
+    )
+    SELECT DISTINCT ON (n.entity_type, n.entity_id)
+           n.entity_type, n.entity_id, n.id, n.from_status, n.to_status, n.actor,
+           COUNT(*) OVER (PARTITION BY n.entity_type, n.entity_id),
+           n.created_at
+    FROM new_rows n
+    ORDER BY n.entity_type, n.entity_id, n.created_at DESC, n.id DESC
+    ON CONFLICT (entity_type, entity_id) DO UPDATE
+    SET transition_count = l.transition_count + EXCLUDED.transition_count,
+        flow_id = CASE WHEN EXCLUDED.created_at >= l.created_at THEN EXCLUDED.flow_id ELSE l.flow_id END,
+        from_status = CASE WHEN EXCLUDED.created_at >= l.created_at THEN EXCLUDED.from_status ELSE l.from_status END,
+        to_status = CASE WHEN EXCLUDED.created_at >= l.created_at THEN EXCLUDED.to_status ELSE l.to_status END,
+        actor = CASE WHEN EXCLUDED.created_at >= l.created_at THEN EXCLUDED.actor ELSE l.actor END,
+        created_at = GREATEST(l.created_at, EXCLUDED.created_at);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_flow_latest ON flows;
+CREATE TRIGGER trg_flow_latest
+    AFTER INSERT ON flows
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_flow_latest();
+
+-- 4. 기존 이력으로 초기화
+INSERT INTO flow_latest (
+    entity_type, entity_id, flow_id, from_status, to_status, actor, transition_count, created_at
+)
+SELECT DISTINCT ON (f.entity_type, f.entity_id)
+       f.entity_type, f.entity_id, f.id, f.from_status, f.to_status, f.actor,
+       COUNT(*) OVER (PARTITION BY f.entity_type, f.entity_id),
+       f.created_at
+FROM flows f
+ORDER BY f.entity_type, f.entity_id, f.created_at DESC, f.id DESC
+ON CONFLICT (entity_type, entity_id) DO NOTHING;
+
+-- 5. RLS (flows와 동일: 인증 사용자 읽기)
+ALTER TABLE flow_latest ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow authenticated users to read flow_latest" ON flow_latest;
+CREATE POLICY "Allow authenticated users to read flow_latest"
+    ON flow_latest FOR SELECT
+    TO authenticated
+    USING (true);
+
+COMMENT ON TABLE flow_latest IS '문서별 최신 상태 전이 (trg_flow_latest 갱신)';
+COMMENT ON COLUMN flow_latest.transition_count IS '누적 상태 전이 기록 수';
@@ -0,0 +1,97 @@
+-- =============================================================================
+-- Migration: 023_change_notify
+-- Description: 상태 전이/재고 변경 NOTIFY (실시간 변경 스트림 소스)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 채널: erp_changes
+-- 페이로드: {"topic": "...", "events": [...]} (문장 단위, 25건씩 묶어 전송 - NOTIFY 페이로드 8000바이트 제한)
+--   - topic = flows.entity_type (outbound, inbound 등): 상태 전이
+--   - topic = 'stock': 품목별 창고 합계 (stock_totals) 변경
+-- NOTIFY는 커밋 시점에 전달되므로 롤백된 변경은 전송되지 않음
+
+-- 1. 상태 전이 (flows INSERT: DB 상태 전이 함수가 유일한 기록 경로)
+CREATE OR REPLACE FUNCTION notify_flow_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_payload TEXT;
+BEGIN
+    FOR v_payload IN
+        SELECT jsonb_build_object(
+                   'topic', c.entity_type,
+                   'events', jsonb_agg(jsonb_build_object(
+                       'entity_id', c.entity_id,
+                       'from_status', c.from_status,
+                       'to_status', c.to_status,
+                       'actor', c.actor,
+                       'at', c.created_at
+                   ) ORDER BY c.created_at)
+               )::TEXT
+        FROM (
+            SELECT n.*,
+                   (ROW_NUMBER() OVER (PARTITION BY n.entity_type ORDER BY n.created_at) - 1) / 25 AS chunk
+            FROM new_rows n
+        ) c
+        GROUP BY c.entity_type, c.chunk
+    LOOP
+        PERFORM pg_notify('erp_changes', v_payload);
+    END LOOP;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_flows_notify ON flows;
+CREATE TRIGGER trg_flows_notify
+    AFTER INSERT ON flows
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_flow_changes();
+
+-- 2. 재고 변경 (stock_totals: 입고/출고 반영, 예약/해제 모두 창고 합계로 수렴)
+CREATE OR REPLACE FUNCTION notify_stock_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_payload TEXT;
+BEGIN
+    FOR v_payload IN
+        SELECT jsonb_build_object(
+                   'topic', 'stock',
+                   'events', jsonb_agg(jsonb_build_object(
+                       'item_id', c.item_id,
+                       'onhand', c.onhand,
+                       'reserved', c.reserved,
+                       'available', c.available,
+                       'version', c.version
+                   ) ORDER BY c.item_id)
+               )::TEXT
+        FROM (
+            SELECT n.*,
+                   (ROW_NUMBER() OVER (ORDER BY n.item_id) - 1) / 25 AS chunk
+            FROM new_rows n
+        ) c
+        GROUP BY c.chunk
+    LOOP
+        PERFORM pg_notify('erp_changes', v_payload);
+    END LOOP;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_stock_totals_notify_insert ON stock_totals;
+CREATE TRIGGER trg_stock_totals_notify_insert
+    AFTER INSERT ON stock_totals
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_stock_changes();
+
+DROP TRIGGER IF EXISTS trg_stock_totals_notify_update ON stock_totals;
+CREATE TRIGGER trg_stock_totals_notify_update
+    AFTER UPDATE ON stock_totals
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_stock_changes();
+
+COMMENT ON FUNCTION notify_flow_changes IS 'flows INSERT → pg_notify(erp_changes, topic=entity_type)';
+COMMENT ON FUNCTION notify_stock_changes IS 'stock_totals 변경 → pg_notify(erp_changes, topic=stock)';
@@ -0,0 +1,256 @@
+-- =============================================================================
+-- Migration: 024_outbound_archive
+-- Description: 종결(POSTED/CANCELED) 출고 문서/라인/상태 이력 보관 테이블 이동
+--              (활성 테이블 크기 유지, 보관분은 *_all 뷰로 함께 조회)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. 보관 테이블 (활성 테이블과 같은 컬럼, 검색 벡터 대신 search_text만 유지)
+CREATE TABLE IF NOT EXISTS outbounds_archive (
+    id UUID PRIMARY KEY,
+    outbound_no TEXT UNIQUE NOT NULL,
+    status TEXT NOT NULL CHECK (status IN ('POSTED', 'CANCELED')),
+    store_id UUID NULL,
+    customer_id UUID NULL,
+    warehouse_id UUID NULL,
+    memo TEXT NULL,
+    line_count INT NOT NULL DEFAULT 0,
+    total_qty NUMERIC(18, 4) NOT NULL DEFAULT 0,
+    total_amount NUMERIC(18, 4) NOT NULL DEFAULT 0,
+    search_text TEXT NOT NULL DEFAULT '',
+    created_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS outbound_items_archive (
+    id UUID PRIMARY KEY,
+    outbound_id UUID NOT NULL REFERENCES outbounds_archive(id) ON DELETE CASCADE,
+    item_id UUID NOT NULL,
+    qty NUMERIC(18, 4) NOT NULL,
+    unit_price NUMERIC(18, 4) NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS flows_archive (
+    id UUID PRIMARY KEY,
+    entity_type TEXT NOT NULL,
+    entity_id UUID NOT NULL,
+    from_status TEXT NULL,
+    to_status TEXT NOT NULL,
+    actor TEXT NULL,
+    payload JSONB NULL,
+    created_at TIMESTAMPTZ NOT NULL
+);
+
+-- 활성 테이블과 같은 조회 경로 (뷰 UNION ALL 양쪽에서 인덱스 사용)
+CREATE INDEX IF NOT EXISTS idx_outbounds_archive_created_at ON outbounds_archive(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_outbounds_archive_status_created ON outbounds_archive(status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_outbound_items_archive_outbound_id ON outbound_items_archive(outbound_id);
+CREATE INDEX IF NOT EXISTS idx_outbound_items_archive_item_id ON outbound_items_archive(item_id);
+CREATE INDEX IF NOT EXISTS idx_flows_archive_entity_timeline
+    ON flows_archive(entity_type, entity_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_flows_archive_timeline
+    ON flows_archive(created_at DESC, id DESC);
+
+-- 보관 대상 선별 (종결 상태 + 최종 변경 시각)
+CREATE INDEX IF NOT EXISTS idx_outbounds_closed_updated
+    ON outbounds(updated_at) WHERE status IN ('POSTED', 'CANCELED');
+
+ALTER TABLE outbounds_archive ENABLE ROW LEVEL SECURITY;
+ALTER TABLE outbound_items_archive ENABLE ROW LEVEL SECURITY;
+ALTER TABLE flows_archive ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow authenticated users to read outbounds_archive" ON outbounds_archive;
+CREATE POLICY "Allow authenticated users to read outbounds_archive"
+    ON outbounds_archive FOR SELECT TO authenticated USING (true);
+
+DROP POLICY IF EXISTS "Allow authenticated users to read outbound_items_archive" ON outbound_items_archive;
+CREATE POLICY "Allow authenticated users to read outbound_items_archive"
+    ON outbound_items_archive FOR SELECT TO authenticated USING (true);
+
+DROP POLICY IF EXISTS "Allow authenticated users to read flows_archive" ON flows_archive;
+CREATE POLICY "Allow authenticated users to read flows_archive"
+    ON flows_archive FOR SELECT TO authenticated USING (true);
+
+-- 2. 활성 + 보관 통합 조회 뷰 (include_archived)
+CREATE OR REPLACE VIEW outbounds_all WITH (security_invoker = true) AS
+SELECT id, outbound_no, status, store_id, customer_id, warehouse_id, memo,
+       line_count, total_qty, total_amount, created_at, updated_at, false AS archived
+FROM outbounds
+UNION ALL
+SELECT id, outbound_no, status, store_id, customer_id, warehouse_id, memo,
+       line_count, total_qty, total_amount, created_at, updated_at, true AS archived
+FROM outbounds_archive;
+
+CREATE OR REPLACE VIEW outbound_items_all WITH (security_invoker = true) AS
+SELECT id, outbound_id, item_id, qty, unit_price, created_at, updated_at FROM outbound_items
+UNION ALL
+SELECT id, outbound_id, item_id, qty, unit_price, created_at, updated_at FROM outbound_items_archive;
+
+CREATE OR REPLACE VIEW flows_all WITH (security_invoker = true) AS
+SELECT id, entity_type, entity_id, from_status, to_status, actor, payload, created_at FROM flows
+UNION ALL
+SELECT id, entity_type, entity_id, from_status, to_status, actor, payload, created_at FROM flows_archive;
+
+-- 3. 보관 이동 (배치 단위, 호출마다 한 트랜잭션)
+--    p_before 이전에 종결된 문서를 최대 p_limit건 이동, has_more면 다시 호출
+--    종결 문서 라인 삭제는 라인 가드(ER002)에 걸리므로 SET LOCAL로 우회
+CREATE OR REPLACE FUNCTION archive_closed_outbounds(
+    p_before TIMESTAMPTZ,
+    p_limit INT DEFAULT 1000
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_ids UUID[];
+    v_items INT;
+    v_flows INT;
+BEGIN
+    SELECT array_agg(id) INTO v_ids
+    FROM (
+        SELECT o.id
+        FROM outbounds o
+        WHERE o.status IN ('POSTED', 'CANCELED')
+          AND o.updated_at < p_before
+        ORDER BY o.updated_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ) t;
+
+    IF v_ids IS NULL THEN
+        RETURN jsonb_build_object('ok', true, 'outbounds', 0, 'items', 0, 'flows', 0, 'has_more', false);
+    END IF;
+
+    INSERT INTO outbounds_archive (
+        id, outbound_no, status, store_id, customer_id, warehouse_id, memo,
+        line_count, total_qty, total_amount, search_text, created_at, updated_at
+    )
+    SELECT id, outbound_no, status, store_id, customer_id, warehouse_id, memo,
+           line_count, total_qty, total_amount, search_text, created_at, updated_at
+    FROM outbounds
+    WHERE id = ANY(v_ids);
+
+    INSERT INTO outbound_items_archive (id, outbound_id, item_id, qty, unit_price, created_at, updated_at)
+    SELECT id, outbound_id, item_id, qty, unit_price, created_at, updated_at
+    FROM outbound_items
+    WHERE outbound_id = ANY(v_ids);
+    GET DIAGNOSTICS v_items = ROW_COUNT;
+
+    WITH moved AS (
+        DELETE FROM flows
+        WHERE entity_type = 'outbound' AND entity_id = ANY(v_ids)
+        RETURNING *
+    )
+    INSERT INTO flows_archive (id, entity_type, entity_id, from_status, to_status, actor, payload, created_at)
+    SELECT id, entity_type, entity_id, from_status, to_status, actor, payload, created_at
+    FROM moved;
+    GET DIAGNOSTICS v_flows = ROW_COUNT;
+
+    SET LOCAL erp.bypass_line_guard = 'on';
+
+    -- 라인은 FK CASCADE로 함께 삭제
+    DELETE FROM outbounds WHERE id = ANY(v_ids);
+
+    SET LOCAL erp.bypass_line_guard = 'off';
+
+    RETURN jsonb_build_object(
+        'ok', true,
+        'outbounds', array_length(v_ids, 1),
+        'items', v_items,
+        'flows', v_flows,
+        'has_more', array_length(v_ids, 1) = p_limit
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. 검색: 보관 문서 포함 옵션 (보관분은 search_text 부분 일치, 순차 조회)
+DROP FUNCTION IF EXISTS search_outbounds(TEXT, TEXT, TIMESTAMPTZ, TIMESTAMPTZ, INT, INT);
+
+CREATE OR REPLACE FUNCTION search_outbounds(
+    p_query TEXT,
+    p_status TEXT DEFAULT NULL,
+    p_date_from TIMESTAMPTZ DEFAULT NULL,
+    p_date_to TIMESTAMPTZ DEFAULT NULL,
+    p_limit INT DEFAULT 20,
+    p_offset INT DEFAULT 0,
+    p_include_archived BOOLEAN DEFAULT false
+)
+RETURNS TABLE (outbound JSONB, rank REAL, total BIGINT) AS $$
+DECLARE
+    v_term TEXT := lower(trim(p_query));
+    v_like TEXT;
+    v_tsquery TSQUERY;
+BEGIN
+    IF v_term IS NULL OR v_term = '' THEN
+        RETURN;
+    END IF;
+
+    v_like := replace(replace(replace(v_term, '\', '\\'), '%', '\%'), '_', '\_');
+    v_tsquery := plainto_tsquery('simple', v_term);
+
+    RETURN QUERY
+    SELECT m.outbound, m.rank, COUNT(*) OVER () AS total
+    FROM (
+        SELECT
+            to_jsonb(o) - 'search_text' - 'search_vector' || jsonb_build_object('archived', false) AS outbound,
+            (
+                CASE
+                    WHEN lower(o.outbound_no) = v_term THEN 3.0
+                    WHEN lower(o.outbound_no) LIKE v_like || '%' THEN 2.0
+                    ELSE 0.0
+                END
+                + ts_rank(o.search_vector, v_tsquery)
+                + word_similarity(v_term, o.search_text)
+            )::REAL AS rank,
+            o.created_at
+        FROM outbounds o
+        WHERE (p_status IS NULL OR o.status = p_status)
+          AND (p_date_from IS NULL OR o.created_at >= p_date_from)
+          AND (p_date_to IS NULL OR o.created_at < p_date_to)
+          AND (o.search_text LIKE '%' || v_like || '%' OR o.search_vector @@ v_tsquery)
+
+        UNION ALL
+
+        SELECT
+            to_jsonb(a) - 'search_text' - 'archived_at' || jsonb_build_object('archived', true),
+            (
+                CASE
+                    WHEN lower(a.outbound_no) = v_term THEN 3.0
+                    WHEN lower(a.outbound_no) LIKE v_like || '%' THEN 2.0
+                    ELSE 0.0
+                END
+                + word_similarity(v_term, a.search_text)
+            )::REAL,
+            a.created_at
+        FROM outbounds_archive a
+        WHERE p_include_archived
+          AND (p_status IS NULL OR a.status = p_status)
+          AND (p_date_from IS NULL OR a.created_at >= p_date_from)
+          AND (p_date_to IS NULL OR a.created_at < p_date_to)
+          AND a.search_text LIKE '%' || v_like || '%'
+    ) m
+    ORDER BY m.rank DESC, m.created_at DESC
+    LIMIT LEAST(GREATEST(COALESCE(p_limit, 20), 1), 200)
+    OFFSET GREATEST(COALESCE(p_offset, 0), 0);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- 5. 일일 보관 스케줄 (pg_cron 사용 가능 시, 12개월 이전 종결 문서)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'outbound-archive-daily',
+            '30 3 * * *',
+            $job$SELECT archive_closed_outbounds(NOW() - INTERVAL '12 months', 5000)$job$
+        );
+    END IF;
+END;
+$$;
+
+COMMENT ON TABLE outbounds_archive IS '보관 출고 문서 (종결 후 archive_closed_outbounds로 이동)';
+COMMENT ON TABLE flows_archive IS '보관 출고 문서의 상태 전이 이력';
+COMMENT ON VIEW outbounds_all IS '활성 + 보관 출고 문서 (archived 컬럼으로 구분)';
+COMMENT ON FUNCTION archive_closed_outbounds IS '종결 출고 문서/라인/이력 보관 이동 (배치, has_more면 재호출)';
+COMMENT ON FUNCTION search_outbounds IS '출고 검색 (트라이그램/전문검색 인덱스, 랭킹, 보관 문서 포함 옵션)';
@@ -0,0 +1,26 @@
+-- =============================================================================
+-- Migration: 025_bom_usage_lookup
+-- Description: 상품 일괄 삭제용 BOM 연결 확인 (ID 배열을 요청 본문으로 전달)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. BOM 연결 상품 조회 (idx_bom_parent / idx_bom_component)
+--    URL 필터(or=(parent_item_id.in.(...),component_item_id.in.(...)))는
+--    ID 수백 개만으로 프록시/PostgREST URL 길이 제한을 넘으므로 RPC 본문으로 받는다.
+--    usage: bom_exists (BOM 부모) 우선, item_in_use (다른 상품의 구성품)
+CREATE OR REPLACE FUNCTION find_bom_usage(p_item_ids UUID[])
+RETURNS TABLE (item_id UUID, usage TEXT) AS $$
+    SELECT u.item_id, MIN(u.usage)
+    FROM (
+        SELECT b.parent_item_id AS item_id, 'bom_exists' AS usage
+        FROM bom_components b
+        WHERE b.parent_item_id = ANY(p_item_ids)
+        UNION ALL
+        SELECT b.component_item_id, 'item_in_use'
+        FROM bom_components b
+        WHERE b.component_item_id = ANY(p_item_ids)
+    ) u
+    GROUP BY u.item_id;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION find_bom_usage IS '상품별 BOM 연결 여부 (bom_exists: 부모 / item_in_use: 구성품)';
@@ -0,0 +1,113 @@
+-- =============================================================================
+-- Migration: 026_idempotency_keys
+-- Description: Idempotency-Key 저장소 (워커 간 공유, (scope, key) 유일)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 1. 키 테이블
+--    status: in_progress (처리 중, locked_until까지 선점) / completed (response 보관)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'in_progress' CHECK (status IN ('in_progress', 'completed')),
+    response JSONB NULL,
+    locked_until TIMESTAMPTZ NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (scope, key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+
+ALTER TABLE idempotency_keys ENABLE ROW LEVEL SECURITY;
+
+-- 2. 키 선점 (INSERT ... ON CONFLICT)
+--    반환: {"state": "claimed" | "completed" | "in_progress" | "mismatch", "response": ...}
+--    - 만료된 키는 지우고 새로 선점
+--    - 처리 중 선점 기한(locked_until)이 지난 키는 (처리 워커 중단) 이어받아 선점
+CREATE OR REPLACE FUNCTION claim_idempotency_key(
+    p_scope TEXT,
+    p_key TEXT,
+    p_fingerprint TEXT,
+    p_ttl_seconds INT,
+    p_lease_seconds INT
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_row idempotency_keys%ROWTYPE;
+BEGIN
+    DELETE FROM idempotency_keys
+    WHERE scope = p_scope AND key = p_key AND expires_at <= NOW();
+
+    INSERT INTO idempotency_keys (scope, key, fingerprint, locked_until, expires_at)
+    VALUES (
+        p_scope, p_key, p_fingerprint,
+        NOW() + make_interval(secs => p_lease_seconds),
+        NOW() + make_interval(secs => p_ttl_seconds)
+    )
+    ON CONFLICT (scope, key) DO NOTHING;
+
+    IF FOUND THEN
+        RETURN jsonb_build_object('state', 'claimed');
+    END IF;
+
+    SELECT * INTO v_row
+    FROM idempotency_keys
+    WHERE scope = p_scope AND key = p_key
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        -- 선점 직후 해제된 경우 → 호출 측에서 재시도
+        RETURN jsonb_build_object('state', 'in_progress');
+    END IF;
+
+    IF v_row.fingerprint <> p_fingerprint THEN
+        RETURN jsonb_build_object('state', 'mismatch');
+    END IF;
+
+    IF v_row.status = 'completed' THEN
+        RETURN jsonb_build_object('state', 'completed', 'response', v_row.response);
+    END IF;
+
+    IF v_row.locked_until <= NOW() THEN
+        UPDATE idempotency_keys
+        SET locked_until = NOW() + make_interval(secs => p_lease_seconds)
+        WHERE scope = p_scope AND key = p_key;
+        RETURN jsonb_build_object('state', 'claimed');
+    END IF;
+
+    RETURN jsonb_build_object('state', 'in_progress');
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. 처리 완료 (응답 보관)
+CREATE OR REPLACE FUNCTION complete_idempotency_key(p_scope TEXT, p_key TEXT, p_response JSONB)
+RETURNS VOID AS $$
+    UPDATE idempotency_keys
+    SET status = 'completed', response = p_response
+    WHERE scope = p_scope AND key = p_key;
+$$ LANGUAGE sql;
+
+-- 4. 처리 실패 (키 해제 → 같은 키로 재시도 가능)
+CREATE OR REPLACE FUNCTION release_idempotency_key(p_scope TEXT, p_key TEXT)
+RETURNS VOID AS $$
+    DELETE FROM idempotency_keys
+    WHERE scope = p_scope AND key = p_key AND status = 'in_progress';
+$$ LANGUAGE sql;
+
+-- 5. 만료 키 정리 (pg_cron 사용 가능 시 매시간)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'idempotency-keys-purge',
+            '15 * * * *',
+            $job$DELETE FROM idempotency_keys WHERE expires_at <= NOW()$job$
+        );
+    END IF;
+END;
+$$;
+
+COMMENT ON TABLE idempotency_keys IS 'Idempotency-Key 저장소 (키 선점/응답 보관, 워커 간 공유)';
+COMMENT ON FUNCTION claim_idempotency_key IS 'Idempotency-Key 선점 (claimed/completed/in_progress/mismatch)';
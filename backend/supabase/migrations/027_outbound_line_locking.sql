@@ -0,0 +1,124 @@
+-- =============================================================================
+-- Migration: 027_outbound_line_locking
+-- Description: 출고 라인 가드/집계 잠금 순서 정리 (동시 라인 추가 교착 방지)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 010 가드는 문서를 FOR SHARE로 잠그고, 012 집계 트리거가 같은 문서를 UPDATE 한다.
+-- 같은 문서에 두 트랜잭션이 라인을 추가하면 서로의 SHARE 잠금을 기다리며 교착(40P01).
+-- 가드에서 처음부터 FOR NO KEY UPDATE로 잠가 라인 변경을 문서 단위로 직렬화하고,
+-- 집계는 문장 단위로 문서 id 순서대로 잠근 뒤 한 번만 다시 계산한다.
+
+-- 1. 라인 가드: 문서 잠금을 FOR NO KEY UPDATE로 (이후 집계 UPDATE와 같은 잠금 수준)
+CREATE OR REPLACE FUNCTION guard_outbound_item_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_outbound_id UUID;
+    v_status TEXT;
+BEGIN
+    IF current_setting('erp.bypass_line_guard', true) = 'on' THEN
+        RETURN COALESCE(NEW, OLD);
+    END IF;
+
+    v_outbound_id := CASE WHEN TG_OP = 'DELETE' THEN OLD.outbound_id ELSE NEW.outbound_id END;
+
+    -- FK 검사(FOR KEY SHARE)와는 충돌하지 않고, 상태 전이 UPDATE와는 직렬화
+    SELECT status INTO v_status FROM outbounds WHERE id = v_outbound_id FOR NO KEY UPDATE;
+
+    IF FOUND AND v_status <> 'DRAFT' THEN
+        RAISE EXCEPTION 'outbound_not_draft'
+            USING ERRCODE = 'ER002', DETAIL = v_status;
+    END IF;
+
+    -- 라인 이동 방지 (다른 문서로 옮기는 UPDATE)
+    IF TG_OP = 'UPDATE' AND NEW.outbound_id <> OLD.outbound_id THEN
+        RAISE EXCEPTION 'outbound_item_move_not_allowed' USING ERRCODE = 'ER002', DETAIL = v_status;
+    END IF;
+
+    RETURN COALESCE(NEW, OLD);
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. 문서 집계 재계산 (문서 id 순서로 잠근 뒤 문서당 UPDATE 1회)
+CREATE OR REPLACE FUNCTION recalc_outbound_totals(p_outbound_ids UUID[])
+RETURNS VOID AS $$
+BEGIN
+    PERFORM 1
+    FROM outbounds
+    WHERE id = ANY(p_outbound_ids)
+    ORDER BY id
+    FOR NO KEY UPDATE;
+
+    UPDATE outbounds o
+    SET line_count = COALESCE(t.line_count, 0),
+        total_qty = COALESCE(t.total_qty, 0),
+        total_amount = COALESCE(t.total_amount, 0)
+    FROM (
+        SELECT a.outbound_id,
+               COUNT(oi.id) AS line_count,
+               SUM(oi.qty) AS total_qty,
+               SUM(oi.qty * oi.unit_price) AS total_amount
+        FROM unnest(p_outbound_ids) AS a(outbound_id)
+        LEFT JOIN outbound_items oi ON oi.outbound_id = a.outbound_id
+        GROUP BY a.outbound_id
+    ) t
+    WHERE o.id = t.outbound_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. 문장 단위 집계 트리거 (전이 테이블은 이벤트별 트리거에만 지정 가능)
+CREATE OR REPLACE FUNCTION refresh_outbound_totals()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_ids UUID[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT outbound_id) INTO v_ids FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT outbound_id) INTO v_ids FROM old_rows;
+    ELSE
+        SELECT array_agg(DISTINCT outbound_id) INTO v_ids
+        FROM (
+            SELECT outbound_id FROM old_rows
+            UNION
+            SELECT outbound_id FROM new_rows
+        ) c;
+    END IF;
+
+    IF v_ids IS NOT NULL THEN
+        PERFORM recalc_outbound_totals(v_ids);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_outbound_totals ON outbound_items;
+DROP FUNCTION IF EXISTS update_outbound_totals();
+
+DROP TRIGGER IF EXISTS trg_outbound_totals_insert ON outbound_items;
+CREATE TRIGGER trg_outbound_totals_insert
+    AFTER INSERT ON outbound_items
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_outbound_totals();
+
+-- 전이 테이블 트리거에는 컬럼 목록(UPDATE OF)을 쓸 수 없어 모든 UPDATE에서 재계산
+DROP TRIGGER IF EXISTS trg_outbound_totals_update ON outbound_items;
+CREATE TRIGGER trg_outbound_totals_update
+    AFTER UPDATE ON outbound_items
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_outbound_totals();
+
+DROP TRIGGER IF EXISTS trg_outbound_totals_delete ON outbound_items;
+CREATE TRIGGER trg_outbound_totals_delete
+    AFTER DELETE ON outbound_items
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_outbound_totals();
+
+COMMENT ON FUNCTION guard_outbound_item_changes IS '출고 라인 변경은 DRAFT 문서에서만 허용 (문서 FOR NO KEY UPDATE 잠금)';
+COMMENT ON FUNCTION recalc_outbound_totals IS '출고 문서 집계 재계산 (문서 id 순서 잠금)';
+COMMENT ON COLUMN outbounds.line_count IS '라인 수 (trg_outbound_totals_* 문장 단위 갱신)';
+COMMENT ON COLUMN outbounds.total_amount IS '합계 금액 sum(qty * unit_price) (trg_outbound_totals_* 문장 단위 갱신)';
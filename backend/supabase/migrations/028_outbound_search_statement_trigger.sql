@@ -0,0 +1,78 @@
+-- =============================================================================
+-- Migration: 028_outbound_search_statement_trigger
+-- Description: 라인 변경 시 검색 텍스트 갱신을 문장 단위로 (문서당 1회 재생성)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 013의 행 단위 트리거는 라인마다 문서 전체 SKU string_agg를 다시 만들어
+-- n개 라인 추가가 O(n²)이고, 라인마다 문서를 UPDATE 해 가드 잠금과 교착 위험이 있었다.
+-- 전이 테이블로 영향받은 문서를 모아 id 순서로 잠근 뒤 문서당 한 번만 갱신한다.
+
+-- 1. 검색 텍스트 재생성 (문서 id 순서 잠금)
+CREATE OR REPLACE FUNCTION recalc_outbound_search_text(p_outbound_ids UUID[])
+RETURNS VOID AS $$
+BEGIN
+    PERFORM 1
+    FROM outbounds
+    WHERE id = ANY(p_outbound_ids)
+    ORDER BY id
+    FOR NO KEY UPDATE;
+
+    UPDATE outbounds o
+    SET search_text = build_outbound_search_text(o.id, o.outbound_no, o.memo, o.customer_id)
+    WHERE o.id = ANY(p_outbound_ids);
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. 문장 단위 트리거 함수 (UPDATE는 item_id가 바뀐 라인의 문서만)
+CREATE OR REPLACE FUNCTION refresh_outbound_search_text()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_ids UUID[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT outbound_id) INTO v_ids FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(DISTINCT outbound_id) INTO v_ids FROM old_rows;
+    ELSE
+        SELECT array_agg(DISTINCT c.outbound_id) INTO v_ids
+        FROM old_rows o
+        JOIN new_rows n ON n.id = o.id
+        CROSS JOIN LATERAL (VALUES (o.outbound_id), (n.outbound_id)) AS c(outbound_id)
+        WHERE n.item_id IS DISTINCT FROM o.item_id
+           OR n.outbound_id IS DISTINCT FROM o.outbound_id;
+    END IF;
+
+    IF v_ids IS NOT NULL THEN
+        PERFORM recalc_outbound_search_text(v_ids);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. 트리거 교체 (전이 테이블은 이벤트별·컬럼 목록 없는 트리거에만 지정 가능)
+DROP TRIGGER IF EXISTS trg_outbound_items_search_text ON outbound_items;
+
+DROP TRIGGER IF EXISTS trg_outbound_items_search_text_insert ON outbound_items;
+CREATE TRIGGER trg_outbound_items_search_text_insert
+    AFTER INSERT ON outbound_items
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_outbound_search_text();
+
+DROP TRIGGER IF EXISTS trg_outbound_items_search_text_update ON outbound_items;
+CREATE TRIGGER trg_outbound_items_search_text_update
+    AFTER UPDATE ON outbound_items
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_outbound_search_text();
+
+DROP TRIGGER IF EXISTS trg_outbound_items_search_text_delete ON outbound_items;
+CREATE TRIGGER trg_outbound_items_search_text_delete
+    AFTER DELETE ON outbound_items
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION refresh_outbound_search_text();
+
+COMMENT ON FUNCTION recalc_outbound_search_text IS '출고 문서 검색 텍스트 재생성 (문서 id 순서 잠금, 문서당 1회)';
@@ -0,0 +1,70 @@
+-- =============================================================================
+-- Migration: 029_inbound_line_locking
+-- Description: 입고 라인 가드/집계 잠금 순서 정리 (027과 같은 교착 방지)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 017 가드는 문서를 FOR SHARE로 잠그고 집계 트리거가 같은 문서를 UPDATE 해
+-- 같은 문서에 동시에 라인을 추가하면 SHARE → 배타 잠금 승격에서 교착(40P01).
+-- 가드는 처음부터 FOR NO KEY UPDATE, 집계는 문서 id 순서로 잠근 뒤 갱신한다.
+
+-- 1. 라인 가드: 문서 잠금을 FOR NO KEY UPDATE로
+CREATE OR REPLACE FUNCTION guard_inbound_item_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_inbound_id UUID;
+    v_status TEXT;
+BEGIN
+    IF current_setting('erp.bypass_line_guard', true) = 'on' THEN
+        RETURN COALESCE(NEW, OLD);
+    END IF;
+
+    v_inbound_id := CASE WHEN TG_OP = 'DELETE' THEN OLD.inbound_id ELSE NEW.inbound_id END;
+
+    -- FK 검사(FOR KEY SHARE)와는 충돌하지 않고, 상태 전이 UPDATE와는 직렬화
+    SELECT status INTO v_status FROM inbounds WHERE id = v_inbound_id FOR NO KEY UPDATE;
+
+    IF FOUND AND v_status <> 'DRAFT' THEN
+        RAISE EXCEPTION 'inbound_not_draft'
+            USING ERRCODE = 'ER002', DETAIL = v_status;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND NEW.inbound_id <> OLD.inbound_id THEN
+        RAISE EXCEPTION 'inbound_item_move_not_allowed' USING ERRCODE = 'ER002', DETAIL = v_status;
+    END IF;
+
+    RETURN COALESCE(NEW, OLD);
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. 문서 집계 (문장 단위, 문서 id 순서로 잠근 뒤 문서당 UPDATE 1회)
+--    트리거(trg_inbound_totals_insert/update/delete)는 017 그대로 사용
+CREATE OR REPLACE FUNCTION refresh_inbound_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM 1
+    FROM inbounds
+    WHERE id IN (SELECT inbound_id FROM changed_rows)
+    ORDER BY id
+    FOR NO KEY UPDATE;
+
+    UPDATE inbounds i
+    SET line_count = COALESCE(t.line_count, 0),
+        total_qty = COALESCE(t.total_qty, 0),
+        total_amount = COALESCE(t.total_amount, 0)
+    FROM (
+        SELECT a.inbound_id,
+               COUNT(ii.id) AS line_count,
+               SUM(ii.qty) AS total_qty,
+               SUM(ii.qty * ii.unit_cost) AS total_amount
+        FROM (SELECT DISTINCT inbound_id FROM changed_rows) a
+        LEFT JOIN inbound_items ii ON ii.inbound_id = a.inbound_id
+        GROUP BY a.inbound_id
+    ) t
+    WHERE i.id = t.inbound_id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION guard_inbound_item_changes IS '입고 라인 변경은 DRAFT 문서에서만 허용 (문서 FOR NO KEY UPDATE 잠금)';
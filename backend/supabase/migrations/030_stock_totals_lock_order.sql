@@ -0,0 +1,80 @@
+-- =============================================================================
+-- Migration: 030_stock_totals_lock_order
+-- Description: stock_totals 갱신 시 item_id 순서로 잠금 (창고가 다른 동시 갱신 교착 방지)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- stocks 행은 (item_id, warehouse_id) 단위로 잠기므로 서로 다른 창고의 같은 품목들을
+-- 동시에 갱신하는 두 트랜잭션은 stocks에서 충돌하지 않고 stock_totals에서 만난다.
+-- 019의 UPDATE ... FROM은 조인 순서대로 행을 잠가 순서가 정해지지 않으므로,
+-- 갱신 전에 대상 합계 행을 item_id 순서로 먼저 잠근다 (INSERT 경로는 이미 ORDER BY item_id).
+
+CREATE OR REPLACE FUNCTION apply_stock_totals()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stock_totals AS t (item_id, onhand, reserved, warehouse_count, version)
+        SELECT item_id, SUM(onhand), SUM(reserved), COUNT(*), 1
+        FROM new_rows
+        GROUP BY item_id
+        ORDER BY item_id
+        ON CONFLICT (item_id) DO UPDATE
+            SET onhand = t.onhand + EXCLUDED.onhand,
+                reserved = t.reserved + EXCLUDED.reserved,
+                warehouse_count = t.warehouse_count + EXCLUDED.warehouse_count,
+                version = t.version + 1,
+                updated_at = NOW();
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- 증감이 0인 품목도 함께 잠그지만 같은 문장에서 stocks 행을 이미 잠근 품목들이다
+        PERFORM 1
+        FROM stock_totals t
+        WHERE t.item_id IN (
+            SELECT item_id FROM new_rows
+            UNION
+            SELECT item_id FROM old_rows
+        )
+        ORDER BY t.item_id
+        FOR NO KEY UPDATE;
+
+        UPDATE stock_totals t
+        SET onhand = t.onhand + d.onhand,
+            reserved = t.reserved + d.reserved,
+            version = t.version + 1,
+            updated_at = NOW()
+        FROM (
+            SELECT item_id, SUM(onhand) AS onhand, SUM(reserved) AS reserved
+            FROM (
+                SELECT item_id, onhand, reserved FROM new_rows
+                UNION ALL
+                SELECT item_id, -onhand, -reserved FROM old_rows
+            ) c
+            GROUP BY item_id
+            HAVING SUM(onhand) <> 0 OR SUM(reserved) <> 0
+        ) d
+        WHERE t.item_id = d.item_id;
+    ELSE
+        PERFORM 1
+        FROM stock_totals t
+        WHERE t.item_id IN (SELECT item_id FROM old_rows)
+        ORDER BY t.item_id
+        FOR NO KEY UPDATE;
+
+        UPDATE stock_totals t
+        SET onhand = t.onhand - d.onhand,
+            reserved = t.reserved - d.reserved,
+            warehouse_count = t.warehouse_count - d.rows,
+            version = t.version + 1,
+            updated_at = NOW()
+        FROM (
+            SELECT item_id, SUM(onhand) AS onhand, SUM(reserved) AS reserved, COUNT(*) AS rows
+            FROM old_rows
+            GROUP BY item_id
+        ) d
+        WHERE t.item_id = d.item_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION apply_stock_totals IS 'stocks 변경분을 stock_totals에 반영 (문장 단위, item_id 순서 잠금)';
@@ -0,0 +1,86 @@
+-- =============================================================================
+-- Migration: 031_change_stream_channel
+-- Description: 변경 스트림 채널 이름을 DB 함수 하나로 (트리거와 API LISTEN이 같은 값 사용)
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 023은 트리거에 'erp_changes'를 직접 썼고 API는 별도 설정값으로 LISTEN 해
+-- 둘이 어긋나면 이벤트가 조용히 사라졌다. 채널은 change_stream_channel()만 정의하고
+-- API는 연결 시 이 함수를 조회해 LISTEN 한다.
+--
+-- 비용 메모: NOTIFY가 있는 트랜잭션은 커밋 시 전역 알림 큐 잠금을 잡아 커밋이 직렬화된다.
+-- 잠금은 알림 건수가 아니라 트랜잭션당 1회이며, stock_totals는 반영/입고/예약 DB 함수
+-- (같은 트랜잭션에서 flows INSERT로 이미 NOTIFY)에서만 바뀌므로 재고 알림이 추가하는
+-- 직렬화 구간은 없다. flows 없이 stocks를 직접 대량 변경하는 작업을 만들면 이 비용을 고려할 것.
+
+-- 1. 채널 이름
+CREATE OR REPLACE FUNCTION change_stream_channel()
+RETURNS TEXT AS $$
+    SELECT 'erp_changes'::TEXT;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 2. 상태 전이 알림 (flows INSERT: DB 상태 전이 함수)
+CREATE OR REPLACE FUNCTION notify_flow_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_payload TEXT;
+BEGIN
+    FOR v_payload IN
+        SELECT jsonb_build_object(
+                   'topic', c.entity_type,
+                   'events', jsonb_agg(jsonb_build_object(
+                       'entity_id', c.entity_id,
+                       'from_status', c.from_status,
+                       'to_status', c.to_status,
+                       'actor', c.actor,
+                       'at', c.created_at
+                   ) ORDER BY c.created_at)
+               )::TEXT
+        FROM (
+            SELECT n.*,
+                   (ROW_NUMBER() OVER (PARTITION BY n.entity_type ORDER BY n.created_at) - 1) / 25 AS chunk
+            FROM new_rows n
+        ) c
+        GROUP BY c.entity_type, c.chunk
+    LOOP
+        PERFORM pg_notify(change_stream_channel(), v_payload);
+    END LOOP;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. 재고 변경 알림 (stock_totals)
+CREATE OR REPLACE FUNCTION notify_stock_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_payload TEXT;
+BEGIN
+    FOR v_payload IN
+        SELECT jsonb_build_object(
+                   'topic', 'stock',
+                   'events', jsonb_agg(jsonb_build_object(
+                       'item_id', c.item_id,
+                       'onhand', c.onhand,
+                       'reserved', c.reserved,
+                       'available', c.available,
+                       'version', c.version
+                   ) ORDER BY c.item_id)
+               )::TEXT
+        FROM (
+            SELECT n.*,
+                   (ROW_NUMBER() OVER (ORDER BY n.item_id) - 1) / 25 AS chunk
+            FROM new_rows n
+        ) c
+        GROUP BY c.chunk
+    LOOP
+        PERFORM pg_notify(change_stream_channel(), v_payload);
+    END LOOP;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION change_stream_channel IS '변경 스트림 NOTIFY/LISTEN 채널 이름 (단일 정의)';
+COMMENT ON FUNCTION notify_flow_changes IS 'flows INSERT → pg_notify(change_stream_channel(), topic=entity_type)';
+COMMENT ON FUNCTION notify_stock_changes IS 'stock_totals 변경 → pg_notify(change_stream_channel(), topic=stock)';
@@ -0,0 +1,47 @@
+-- =============================================================================
+-- Migration: 032_outbound_archive_job
+-- Description: 출고 보관 일일 작업을 has_more 동안 반복 (배치마다 커밋), API 설정과 같은 기본값
+-- Date: 2026-10-19
+-- =============================================================================
+
+-- 024 cron 작업은 하루 한 배치(5000건)만 옮겨 종결 문서가 그보다 많이 쌓이면 밀렸고,
+-- 기준(12개월)/배치 크기도 API 설정(OUTBOUND_ARCHIVE_AFTER_MONTHS / _BATCH_SIZE)과 따로 놀았다.
+-- 프로시저 기본값을 설정 기본값(12개월, 1000건)과 맞추고, 배치마다 커밋하며 반복한다.
+-- 설정을 바꾸면 아래 cron 명령의 인자도 같이 바꿔 다시 schedule 할 것.
+
+-- 1. 보관 작업 (배치별 트랜잭션, 최대 p_max_batches회)
+CREATE OR REPLACE PROCEDURE run_outbound_archive(
+    p_after_months INT DEFAULT 12,
+    p_batch_size INT DEFAULT 1000,
+    p_max_batches INT DEFAULT 1000
+)
+AS $$
+DECLARE
+    v_before TIMESTAMPTZ := NOW() - make_interval(months => p_after_months);
+    v_result JSONB;
+    v_batches INT := 0;
+BEGIN
+    LOOP
+        v_result := archive_closed_outbounds(v_before, p_batch_size);
+        v_batches := v_batches + 1;
+        COMMIT;
+
+        EXIT WHEN NOT (v_result->>'has_more')::BOOLEAN OR v_batches >= p_max_batches;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. 일일 스케줄 교체 (같은 이름으로 다시 schedule 하면 명령이 갱신됨)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'outbound-archive-daily',
+            '30 3 * * *',
+            $job$CALL run_outbound_archive(12, 1000)$job$
+        );
+    END IF;
+END;
+$$;
+
+COMMENT ON PROCEDURE run_outbound_archive IS '종결 출고 보관 이동 반복 (has_more 동안, 배치마다 커밋, 기본값 = API 설정 기본값)';
@@ -0,0 +1,158 @@
+"""
+재고 평가 계산 (app.services.valuation) 단위 테스트
+
+원장 배열은 품목 순 → 시간 순으로 정렬된 상태로 전달한다.
+"""
+import numpy as np
+import pytest
+from app.services.valuation import split_chunks, value_chunk, value_fifo, value_moving_average
+
+NAN = np.nan
+
+
+def ledger(rows, n_items=None):
+    """[(품목 인덱스, 수량, 단가), ...] → (item_idx, qty, cost, fallback_cost)"""
+    item_idx = np.array([r[0] for r in rows], dtype=np.int64)
+    qty = np.array([float(r[1]) for r in rows])
+    cost = np.array([NAN if r[2] is None else float(r[2]) for r in rows])
+    n = n_items if n_items is not None else int(item_idx.max()) + 1
+    return item_idx, qty, cost, np.zeros(n)
+
+
+# === 이동평균 ===
+
+def test_moving_average_receipts_and_issue():
+    item_idx, qty, cost, fallback = ledger([(0, 10, 2), (0, 10, 4), (0, -5, None)])
+    
+    onhand, value = value_moving_average(item_idx, qty, cost, fallback)
+    
+    assert onhand[0] == pytest.approx(15)
+    assert value[0] == pytest.approx(45)
+
+
+def test_moving_average_receipt_after_negative_onhand():
+    item_idx, qty, cost, fallback = ledger([(0, -5, None), (0, 10, 3)])
+    
+    onhand, value = value_moving_average(item_idx, qty, cost, fallback)
+    
+    assert onhand[0] == pytest.approx(5)
+    assert value[0] == pytest.approx(15)
+
+
+def test_moving_average_receipt_not_covering_negative_onhand():
+    item_idx, qty, cost, fallback = ledger([(0, -5, None), (0, 3, 3)])
+    
+    onhand, value = value_moving_average(item_idx, qty, cost, fallback)
+    
+    assert onhand[0] == pytest.approx(-2)
+    assert value[0] == 0
+
+
+def test_moving_average_zero_onhand_resets_value():
+    item_idx, qty, cost, fallback = ledger([(0, 10, 2), (0, -10, None), (0, 4, 5)])
+    
+    onhand, value = value_moving_average(item_idx, qty, cost, fallback)
+    
+    assert onhand[0] == pytest.approx(4)
+    assert value[0] == pytest.approx(20)
+
+
+def test_moving_average_missing_cost_uses_average_then_fallback():
+    item_idx, qty, cost, fallback = ledger([(0, 10, 2), (0, 10, None), (1, 4, None)])
+    fallback[1] = 7
+    
+    onhand, value = value_moving_average(item_idx, qty, cost, fallback)
+    
+    assert value[0] == pytest.approx(40)
+    assert value[1] == pytest.approx(28)
+
+
+def test_moving_average_items_with_different_lengths():
+    item_idx, qty, cost, fallback = ledger([
+        (0, 10, 1),
+        (1, 5, 2), (1, 5, 4), (1, -2, None),
+        (2, -1, None),
+    ])
+    
+    onhand, value = value_moving_average(item_idx, qty, cost, fallback)
+    
+    np.testing.assert_allclose(onhand, [10, 8, -1])
+    np.testing.assert_allclose(value, [10, 24, 0])
+
+
+def test_moving_average_empty_ledger():
+    onhand, value = value_moving_average(
+        np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0), np.array([1.0, 2.0])
+    )
+    
+    np.testing.assert_array_equal(onhand, [0, 0])
+    np.testing.assert_array_equal(value, [0, 0])
+
+
+# === 선입선출 ===
+
+def test_fifo_values_remaining_qty_from_latest_receipts():
+    item_idx, qty, cost, fallback = ledger([(0, 10, 1), (0, 10, 2), (0, -15, None)])
+    
+    onhand, value = value_fifo(item_idx, qty, cost, fallback)
+    
+    assert onhand[0] == pytest.approx(5)
+    assert value[0] == pytest.approx(10)
+
+
+def test_fifo_spans_receipt_layers():
+    item_idx, qty, cost, fallback = ledger([(0, 10, 1), (0, 10, 2), (0, -5, None)])
+    
+    onhand, value = value_fifo(item_idx, qty, cost, fallback)
+    
+    assert onhand[0] == pytest.approx(15)
+    assert value[0] == pytest.approx(5 * 1 + 10 * 2)
+
+
+def test_fifo_missing_cost_and_negative_onhand():
+    item_idx, qty, cost, fallback = ledger([(0, 4, None), (1, -3, None)])
+    fallback[0] = 6
+    
+    onhand, value = value_fifo(item_idx, qty, cost, fallback)
+    
+    np.testing.assert_allclose(onhand, [4, 0])
+    np.testing.assert_allclose(value, [24, 0])
+
+
+def test_fifo_items_are_independent():
+    item_idx, qty, cost, fallback = ledger([
+        (0, 5, 1), (0, 5, 3),
+        (1, 2, 10), (1, -1, None),
+    ])
+    
+    onhand, value = value_fifo(item_idx, qty, cost, fallback)
+    
+    np.testing.assert_allclose(onhand, [10, 1])
+    np.testing.assert_allclose(value, [20, 10])
+
+
+# === 구간 분할 ===
+
+@pytest.mark.parametrize("chunk_items", [1, 2, 3, 10])
+def test_split_chunks_matches_single_pass(chunk_items):
+    item_idx, qty, cost, fallback = ledger([
+        (0, 10, 1), (0, -4, None),
+        (1, -2, None), (1, 6, 2),
+        (2, 3, None),
+        (3, 8, 5), (3, 2, 6), (3, -7, None),
+    ])
+    fallback[2] = 4
+    methods = ("moving_average", "fifo")
+    
+    expected = value_chunk((item_idx, qty, cost, fallback, methods))
+    
+    onhand = {m: np.zeros(fallback.size) for m in methods}
+    value = {m: np.zeros(fallback.size) for m in methods}
+    for first, args in split_chunks(item_idx, qty, cost, fallback, methods, chunk_items):
+        for method, (chunk_onhand, chunk_value) in value_chunk(args).items():
+            onhand[method][first:first + chunk_onhand.size] = chunk_onhand
+            value[method][first:first + chunk_value.size] = chunk_value
+    
+    for method in methods:
+        np.testing.assert_allclose(onhand[method], expected[method][0])
+        np.testing.assert_allclose(value[method], expected[method][1])